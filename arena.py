@@ -0,0 +1,163 @@
+"""Load-test arena: hundreds of AI snakes sharing one FoodManager.
+
+Run `python arena.py --snakes 300 --steps 600` to print throughput; add --foraging
+for food-seeking bots re-planned under a per-tick think budget.
+"""
+import argparse
+import math
+import random
+import time
+import numpy as np
+import pygame
+from snake import Snake
+from food import FoodManager, INITIAL_FOOD_COUNT
+from movement_controller import AIController, ForagingController, ThinkScheduler, DEFAULT_SCREEN_SIZE
+from collision import BodyIndex
+from simulation import world_boundary_rect
+
+# Arena Constants
+DEFAULT_SNAKE_COUNT = 200
+SPAWN_MARGIN = 200 # Keep new snakes this far inside the world boundary
+
+def spawn_snake(rng, controller_class, screen_size):
+    """Creates a snake at a random spot inside the boundary, heading a random way."""
+    spawn_rect = world_boundary_rect.inflate(-2 * SPAWN_MARGIN, -2 * SPAWN_MARGIN)
+    x = rng.uniform(spawn_rect.left, spawn_rect.right)
+    y = rng.uniform(spawn_rect.top, spawn_rect.bottom)
+    snake = Snake(x, y, controller_class, screen_size, rng)
+    snake.direction = pygame.Vector2(1, 0).rotate(rng.uniform(0, 360))
+    return snake
+
+def feed_snakes(food_manager, snakes):
+    """Runs magnet, eating and growth for every (already moved) snake at once."""
+    head_xs = np.fromiter((snake.head_pos.x for snake in snakes), dtype=np.float64, count=len(snakes))
+    head_ys = np.fromiter((snake.head_pos.y for snake in snakes), dtype=np.float64, count=len(snakes))
+    radii = np.fromiter((snake.radius for snake in snakes), dtype=np.float64, count=len(snakes))
+
+    food_manager.begin_tick()
+    food_manager.update_many(head_xs, head_ys, radii)
+
+    # One collision query for every head; each pellet goes to a single eater
+    eaten, eaters = food_manager.check_collisions_many(head_xs, head_ys, radii)
+    if len(eaten):
+        gains = np.bincount(eaters, weights=food_manager.values[eaten], minlength=len(snakes))
+        food_manager.remove_foods(eaten)
+        for index in np.flatnonzero(gains).tolist():
+            snakes[index].grow(float(gains[index]))
+
+def crashed_snakes(body_index, snakes):
+    """Syncs the body index and returns the indices of snakes whose heads ran into another snake's body.
+
+    Every hit is found before anyone is removed, so two snakes meeting head-on both die.
+    """
+    body_index.update(snakes)
+    return [index for index, snake in enumerate(snakes) if body_index.head_hits(snake)]
+
+class Arena:
+    """A world of AI snakes whose food work is batched across all of them each tick.
+
+    A snake whose head runs into another snake's body dies like one leaving the
+    world; body_index keeps every body in a broadphase grid between ticks.
+
+    Controllers with a plan() method (ForagingController) are re-planned by the
+    scheduler, a ThinkScheduler with the default budget unless one is given.
+    """
+
+    def __init__(self, snake_count=DEFAULT_SNAKE_COUNT, initial_food_count=INITIAL_FOOD_COUNT, seed=None,
+                 screen_size=DEFAULT_SCREEN_SIZE, controller_class=AIController, scheduler=None):
+        self.screen_size = tuple(screen_size)
+        self.screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.rng = random.Random(seed)
+        self.food_manager = FoodManager(initial_food_count, seed)
+        self.controller_class = controller_class
+        if scheduler is None and hasattr(controller_class, "plan"):
+            scheduler = ThinkScheduler()
+        self.scheduler = scheduler
+        self.snakes = [self._spawn_snake() for _ in range(snake_count)]
+        self.body_index = BodyIndex() # Derived from the snakes' paths; rebuilt on the first step after a load
+        self.tick_count = 0
+        self.deaths = 0
+        self.plans = 0
+
+    def _spawn_snake(self):
+        """Creates an AI snake at a random spot inside the boundary, heading a random way."""
+        return spawn_snake(self.rng, self.controller_class, self.screen_size)
+
+    def step(self):
+        """Re-plans a budgeted few snakes, moves every snake, then runs magnet, eating and growth at once."""
+        self.tick_count += 1
+        snakes = self.snakes
+        if self.scheduler is not None:
+            self.plans += self.scheduler.run([snake.controller for snake in snakes], self.food_manager,
+                                             world_boundary_rect)
+        for snake in snakes:
+            snake.move(self.screen_center)
+        feed_snakes(self.food_manager, snakes)
+
+        # Snakes running into a body or leaving the world die, dropping their mass, and are replaced
+        # to keep the population steady
+        crashed = set(crashed_snakes(self.body_index, snakes))
+        for index, snake in enumerate(snakes):
+            if index in crashed or not world_boundary_rect.collidepoint(snake.head_pos.x, snake.head_pos.y):
+                self.food_manager.drop_mass(snake)
+                snakes[index] = self._spawn_snake()
+                self.deaths += 1
+
+    def run(self, steps=None, duration=None):
+        """Steps until `steps` ticks or `duration` seconds; returns throughput stats."""
+        if steps is None and duration is None:
+            raise ValueError("Arena.run needs a step count or a wall-clock duration")
+        start = time.perf_counter()
+        deadline = start + duration if duration is not None else None
+        ticks = 0
+        while steps is None or ticks < steps:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.step()
+            ticks += 1
+        elapsed = time.perf_counter() - start
+        ticks_per_second = ticks / elapsed if elapsed > 0 else math.inf
+        return {
+            "snakes": len(self.snakes),
+            "food_count": self.food_manager.count,
+            "ticks": ticks,
+            "seconds": elapsed,
+            "ticks_per_second": ticks_per_second,
+            "snake_ticks_per_second": ticks_per_second * len(self.snakes),
+            "snake_pellets_per_second": ticks_per_second * len(self.snakes) * self.food_manager.count,
+            "deaths": self.deaths,
+            "plans_per_tick": self.plans / self.tick_count if self.tick_count else 0.0,
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snakes", type=int, default=DEFAULT_SNAKE_COUNT)
+    parser.add_argument("--food", type=int, default=INITIAL_FOOD_COUNT)
+    parser.add_argument("--steps", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--foraging", action="store_true", help="food-seeking bots instead of random wanderers")
+    parser.add_argument("--think-budget-ms", type=float, default=None, help="foraging: planning time per tick")
+    parser.add_argument("--plans-per-tick", type=int, default=None,
+                        help="foraging: fixed plans per tick instead of a time budget")
+    args = parser.parse_args(argv)
+    if args.steps is None and args.seconds is None:
+        args.seconds = 10.0
+
+    controller_class = ForagingController if args.foraging else AIController
+    scheduler = None
+    if args.foraging and (args.think_budget_ms is not None or args.plans_per_tick is not None):
+        budget_ms = args.think_budget_ms if args.think_budget_ms is not None else 0.0
+        scheduler = ThinkScheduler(budget_ms / 1000.0, args.plans_per_tick)
+    arena = Arena(args.snakes, args.food, args.seed, controller_class=controller_class, scheduler=scheduler)
+    stats = arena.run(args.steps, args.seconds)
+    print(f"{stats['snakes']} snakes x {stats['food_count']} pellets: {stats['ticks']} ticks in "
+          f"{stats['seconds']:.2f}s ({stats['ticks_per_second']:.1f} ticks/s)")
+    print(f"Throughput: {stats['snake_ticks_per_second']:.0f} snake-ticks/s, "
+          f"{stats['snake_pellets_per_second']:.3g} snake x pellets/s, deaths {stats['deaths']}")
+    if arena.scheduler is not None:
+        print(f"Planning: {stats['plans_per_tick']:.1f} snakes re-planned per tick")
+    return stats
+
+if __name__ == '__main__':
+    main()
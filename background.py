@@ -2,52 +2,88 @@ import pygame
 import math
 
 # Background Constants
+BACKGROUND_COLOR = (20, 20, 20)
 GRID_COLOR = (40, 40, 40) # Dark grey
 GRID_SPACING = 100 # Increased base spacing for visibility when zoomed out
 LINE_THICKNESS = 1 # Base thickness
+MIN_SCREEN_GRID_SPACING = 5 # Below this many pixels the grid is not drawn
+# Above this many pixels between lines there are few enough of them to draw
+# directly each frame, and a cached layer (screen plus one cell) would be huge
+MAX_LAYER_GRID_SPACING = 64
+
+class BackgroundLayer:
+    """Dense grids rendered once into a cached surface, then scrolled with one blit.
+
+    The layer is one grid cell larger than the screen in each direction, so any
+    scroll position is covered by blitting it at the (wrapped) offset of the
+    first visible grid line. Its lines sit a whole number of pixels apart, so it
+    is only re-rendered when that pixel spacing changes, not on every small zoom
+    change as the snake grows; lines far from the first one may be off by a
+    fraction of a pixel per cell. Sparse grids are drawn directly instead.
+    """
+
+    def __init__(self):
+        self.layer = None
+        self.screen_size = None
+        self.pixel_spacing = None # Whole pixels between the layer's lines
+        self.line_thickness = None
+
+    def _needs_render(self, screen_size, pixel_spacing, line_thickness):
+        return (self.layer is None or self.screen_size != screen_size
+                or self.pixel_spacing != pixel_spacing or self.line_thickness != line_thickness)
+
+    def _render(self, screen_size, pixel_spacing, line_thickness):
+        """Renders the background fill and every grid line at this pixel spacing into the layer."""
+        screen_width, screen_height = screen_size
+        self.screen_size = screen_size
+        self.pixel_spacing = pixel_spacing
+        self.line_thickness = line_thickness
+        layer_width = screen_width + pixel_spacing
+        layer_height = screen_height + pixel_spacing
+        self.layer = pygame.Surface((layer_width, layer_height))
+        self.layer.fill(BACKGROUND_COLOR)
+        for x in range(0, layer_width, pixel_spacing):
+            pygame.draw.line(self.layer, GRID_COLOR, (x, 0), (x, layer_height), line_thickness)
+        for y in range(0, layer_height, pixel_spacing):
+            pygame.draw.line(self.layer, GRID_COLOR, (0, y), (layer_width, y), line_thickness)
+
+    def draw(self, surface, snake_head_pos, screen_center, screen_width, screen_height, zoom):
+        screen_grid_spacing = GRID_SPACING * zoom
+        if screen_grid_spacing < MIN_SCREEN_GRID_SPACING:
+            surface.fill(BACKGROUND_COLOR) # Nothing but the fill color at this zoom
+            return
+        screen_line_thickness = max(1, int(LINE_THICKNESS * zoom))
+
+        # Screen position of the first grid line at or left of/above the screen edge.
+        # World pos -> Camera Space (relative to head) -> View Space (apply zoom) -> Screen Space
+        view_left_world = snake_head_pos.x - screen_center.x / zoom
+        view_top_world = snake_head_pos.y - screen_center.y / zoom
+        start_x = math.floor(view_left_world / GRID_SPACING) * GRID_SPACING
+        start_y = math.floor(view_top_world / GRID_SPACING) * GRID_SPACING
+        offset_x = (start_x - snake_head_pos.x) * zoom + screen_center.x
+        offset_y = (start_y - snake_head_pos.y) * zoom + screen_center.y
+
+        if screen_grid_spacing > MAX_LAYER_GRID_SPACING:
+            self.layer = None # Drop any dense layer rather than hold it while zoomed in
+            surface.fill(BACKGROUND_COLOR)
+            num_lines_x = math.ceil(screen_width / screen_grid_spacing) + 1
+            num_lines_y = math.ceil(screen_height / screen_grid_spacing) + 1
+            for i in range(num_lines_x):
+                screen_x = int(offset_x + i * screen_grid_spacing)
+                pygame.draw.line(surface, GRID_COLOR, (screen_x, 0), (screen_x, screen_height), screen_line_thickness)
+            for i in range(num_lines_y):
+                screen_y = int(offset_y + i * screen_grid_spacing)
+                pygame.draw.line(surface, GRID_COLOR, (0, screen_y), (screen_width, screen_y), screen_line_thickness)
+            return
+
+        screen_size = (screen_width, screen_height)
+        pixel_spacing = round(screen_grid_spacing)
+        if self._needs_render(screen_size, pixel_spacing, screen_line_thickness):
+            self._render(screen_size, pixel_spacing, screen_line_thickness)
+        surface.blit(self.layer, (math.floor(offset_x), math.floor(offset_y)))
+
+_default_layer = BackgroundLayer()
 
 def draw_background(surface, snake_head_pos, screen_center, screen_width, screen_height, zoom):
     """Draws grid relative to snake head, scaled by zoom."""
-    surface.fill((20, 20, 20))
-
-    screen_grid_spacing = GRID_SPACING * zoom
-    screen_line_thickness = max(1, int(LINE_THICKNESS * zoom))
-
-    if screen_grid_spacing < 5:
-        return
-
-    # Visible world coordinates range, centered around snake head
-    view_width_world = screen_width / zoom
-    view_height_world = screen_height / zoom
-    world_view_left = snake_head_pos.x - view_width_world / 2
-    world_view_top = snake_head_pos.y - view_height_world / 2
-
-    # Find the starting grid lines in world coordinates
-    start_x = math.floor(world_view_left / GRID_SPACING) * GRID_SPACING
-    start_y = math.floor(world_view_top / GRID_SPACING) * GRID_SPACING
-
-    # Calculate number of lines needed
-    num_lines_x = math.ceil(view_width_world / GRID_SPACING) + 1
-    num_lines_y = math.ceil(view_height_world / GRID_SPACING) + 1
-
-    # Draw vertical lines
-    for i in range(num_lines_x):
-        world_x = start_x + i * GRID_SPACING
-        # World pos -> Camera Space (relative to head)
-        camera_space_x = world_x - snake_head_pos.x
-        # Camera Space -> View Space (apply zoom)
-        view_space_x = camera_space_x * zoom
-        # View Space -> Screen Space (center on screen)
-        screen_x = int(view_space_x + screen_center.x)
-        pygame.draw.line(surface, GRID_COLOR, (screen_x, 0), (screen_x, screen_height), screen_line_thickness)
-
-    # Draw horizontal lines
-    for i in range(num_lines_y):
-        world_y = start_y + i * GRID_SPACING
-        # World pos -> Camera Space (relative to head)
-        camera_space_y = world_y - snake_head_pos.y
-        # Camera Space -> View Space (apply zoom)
-        view_space_y = camera_space_y * zoom
-        # View Space -> Screen Space (center on screen)
-        screen_y = int(view_space_y + screen_center.y)
-        pygame.draw.line(surface, GRID_COLOR, (0, screen_y), (screen_width, screen_y), screen_line_thickness) 
\ No newline at end of file
+    _default_layer.draw(surface, snake_head_pos, screen_center, screen_width, screen_height, zoom)
@@ -0,0 +1,249 @@
+"""Reproducible benchmarks for the simulation and rendering hot paths.
+
+Run `python benchmark.py --output results.json` to record timings, and
+`python benchmark.py --baseline results.json` to compare a new run against a
+stored one (exits non-zero when any case regresses past --threshold).
+Pass `--fixtures DIR` to keep the seeded food worlds as snapshots in DIR, so
+later runs load them in milliseconds instead of respawning them.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import numpy as np
+import pygame
+from snake import Snake
+from food import FoodManager
+from background import draw_background
+from movement_controller import AIController, move_batch
+from snapshot import save_snapshot, load_snapshot
+
+# Benchmark Constants
+SEED = 12345
+SCREEN_SIZE = (1920, 1080)
+FOOD_COUNTS = [10_000, 100_000, 1_000_000]
+SNAKE_WEIGHTS = [1, 100, 10_000, 1_000_000]
+ZOOMS = [0.25, 2.0, 20.0] # Effective zoom (screen pixels per world unit)
+QUICK_FOOD_COUNTS = [10_000, 100_000]
+QUICK_SNAKE_WEIGHTS = [1, 10_000]
+QUICK_ZOOMS = [2.0, 20.0]
+BATCH_SNAKE_COUNTS = [1_000, 100_000]
+MIN_REPEATS = 3
+MAX_REPEATS = 200
+TIME_BUDGET = 0.5 # Seconds spent timing each case (after MIN_REPEATS)
+DEFAULT_THRESHOLD = 0.25 # Allowed slowdown vs baseline before flagging a regression
+SNAKE_PATH_TURN = 0.01 # Radians per unit of path, so long snakes curl instead of running straight
+
+def measure(fn, reset=None, min_repeats=MIN_REPEATS, max_repeats=MAX_REPEATS, budget=TIME_BUDGET):
+    """Times repeated calls of fn(); returns per-call stats in microseconds.
+
+    reset(), when given, runs untimed after every call to undo what fn changed,
+    so each repeat (and the next case) times the same world.
+    """
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < max_repeats:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        if reset is not None:
+            reset()
+        if len(timings) >= min_repeats and time.perf_counter() >= deadline:
+            break
+    return {
+        "median_us": statistics.median(timings) * 1e6,
+        "min_us": min(timings) * 1e6,
+        "repeats": len(timings),
+    }
+
+def build_snake(weight, screen_size=SCREEN_SIZE):
+    """Builds a snake of the given weight whose head path is long enough for its whole body."""
+    snake = Snake(0, 0, AIController, screen_size)
+    path_needed = Snake._calculate_size(weight)[1] * snake.segment_spacing * 1.5
+    heading = 0.0
+    # Lay the path down while the snake is still short, so it stays cheap
+    for _ in range(int(path_needed) + 2):
+        heading += SNAKE_PATH_TURN
+        snake.head_pos = snake.head_pos + pygame.Vector2(math.cos(heading), math.sin(heading))
+        snake.update_body()
+    snake.grow(weight - snake.weight)
+    snake.update_body()
+    return snake
+
+def food_fixture(food_count, fixtures_dir=None):
+    """The seeded FoodManager for a case, loaded from (or saved to) a snapshot in fixtures_dir."""
+    if fixtures_dir is None:
+        return FoodManager(initial_food_count=food_count, seed=SEED)
+    path = os.path.join(fixtures_dir, f"food_{food_count}_{SEED}.slsn")
+    if os.path.exists(path):
+        food_manager = load_snapshot(path)
+        # Pay the lazy costs up front so the timed calls match a freshly spawned world:
+        # build every bucket, and take the columns off the copy-on-write mapping
+        food_manager.grid.materialize()
+        for name in food_manager.COLUMNS:
+            setattr(food_manager, name, getattr(food_manager, name).copy())
+        return food_manager
+    food_manager = FoodManager(initial_food_count=food_count, seed=SEED)
+    os.makedirs(fixtures_dir, exist_ok=True)
+    save_snapshot(path, food_manager)
+    return food_manager
+
+def bench_food(food_counts, zooms, fixtures_dir=None):
+    surface = pygame.Surface(SCREEN_SIZE)
+    screen_center = pygame.Vector2(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2)
+    head = pygame.Vector2(0, 0)
+    for food_count in food_counts:
+        food_manager = food_fixture(food_count, fixtures_dir)
+        food_manager.begin_tick() # Start-of-tick positions now match the current ones
+        count = food_manager.count
+
+        def put_back_pulled():
+            """Returns the pellets the magnet pulled to their start-of-tick positions."""
+            moved = np.fromiter(food_manager._moved, dtype=np.intp, count=len(food_manager._moved))
+            food_manager.move_foods(moved, food_manager.prev_xs[moved], food_manager.prev_ys[moved])
+            food_manager.begin_tick()
+
+        for snake_radius in (0.5, 8.0):
+            params = {"food_count": food_count, "snake_radius": snake_radius}
+            yield "food.update", params, measure(lambda: food_manager.update(head, snake_radius), put_back_pulled)
+            yield "food.check_collision", params, measure(
+                lambda: food_manager.check_collision(head, snake_radius))
+
+        rng = random.Random(SEED)
+        removed = []
+        def remove_random():
+            removed.append(food_manager.remove_food(rng.randrange(food_manager.count)))
+        def put_back_removed():
+            """Drops a replenished pellet, if any, and re-adds the removed one."""
+            food = removed.pop()
+            if food_manager.count == count: # Replenishing appended one at the end
+                food_manager._remove_slots([count - 1])
+            food_manager.add_foods(np.array([food.pos.x]), np.array([food.pos.y]), food.value)
+        yield "food.remove_food", {"food_count": food_count}, measure(remove_random, put_back_removed)
+
+        for zoom in zooms:
+            params = {"food_count": food_count, "zoom": zoom}
+            yield "food.draw", params, measure(
+                lambda: food_manager.draw(surface, head, screen_center, zoom))
+
+def bench_snake(snake_weights, zooms):
+    surface = pygame.Surface(SCREEN_SIZE)
+    screen_center = pygame.Vector2(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2)
+    for weight in snake_weights:
+        snake = build_snake(weight)
+        step = pygame.Vector2(1, 0)
+        def advance():
+            snake.head_pos = snake.head_pos + step
+            snake.update_body()
+        yield "snake.update_body", {"weight": weight}, measure(advance)
+        for zoom in zooms:
+            params = {"weight": weight, "zoom": zoom}
+            yield "snake.draw", params, measure(lambda: snake.draw(surface, screen_center, zoom))
+
+def bench_background(zooms):
+    surface = pygame.Surface(SCREEN_SIZE)
+    screen_center = pygame.Vector2(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2)
+    head = pygame.Vector2(0, 0)
+    step = pygame.Vector2(0.7, 0.3)
+    for zoom in zooms:
+        def draw():
+            head.update(head + step) # Keep scrolling so cached layers can't hide the cost
+            draw_background(surface, head, screen_center, SCREEN_SIZE[0], SCREEN_SIZE[1], zoom)
+        yield "background.draw", {"zoom": zoom}, measure(draw)
+
+def bench_move_batch(snake_counts):
+    rng = np.random.default_rng(SEED)
+    for count in snake_counts:
+        head_xs, head_ys = rng.uniform(-2000, 2000, (2, count))
+        angles = rng.uniform(0, 2 * math.pi, count)
+        dir_xs, dir_ys = np.cos(angles), np.sin(angles)
+        target_xs, target_ys = rng.uniform(-300, 300, (2, count))
+        boosting = rng.random(count) < 0.3
+        bounds = (-2000, -2000, 2000, 2000)
+        yield "movement.move_batch", {"snakes": count}, measure(
+            lambda: move_batch(head_xs, head_ys, dir_xs, dir_ys, target_xs, target_ys, boosting, bounds))
+
+def run_benchmarks(quick=False, only=None, fixtures_dir=None):
+    """Runs every benchmark case; returns the JSON-serialisable report."""
+    random.seed(SEED)
+    np.random.seed(SEED)
+    food_counts = QUICK_FOOD_COUNTS if quick else FOOD_COUNTS
+    snake_weights = QUICK_SNAKE_WEIGHTS if quick else SNAKE_WEIGHTS
+    zooms = QUICK_ZOOMS if quick else ZOOMS
+    groups = {
+        "food": lambda: bench_food(food_counts, zooms, fixtures_dir),
+        "snake": lambda: bench_snake(snake_weights, zooms),
+        "background": lambda: bench_background(zooms),
+        "movement": lambda: bench_move_batch(BATCH_SNAKE_COUNTS),
+    }
+    results = []
+    for group_name, group in groups.items():
+        if only and group_name not in only:
+            continue
+        for name, params, stats in group():
+            print(f"{name:24s} {json.dumps(params):48s} {stats['median_us']:12.1f} us", file=sys.stderr)
+            results.append({"name": name, "params": params, **stats})
+    return {
+        "meta": {
+            "seed": SEED,
+            "quick": quick,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def case_key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns (case key, baseline us, current us) for every case slower than baseline by > threshold."""
+    baseline_by_key = {case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = baseline_by_key.get(case_key(result))
+        if old is None:
+            continue
+        if result["median_us"] > old["median_us"] * (1 + threshold):
+            regressions.append((case_key(result), old["median_us"], result["median_us"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative slowdown before a case counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="run a reduced sweep")
+    parser.add_argument("--fixtures", metavar="DIR", help="load/save the seeded food worlds as snapshots in DIR")
+    parser.add_argument("--only", nargs="+", choices=["food", "snake", "background", "movement"],
+                        help="run only these benchmark groups")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(quick=args.quick, only=args.only, fixtures_dir=args.fixtures)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for key, old_us, new_us in regressions:
+            print(f"REGRESSION {key}: {old_us:.1f} us -> {new_us:.1f} us", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
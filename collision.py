@@ -0,0 +1,199 @@
+"""Snake body collisions: a broadphase index over every snake's head path.
+
+A body lies along its snake's HeadPath, so the index buckets path segments (the
+stretch between two consecutive path points) in a uniform grid, each under the
+cell of its newer point. As a snake moves, its path gains a point at the head
+and sheds points at the tail; sync() mirrors exactly that, so a tick costs about
+one insert and one removal per snake rather than a rebuild of every segment.
+
+A hit test sweeps the head's last move, as a capsule of the head's radius,
+against the nearby segments as capsules of their owner's radius. Sweeping keeps
+thin snakes from tunnelling through each other, since a move (up to BOOST_SPEED)
+can be longer than a newborn snake is wide. Path kept beyond the tail (see
+PATH_KEEP_FACTOR) stays indexed but is filtered out by arc length when tested.
+"""
+import math
+from collections import deque
+import numpy as np
+
+# Collision Constants
+BODY_CELL_SIZE = 50 # World units per broadphase cell
+SELF_NECK_DIAMETERS = 4 # Own body this many diameters behind the head never counts as a self hit
+
+def segment_distances(px, py, qx, qy, ax, ay, bx, by):
+    """Closest distance between the segment PQ and each segment AB (arrays)."""
+    distances = np.minimum(np.minimum(_point_segment_distances(px, py, ax, ay, bx, by),
+                                      _point_segment_distances(qx, qy, ax, ay, bx, by)),
+                           np.minimum(_point_segment_distances(ax, ay, px, py, qx, qy),
+                                      _point_segment_distances(bx, by, px, py, qx, qy)))
+    # Segments that properly cross are at distance 0 though no endpoint is close
+    side_a = (qx - px) * (ay - py) - (qy - py) * (ax - px)
+    side_b = (qx - px) * (by - py) - (qy - py) * (bx - px)
+    side_p = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+    side_q = (bx - ax) * (qy - ay) - (by - ay) * (qx - ax)
+    return np.where((side_a * side_b < 0) & (side_p * side_q < 0), 0.0, distances)
+
+def _point_segment_distances(x, y, ax, ay, bx, by):
+    dx, dy = bx - ax, by - ay
+    length_squared = dx * dx + dy * dy
+    projection = (x - ax) * dx + (y - ay) * dy
+    t = np.clip(np.divide(projection, length_squared, out=np.zeros(np.broadcast(projection, length_squared).shape),
+                          where=length_squared > 0), 0.0, 1.0)
+    return np.hypot(x - (ax + t * dx), y - (ay + t * dy))
+
+class _BodyEntry:
+    """What the index holds for one snake: the indexed run of path segments."""
+
+    def __init__(self, snake, owner):
+        self.snake = snake
+        self.owner = owner
+        self.first = 0 # Point number of the newer end of the oldest indexed segment
+        self.next = 0 # One past the newest indexed segment
+        self.keys = deque() # Cell key of each indexed segment, oldest first
+        # (segment number, length) of the segments no newer segment is as long as, oldest (longest) first
+        self.steps = deque()
+
+    @property
+    def max_step(self):
+        """Length of the longest indexed segment."""
+        return self.steps[0][1] if self.steps else 0.0
+
+class BodyIndex:
+    """Uniform grid of body segments, kept in step with the snakes' head paths.
+
+    Each cell maps owner -> segment numbers, so a query skips a snake's own
+    segments (usually most of what lies around its head) a whole cell at a time.
+    """
+
+    def __init__(self, cell_size=BODY_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> {owner id: set of segment numbers}
+        self.entries = {} # snake -> _BodyEntry
+        self.owners = {} # owner id -> _BodyEntry
+        self.next_owner = 0
+        # Widest indexed body and longest indexed segment, bounding how far a query must look
+        self.max_radius = 0.0
+        self.max_step = 0.0
+
+    def __len__(self):
+        """Number of indexed segments."""
+        return sum(len(entry.keys) for entry in self.entries.values())
+
+    def cell_key(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def update(self, snakes):
+        """Syncs every snake and drops the ones no longer in `snakes` (dead or gone)."""
+        current = set(snakes)
+        for snake in [snake for snake in self.entries if snake not in current]:
+            self.remove(snake)
+        for snake in snakes:
+            self.sync(snake)
+        self._refresh_reach()
+
+    def _refresh_reach(self):
+        """Recomputes max_radius and max_step from the live entries, so they shrink when a big snake goes."""
+        entries = self.entries.values()
+        self.max_radius = max((entry.snake.radius for entry in entries), default=0.0)
+        self.max_step = max((entry.max_step for entry in entries), default=0.0)
+
+    def sync(self, snake):
+        """Brings one snake's segments in line with its path: new ones in at the head, trimmed ones out at the tail."""
+        entry = self.entries.get(snake)
+        if entry is None:
+            entry = self.entries[snake] = self.owners[self.next_owner] = _BodyEntry(snake, self.next_owner)
+            self.next_owner += 1
+        owner, keys, steps, cells = entry.owner, entry.keys, entry.steps, self.cells
+        path = snake.path
+        # Point numbers of the oldest and one past the newest live point
+        oldest, newest_end = path.appended - len(path), path.appended
+        while keys and entry.first <= oldest: # Segment lost its older point
+            key = keys.popleft()
+            bucket = cells[key]
+            numbers = bucket[owner]
+            numbers.discard(entry.first)
+            if not numbers:
+                del bucket[owner]
+                if not bucket:
+                    del cells[key] # Keep empty cells from piling up
+            entry.first += 1
+        if not keys:
+            entry.first = entry.next = max(entry.next, oldest + 1)
+        while steps and steps[0][0] < entry.first:
+            steps.popleft()
+        # Usually a single new segment, so plain Python beats setting up arrays
+        xs, ys, arc = path.xs, path.ys, path.arc
+        for index in range(path.end - (newest_end - entry.next), path.end):
+            key = self.cell_key(xs[index], ys[index])
+            bucket = cells.get(key)
+            if bucket is None:
+                bucket = cells[key] = {}
+            numbers = bucket.get(owner)
+            if numbers is None:
+                numbers = bucket[owner] = set()
+            numbers.add(entry.next)
+            keys.append(key)
+            step = arc[index] - arc[index - 1]
+            while steps and steps[-1][1] <= step:
+                steps.pop() # Outlived by a segment at least as long
+            steps.append((entry.next, step))
+            entry.next += 1
+        # A lone sync can only widen the reach; update() and remove() recompute it exactly
+        self.max_step = max(self.max_step, entry.max_step)
+        self.max_radius = max(self.max_radius, snake.radius)
+
+    def remove(self, snake):
+        entry = self.entries.pop(snake, None)
+        if entry is None:
+            return
+        del self.owners[entry.owner]
+        for key in set(entry.keys):
+            bucket = self.cells[key]
+            del bucket[entry.owner]
+            if not bucket:
+                del self.cells[key]
+        self._refresh_reach()
+
+    def head_hits(self, snake, include_self=False):
+        """Returns the snakes whose bodies this snake's head touched on its last move.
+
+        The snake itself is only reported with include_self, and never for the
+        SELF_NECK_DIAMETERS of body just behind its head. Every snake involved
+        must have been synced since it last moved.
+        """
+        path = snake.path
+        qx, qy = path.xs[path.end - 1], path.ys[path.end - 1]
+        px, py = (path.xs[path.end - 2], path.ys[path.end - 2]) if len(path) > 1 else (qx, qy)
+        reach = snake.radius + self.max_radius + self.max_step
+        min_cx, min_cy = self.cell_key(min(px, qx) - reach, min(py, qy) - reach)
+        max_cx, max_cy = self.cell_key(max(px, qx) + reach, max(py, qy) + reach)
+        entry = self.entries.get(snake)
+        skip = entry.owner if entry is not None and not include_self else None
+        candidates = {}
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    for owner, numbers in bucket.items():
+                        if owner != skip:
+                            candidates.setdefault(owner, []).extend(numbers)
+
+        hits = []
+        for owner, numbers in candidates.items():
+            other = self.owners[owner].snake
+            other_path = other.path
+            newer = other_path.end - (other_path.appended - np.array(numbers))
+            newer = newer[(newer - 1 >= other_path.start) & (newer < other_path.end)] # Not yet synced away
+            head_arc = other_path.arc[other_path.end - 1]
+            # Only segments reaching the tail segment are body; the rest is path slack
+            keep = other_path.arc[newer] >= head_arc - (other.length - 1) * other.segment_spacing
+            if other is snake:
+                keep &= other_path.arc[newer - 1] <= head_arc - SELF_NECK_DIAMETERS * 2 * snake.radius
+            newer = newer[keep]
+            if not len(newer):
+                continue
+            distances = segment_distances(px, py, qx, qy, other_path.xs[newer - 1], other_path.ys[newer - 1],
+                                          other_path.xs[newer], other_path.ys[newer])
+            if distances.min() < snake.radius + other.radius:
+                hits.append(other)
+        return hits
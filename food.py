@@ -1,8 +1,13 @@
 import pygame
-import random
 import math # Added for ceiling in draw
+import zlib
+from collections import OrderedDict
+import numpy as np
 # Import Snake to calculate initial radius
 from snake import Snake
+# Food is bucketed on the same spacing as the background grid
+from background import GRID_SPACING
+from sprites import splat_circles, blit_circles
 
 # Calculate initial snake radius to set food radius
 # We need to access the class method _calculate_size
@@ -14,7 +19,7 @@ FOOD_COLOR = (255, 192, 203) # Pink
 FOOD_RADIUS = INITIAL_SNAKE_RADIUS
 FOOD_VALUE = 1 # Keep value at 1 per piece
 # Calculate count based on density (100 per 100x100 grid cell area)
-GRID_CELL_AREA = 100 * 100 # Assuming grid spacing is 100 (as in background.py)
+GRID_CELL_AREA = GRID_SPACING * GRID_SPACING
 TARGET_DENSITY_PER_CELL = 100
 SPAWN_AREA_WIDTH = 4000
 SPAWN_AREA_HEIGHT = 4000
@@ -22,100 +27,1069 @@ SPAWN_AREA = SPAWN_AREA_WIDTH * SPAWN_AREA_HEIGHT
 NUM_GRID_CELLS = SPAWN_AREA / GRID_CELL_AREA
 INITIAL_FOOD_COUNT = int(NUM_GRID_CELLS * TARGET_DENSITY_PER_CELL) # Approx 160,000
 MAGNET_SPEED = 4.1
+MAGNET_RADIUS_FACTOR = 10 # Magnet range in snake radii
 REPLENISH_CHANCE = 0.1 # 10% chance to respawn food when eaten
+MAX_DROP_PELLETS = 2000 # A dead snake's mass is split over at most this many pellets (one batch)
+# Columnar store settings
+FOOD_POS_DTYPE = np.float32
+MIN_FOOD_CAPACITY = 1024
+# Above this fraction of occupied cells, a full vectorized scan beats gathering buckets
+FULL_SCAN_CELL_FRACTION = 0.25
+# Pellets this many pixels across or fewer are written straight into the pixel buffer
+SPLAT_MAX_SCREEN_RADIUS = 2
+# Chunked world settings (ChunkedFoodManager)
+CHUNK_SIZE = 500 # World units per chunk side, a multiple of GRID_SPACING
+CHUNK_LOAD_MARGIN = 250 # Chunks this far beyond a head's reach are loaded ahead of it
+CHUNK_EVICT_TICKS = 600 # Loaded chunks no head has come near for this long are unloaded
+CHUNK_EVICT_INTERVAL = 60 # Ticks between eviction sweeps
+CHUNK_RENDER_CACHE_SIZE = 256 # Unloaded chunks kept decoded for drawing
+CHUNK_KEY_OFFSET = 2 ** 30 # Shifts chunk coordinates non-negative for seeding and packing
+# Density pyramid settings (DensityPyramid)
+PYRAMID_BASE_BIN_SIZE = GRID_SPACING / 8 # World units per finest-level bin side
+PYRAMID_MIN_BINS = 8 # The coarsest level still has at least this many bins per side
+PYRAMID_BULK_ADD = 4096 # Batches bigger than this are counted once and re-pooled
+DENSITY_DRAW_ZOOM = 1.0 # Below this zoom a pellet is under a pixel across: draw shaded bins instead
+DENSITY_MIN_BIN_PIXELS = 4 # Draw the finest pyramid level whose bins are at least this big on screen
+DENSITY_FULL_SHADE = 2 * TARGET_DENSITY_PER_CELL / GRID_CELL_AREA # Pellets per square world unit at full color
 
 class Food:
-    def __init__(self, x, y):
+    """Standalone pellet record, as handed out by FoodManager.foods and remove_food."""
+    def __init__(self, x, y, value=FOOD_VALUE):
         self.pos = pygame.Vector2(x, y)
         # Use the calculated FOOD_RADIUS constant
         self.radius = FOOD_RADIUS
         self.color = FOOD_COLOR
-        self.value = FOOD_VALUE
+        self.value = value
+
+class SpatialHash:
+    """Uniform grid of buckets so queries only touch the cells near a point or rect."""
+
+    def __init__(self, cell_size=GRID_SPACING):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> set of items
+
+    def cell_key(self, x, y):
+        """Returns the key of the cell containing world point (x, y)."""
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def cell_coords(self, xs, ys):
+        """Vectorized cell_key: returns the cell x and y arrays for arrays of points."""
+        cell_xs = np.floor(xs / self.cell_size).astype(np.int32)
+        cell_ys = np.floor(ys / self.cell_size).astype(np.int32)
+        return cell_xs, cell_ys
+
+    def _bucket(self, key):
+        """Returns the cell's set or None, turning a bucket adopted by load_groups into a set on first touch."""
+        bucket = self.cells.get(key)
+        if bucket.__class__ is np.ndarray:
+            bucket = self.cells[key] = set(bucket.tolist())
+        return bucket
+
+    def groups(self):
+        """Returns (cell keys as an (n, 2) array, every item grouped by cell, start of each group)."""
+        keys = np.array(list(self.cells), dtype=np.int32).reshape(-1, 2)
+        parts = [bucket if bucket.__class__ is np.ndarray else np.fromiter(bucket, dtype=np.intp, count=len(bucket))
+                 for bucket in self.cells.values()]
+        counts = [len(part) for part in parts]
+        items = np.concatenate(parts).astype(np.intp) if parts else np.empty(0, dtype=np.intp)
+        starts = np.cumsum([0] + counts[:-1]).astype(np.intp)
+        return keys, items, starts
+
+    def load_groups(self, keys, items, starts):
+        """Adopts buckets grouped as returned by groups(), replacing the current contents.
+
+        Each group stays an array slice until its cell is first touched, so a grid
+        of millions of items comes back without building any sets up front.
+        """
+        ends = starts[1:].tolist() + [len(items)]
+        self.cells = {(cx, cy): items[start:end]
+                      for (cx, cy), start, end in zip(keys.tolist(), starts.tolist(), ends)}
+
+    def materialize(self):
+        """Turns every bucket still held as an array into a set now rather than on first touch."""
+        for key, bucket in self.cells.items():
+            if bucket.__class__ is np.ndarray:
+                self.cells[key] = set(bucket.tolist())
+
+    def insert(self, item, key):
+        bucket = self._bucket(key)
+        if bucket is None:
+            bucket = self.cells[key] = set()
+        bucket.add(item)
+
+    def insert_many(self, items, cell_xs, cell_ys):
+        """Buckets integer items in bulk, grouping by cell instead of inserting one by one."""
+        if len(items) == 0:
+            return
+        order = np.lexsort((cell_ys, cell_xs))
+        sorted_xs, sorted_ys = cell_xs[order], cell_ys[order]
+        sorted_items = np.asarray(items)[order]
+        # Start of each run of identical cells
+        breaks = np.flatnonzero((np.diff(sorted_xs) != 0) | (np.diff(sorted_ys) != 0)) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(sorted_items)]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            key = (int(sorted_xs[start]), int(sorted_ys[start]))
+            bucket = self._bucket(key)
+            if bucket is None:
+                bucket = self.cells[key] = set()
+            bucket.update(sorted_items[start:end].tolist())
+
+    def remove(self, item, key):
+        bucket = self._bucket(key)
+        if bucket is not None:
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[key] # Keep empty cells from piling up
+
+    def remove_many(self, items, cell_xs, cell_ys):
+        """Un-buckets integer items in bulk, grouped by cell like insert_many."""
+        if len(items) == 0:
+            return
+        order = np.lexsort((cell_ys, cell_xs))
+        sorted_xs, sorted_ys = cell_xs[order], cell_ys[order]
+        sorted_items = np.asarray(items)[order]
+        breaks = np.flatnonzero((np.diff(sorted_xs) != 0) | (np.diff(sorted_ys) != 0)) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(sorted_items)]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            key = (int(sorted_xs[start]), int(sorted_ys[start]))
+            bucket = self._bucket(key)
+            if bucket is not None:
+                bucket.difference_update(sorted_items[start:end].tolist())
+                if not bucket:
+                    del self.cells[key]
+
+    def move(self, item, old_key, new_key):
+        """Re-buckets an item; a no-op while it stays inside the same cell."""
+        if old_key != new_key:
+            self.remove(item, old_key)
+            self.insert(item, new_key)
+
+    def cell_span(self, left, top, right, bottom):
+        """Returns how many cells (occupied or not) overlap the rect."""
+        min_cx, min_cy = self.cell_key(left, top)
+        max_cx, max_cy = self.cell_key(right, bottom)
+        return (max_cx - min_cx + 1) * (max_cy - min_cy + 1)
+
+    def buckets_in_rect(self, left, top, right, bottom):
+        """Yields the non-empty buckets of the cells overlapping the rect."""
+        min_cx, min_cy = self.cell_key(left, top)
+        max_cx, max_cy = self.cell_key(right, bottom)
+        span = (max_cx - min_cx + 1) * (max_cy - min_cy + 1)
+        if span > len(self.cells):
+            # Huge rects (zoomed far out): walking the occupied cells is cheaper
+            for (cx, cy), bucket in self.cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    yield self._bucket((cx, cy)) if bucket.__class__ is np.ndarray else bucket
+            return
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self._bucket((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def query_rect(self, left, top, right, bottom):
+        """Yields every item in the cells overlapping the rect (callers still do exact tests)."""
+        for bucket in self.buckets_in_rect(left, top, right, bottom):
+            yield from bucket
+
+    def gather_rect(self, left, top, right, bottom):
+        """Like query_rect, but collects whole buckets at C speed into one list."""
+        items = []
+        for bucket in self.buckets_in_rect(left, top, right, bottom):
+            items.extend(bucket)
+        return items
+
+    def query_radius(self, center, radius):
+        """Yields every item in the cells overlapping the circle's bounding box."""
+        return self.query_rect(center.x - radius, center.y - radius, center.x + radius, center.y + radius)
+
+class DensityPyramid:
+    """Mipmap of pellet counts over a fixed world rect.
+
+    levels[0] bins the rect into base_bin_size squares; each level above sums 2x2
+    blocks of the one below, so a levels[k] bin is base_bin_size * 2**k across.
+    FoodManager updates every level as pellets spawn, move and get eaten, so reading
+    a level never touches the food. Pellets outside the rect are not counted (for a
+    ChunkedFoodManager, neither are unloaded chunks). `version` bumps on every change.
+    """
+
+    def __init__(self, world_rect, base_bin_size=PYRAMID_BASE_BIN_SIZE, min_bins=PYRAMID_MIN_BINS):
+        self.left = world_rect.left
+        self.top = world_rect.top
+        self.base_bin_size = base_bin_size
+        base_width = math.ceil(world_rect.width / base_bin_size)
+        base_height = math.ceil(world_rect.height / base_bin_size)
+        level_count = 1
+        while min(base_width, base_height) >> level_count >= min_bins:
+            level_count += 1
+        # Pad the base so every level halves exactly
+        block = 1 << (level_count - 1)
+        base_width = -(-base_width // block) * block
+        base_height = -(-base_height // block) * block
+        self.levels = [np.zeros((base_height >> level, base_width >> level), dtype=np.int32)
+                       for level in range(level_count)]
+        self.version = 0
+
+    def bin_size(self, level):
+        return self.base_bin_size * (1 << level)
+
+    def _base_bins(self, xs, ys):
+        """Finest-level bin coordinates of the points, and which of them fall inside the pyramid."""
+        bin_xs = np.floor((np.asarray(xs, dtype=np.float64) - self.left) / self.base_bin_size).astype(np.int64)
+        bin_ys = np.floor((np.asarray(ys, dtype=np.float64) - self.top) / self.base_bin_size).astype(np.int64)
+        height, width = self.levels[0].shape
+        inside = (bin_xs >= 0) & (bin_xs < width) & (bin_ys >= 0) & (bin_ys < height)
+        return bin_xs, bin_ys, inside
+
+    def add(self, xs, ys, delta):
+        """Adds delta to every level's bin under each point."""
+        bin_xs, bin_ys, inside = self._base_bins(xs, ys)
+        self._scatter(bin_xs[inside], bin_ys[inside], delta)
+
+    def _scatter(self, bin_xs, bin_ys, deltas):
+        if len(bin_xs) > PYRAMID_BULK_ADD:
+            # Big batches (the initial spawn, chunk loads): count the base once, then re-pool
+            base = self.levels[0]
+            weights = deltas if np.ndim(deltas) else None
+            counts = np.bincount(bin_ys * base.shape[1] + bin_xs, weights, minlength=base.size)
+            if weights is None:
+                counts *= deltas
+            base += counts.reshape(base.shape).astype(np.int32)
+            self._pool()
+        else:
+            for level, counts in enumerate(self.levels):
+                np.add.at(counts, (bin_ys >> level, bin_xs >> level), deltas)
+        self.version += 1
+
+    def add_one(self, x, y, delta):
+        """Scalar add, for the single-pellet paths."""
+        bin_x = math.floor((x - self.left) / self.base_bin_size)
+        bin_y = math.floor((y - self.top) / self.base_bin_size)
+        height, width = self.levels[0].shape
+        if 0 <= bin_x < width and 0 <= bin_y < height:
+            for level, counts in enumerate(self.levels):
+                counts[bin_y >> level, bin_x >> level] += delta
+            self.version += 1
+
+    def move(self, old_xs, old_ys, new_xs, new_ys):
+        """Moves the counts of points that crossed a finest-level bin border."""
+        old_bin_xs, old_bin_ys, old_inside = self._base_bins(old_xs, old_ys)
+        new_bin_xs, new_bin_ys, new_inside = self._base_bins(new_xs, new_ys)
+        crossed = (old_bin_xs != new_bin_xs) | (old_bin_ys != new_bin_ys)
+        leaving = crossed & old_inside
+        arriving = crossed & new_inside
+        if leaving.any() or arriving.any():
+            # One scatter per level: -1 where pellets left, +1 where they arrived
+            self._scatter(np.concatenate([old_bin_xs[leaving], new_bin_xs[arriving]]),
+                          np.concatenate([old_bin_ys[leaving], new_bin_ys[arriving]]),
+                          np.repeat(np.array([-1, 1], dtype=np.int32),
+                                    [np.count_nonzero(leaving), np.count_nonzero(arriving)]))
+
+    def add_block(self, rows, columns, counts):
+        """Adds counts to the finest-level bins under the (rows, columns) slices, and the levels above."""
+        bin_ys, bin_xs = np.mgrid[rows, columns]
+        self._scatter(bin_xs.ravel(), bin_ys.ravel(), np.asarray(counts, dtype=np.int32).ravel())
+
+    def load_base(self, counts):
+        """Adopts saved finest-level counts and rebuilds the levels above."""
+        self.levels[0][:] = counts
+        self._pool()
+        self.version += 1
+
+    def _pool(self):
+        for level in range(1, len(self.levels)):
+            below = self.levels[level - 1]
+            height, width = self.levels[level].shape
+            self.levels[level] = below.reshape(height, 2, width, 2).sum(axis=(1, 3), dtype=np.int32)
+
+    def level_for(self, zoom, min_bin_pixels):
+        """Finest level whose bins are at least min_bin_pixels across at this zoom."""
+        level = 0
+        while level < len(self.levels) - 1 and self.bin_size(level) * zoom < min_bin_pixels:
+            level += 1
+        return level
+
+    def region(self, level, left, top, right, bottom):
+        """The level's counts for the bins overlapping a world rect, and the world position of the first."""
+        size = self.bin_size(level)
+        counts = self.levels[level]
+        x0 = max(0, math.floor((left - self.left) / size))
+        y0 = max(0, math.floor((top - self.top) / size))
+        x1 = min(counts.shape[1], math.floor((right - self.left) / size) + 1)
+        y1 = min(counts.shape[0], math.floor((bottom - self.top) / size) + 1)
+        return counts[y0:max(y0, y1), x0:max(x0, x1)], self.left + x0 * size, self.top + y0 * size
+
+class FoodView:
+    """Read-only list-like view over FoodManager's columns, yielding Food records."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __len__(self):
+        return self.manager.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.manager.count
+        if not 0 <= index < self.manager.count:
+            raise IndexError("food index out of range")
+        return self.manager._make_food(index)
+
+    def __iter__(self):
+        for index in range(self.manager.count):
+            yield self.manager._make_food(index)
 
 class FoodManager:
-    def __init__(self):
-        self.foods = []
+    """Stores pellets as parallel NumPy columns (structure of arrays).
+
+    Slots [0, count) are live; removal swaps the last pellet into the hole so
+    the live range stays contiguous. The spatial hash buckets slot indices.
+    The slots past count are the free pool: every spawn, single or bulk, reuses
+    them before a column ever grows, so a steady-state tick allocates no storage.
+    """
+
+    # Per-slot columns; each grows, swaps and is copied together
+    COLUMNS = ("xs", "ys", "prev_xs", "prev_ys", "values", "cell_xs", "cell_ys", "ids")
+
+    def __init__(self, initial_food_count=INITIAL_FOOD_COUNT, seed=None):
+        self.count = 0
+        self.xs = np.empty(0, dtype=FOOD_POS_DTYPE)
+        self.ys = np.empty(0, dtype=FOOD_POS_DTYPE)
+        # Positions at the start of the current tick, for render interpolation.
+        # They differ from xs/ys only for the slots in _moved.
+        self.prev_xs = np.empty(0, dtype=FOOD_POS_DTYPE)
+        self.prev_ys = np.empty(0, dtype=FOOD_POS_DTYPE)
+        self._moved = set()
+        self.values = np.empty(0, dtype=np.float32)
+        # Cell each slot is bucketed in, kept alongside so re-bucketing is O(1)
+        self.cell_xs = np.empty(0, dtype=np.int32)
+        self.cell_ys = np.empty(0, dtype=np.int32)
+        # Stable pellet ids (slots move on removal), handed out in spawn order
+        self.ids = np.empty(0, dtype=np.int64)
+        self.next_id = 0
+        self.grid = SpatialHash(GRID_SPACING)
+        self.rng = np.random.default_rng(seed)
+        self.initial_food_count = initial_food_count
         self.spawn_area_rect = pygame.Rect(
             -SPAWN_AREA_WIDTH // 2,
             -SPAWN_AREA_HEIGHT // 2,
             SPAWN_AREA_WIDTH,
             SPAWN_AREA_HEIGHT
         )
+        # Pellet counts at every resolution, kept in step with every spawn, move and removal
+        self.pyramid = DensityPyramid(self.spawn_area_rect)
         self.spawn_initial_food()
 
+    @property
+    def foods(self):
+        """List-compatible view for callers that still index or iterate Food objects."""
+        return FoodView(self)
+
+    def _make_food(self, index):
+        return Food(float(self.xs[index]), float(self.ys[index]), float(self.values[index]))
+
+    def _ensure_capacity(self, needed):
+        """Grows every column geometrically so appends stay amortized O(1)."""
+        capacity = len(self.xs)
+        if needed <= capacity:
+            return
+        new_capacity = max(MIN_FOOD_CAPACITY, capacity * 2, needed)
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            grown = np.empty(new_capacity, dtype=old.dtype)
+            grown[:self.count] = old[:self.count]
+            setattr(self, name, grown)
+
     def spawn_initial_food(self):
         """Spawns the initial batch of food."""
-        for _ in range(INITIAL_FOOD_COUNT):
-            self._spawn_one_food()
+        self._spawn_random_food(self.initial_food_count)
+
+    def _spawn_random_food(self, amount):
+        """Spawns pellets uniformly over the spawn area."""
+        self.spawn_in_rect(self.spawn_area_rect, amount)
+
+    def spawn_in_rect(self, rect, amount, value=FOOD_VALUE):
+        """Bulk spawn: `amount` pellets uniformly over a world rect."""
+        xs = self.rng.uniform(rect.left, rect.right, amount)
+        ys = self.rng.uniform(rect.top, rect.bottom, amount)
+        self._place_foods(xs, ys, value)
+
+    def spawn_along(self, xs, ys, total_value, spread):
+        """Bulk spawn: scatters total_value of food within `spread` of a chain of points.
+
+        The value is split evenly over at most MAX_DROP_PELLETS pellets (and no
+        more pellets than whole FOOD_VALUEs), each dropped near a random point of
+        the chain. Pellets are kept inside the spawn area. Returns the pellet count.
+        """
+        if total_value <= 0 or len(xs) == 0:
+            return 0
+        amount = int(min(MAX_DROP_PELLETS, max(1, total_value // FOOD_VALUE)))
+        picks = self.rng.integers(0, len(xs), amount)
+        angles = self.rng.uniform(0, 2 * math.pi, amount)
+        distances = spread * np.sqrt(self.rng.random(amount)) # Uniform over the disc
+        area = self.spawn_area_rect
+        # Far edges are exclusive, as for uniform spawns
+        drop_xs = np.clip(np.asarray(xs)[picks] + np.cos(angles) * distances, area.left,
+                          np.nextafter(area.right, area.left))
+        drop_ys = np.clip(np.asarray(ys)[picks] + np.sin(angles) * distances, area.top,
+                          np.nextafter(area.bottom, area.top))
+        self._place_foods(drop_xs, drop_ys, np.full(amount, total_value / amount, dtype=np.float32))
+        return amount
+
+    def drop_mass(self, snake):
+        """Turns a dead snake's whole weight into pellets along its body, in one batch."""
+        xs, ys = snake.body_arrays()
+        return self.spawn_along(xs, ys, snake.weight, snake.radius)
+
+    def _place_foods(self, xs, ys, values):
+        """Where every spawn lands; subclasses can route pellets elsewhere first."""
+        self.add_foods(xs, ys, values)
 
     def _spawn_one_food(self):
         """Spawns a single food pellet in the defined area."""
-        x = random.uniform(self.spawn_area_rect.left, self.spawn_area_rect.right)
-        y = random.uniform(self.spawn_area_rect.top, self.spawn_area_rect.bottom)
-        self.foods.append(Food(x, y))
+        self._spawn_random_food(1)
+
+    def add_foods(self, xs, ys, value=FOOD_VALUE, count_density=True):
+        """Appends pellets at the given world positions and buckets them.
+
+        count_density=False leaves the pyramid alone, for pellets it already counts.
+        """
+        amount = len(xs)
+        start = self.count
+        end = start + amount
+        self._ensure_capacity(end)
+        self.xs[start:end] = xs
+        self.ys[start:end] = ys
+        self.prev_xs[start:end] = self.xs[start:end]
+        self.prev_ys[start:end] = self.ys[start:end]
+        self.values[start:end] = value
+        self.ids[start:end] = np.arange(self.next_id, self.next_id + amount)
+        self.next_id += amount
+        # Bucket from the stored float32 positions so cells agree with later lookups
+        cell_xs, cell_ys = self.grid.cell_coords(self.xs[start:end], self.ys[start:end])
+        self.cell_xs[start:end] = cell_xs
+        self.cell_ys[start:end] = cell_ys
+        self.count = end
+        self.grid.insert_many(np.arange(start, end), cell_xs, cell_ys)
+        if count_density:
+            self.pyramid.add(self.xs[start:end], self.ys[start:end], 1)
+
+    def _indices_in_rect(self, left, top, right, bottom):
+        """Returns the slot indices of pellets inside the rect, via the grid or a full scan."""
+        span = self.grid.cell_span(left, top, right, bottom)
+        if span > FULL_SCAN_CELL_FRACTION * len(self.grid.cells):
+            candidates = None # Whole live range
+            xs, ys = self.xs[:self.count], self.ys[:self.count]
+        else:
+            candidates = np.array(self.grid.gather_rect(left, top, right, bottom), dtype=np.intp)
+            xs, ys = self.xs[candidates], self.ys[candidates]
+        inside = np.flatnonzero((xs >= left) & (xs <= right) & (ys >= top) & (ys <= bottom))
+        return inside if candidates is None else candidates[inside]
+
+    def _near_pairs(self, head_xs, head_ys, reaches):
+        """Pairs every head with the pellets bucketed in the cells around it.
+
+        Returns (pellet indices, owning head indices, dx, dy, squared distance), with
+        dx/dy pointing from pellet to head, covering all heads in one set of arrays.
+        """
+        gather_rect = self.grid.gather_rect
+        nearby = []
+        counts = []
+        for x, y, reach in zip(head_xs.tolist(), head_ys.tolist(), reaches.tolist()):
+            before = len(nearby)
+            nearby.extend(gather_rect(x - reach, y - reach, x + reach, y + reach))
+            counts.append(len(nearby) - before)
+        pellets = np.array(nearby, dtype=np.intp)
+        owners = np.repeat(np.arange(len(counts), dtype=np.intp), counts)
+        dx = head_xs[owners] - self.xs[pellets].astype(np.float64)
+        dy = head_ys[owners] - self.ys[pellets].astype(np.float64)
+        return pellets, owners, dx, dy, dx * dx + dy * dy
+
+    @staticmethod
+    def _closest_pair_per_pellet(pellets, distance_sq):
+        """Returns positions into the pair arrays keeping only each pellet's closest head."""
+        order = np.lexsort((distance_sq, pellets))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = pellets[order][1:] != pellets[order][:-1]
+        return order[first]
+
+    def begin_tick(self):
+        """Marks the start of a simulation tick: last tick's moves become the interpolation origin."""
+        if self._moved:
+            moved = np.fromiter(self._moved, dtype=np.intp, count=len(self._moved))
+            self.prev_xs[moved] = self.xs[moved]
+            self.prev_ys[moved] = self.ys[moved]
+            self._moved.clear()
+
+    def move_foods(self, indices, new_xs, new_ys):
+        """Moves pellets to new positions, re-bucketing only those that crossed a cell border."""
+        self._moved.update(indices.tolist())
+        old_xs, old_ys = self.xs[indices], self.ys[indices]
+        self.xs[indices] = new_xs
+        self.ys[indices] = new_ys
+        new_cell_xs, new_cell_ys = self.grid.cell_coords(self.xs[indices], self.ys[indices])
+        crossed = np.flatnonzero((new_cell_xs != self.cell_xs[indices]) | (new_cell_ys != self.cell_ys[indices]))
+        for i in crossed.tolist():
+            index = int(indices[i])
+            old_key = (int(self.cell_xs[index]), int(self.cell_ys[index]))
+            new_key = (int(new_cell_xs[i]), int(new_cell_ys[i]))
+            self.grid.move(index, old_key, new_key)
+        self.cell_xs[indices] = new_cell_xs
+        self.cell_ys[indices] = new_cell_ys
+        self.pyramid.move(old_xs, old_ys, self.xs[indices], self.ys[indices])
 
     def update(self, snake_head_pos, snake_radius):
         """Moves food towards the snake head if within 2x snake radius."""
-        # Calculate squared distance threshold based on 2 * snake_radius
-        magnet_distance_threshold_sq = (10 * snake_radius) ** 2
+        self.update_many(np.array([snake_head_pos.x]), np.array([snake_head_pos.y]), np.array([snake_radius]))
+
+    def update_many(self, head_xs, head_ys, snake_radii):
+        """Magnet pull for many snakes in one vectorized pass.
 
-        for food in self.foods:
-            direction_to_snake = snake_head_pos - food.pos
-            distance_sq = direction_to_snake.length_squared()
+        Each pellet in range of several heads is pulled only toward the closest one.
+        """
+        # Calculate squared distance threshold based on 10 * snake_radius
+        magnet_distances = MAGNET_RADIUS_FACTOR * np.asarray(snake_radii, dtype=np.float64)
+        head_xs = np.asarray(head_xs, dtype=np.float64)
+        head_ys = np.asarray(head_ys, dtype=np.float64)
 
-            # Check if within the dynamic magnet range
-            if 0 < distance_sq < magnet_distance_threshold_sq:
-                direction_to_snake.normalize_ip()
-                food.pos += direction_to_snake * MAGNET_SPEED
+        # Only pellets in the cells around each head can be in range
+        pellets, owners, dx, dy, distance_sq = self._near_pairs(head_xs, head_ys, magnet_distances)
+
+        # Check if within the dynamic magnet range
+        in_range = np.flatnonzero((distance_sq > 0) & (distance_sq < magnet_distances[owners] ** 2))
+        if len(in_range) == 0:
+            return
+        if len(head_xs) > 1:
+            in_range = in_range[self._closest_pair_per_pellet(pellets[in_range], distance_sq[in_range])]
+        moved = pellets[in_range]
+        step = MAGNET_SPEED / np.sqrt(distance_sq[in_range])
+        self.move_foods(moved, self.xs[moved] + dx[in_range] * step, self.ys[moved] + dy[in_range] * step)
 
     def check_collision(self, snake_head_pos, snake_radius):
         """Checks if the snake head collides with any food using snake's current radius."""
+        hits = self.check_collisions(snake_head_pos, snake_radius)
+        if len(hits) == 0:
+            return None
+        return int(hits[0])
+
+    def check_collisions(self, snake_head_pos, snake_radius):
+        """Returns the slot indices of every pellet overlapping the snake head, in one pass."""
+        pellets, _ = self.check_collisions_many(
+            np.array([snake_head_pos.x]), np.array([snake_head_pos.y]), np.array([snake_radius]))
+        return pellets
+
+    def check_collisions_many(self, head_xs, head_ys, snake_radii):
+        """Finds every pellet overlapping any head in one masked query.
+
+        Returns (pellet indices, eater indices); a pellet touching several heads goes to the closest.
+        """
         # Uses the current FOOD_RADIUS constant
-        collision_radius_sq = (snake_radius + FOOD_RADIUS) ** 2
-        # Iterate backwards for safe removal during collision check potentially
-        for i in range(len(self.foods) - 1, -1, -1):
-            food = self.foods[i]
-            distance_sq = snake_head_pos.distance_squared_to(food.pos)
-            if distance_sq < collision_radius_sq:
-                return i
-        return None
+        collision_radii = np.asarray(snake_radii, dtype=np.float64) + FOOD_RADIUS
+        pellets, owners, _, _, distance_sq = self._near_pairs(
+            np.asarray(head_xs, dtype=np.float64), np.asarray(head_ys, dtype=np.float64), collision_radii)
+        hits = np.flatnonzero(distance_sq < collision_radii[owners] ** 2)
+        if len(head_xs) > 1 and len(hits):
+            hits = hits[self._closest_pair_per_pellet(pellets[hits], distance_sq[hits])]
+        return pellets[hits], owners[hits]
+
+    def _swap_remove(self, index):
+        """Removes a slot in O(1) by moving the last live pellet into it (callers update the pyramid)."""
+        last = self.count - 1
+        self.grid.remove(index, (int(self.cell_xs[index]), int(self.cell_ys[index])))
+        if index != last:
+            last_key = (int(self.cell_xs[last]), int(self.cell_ys[last]))
+            self.grid.remove(last, last_key)
+            self.grid.insert(index, last_key)
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[index] = column[last]
+        # Keep the moved set pointing at the slot the moved pellet now lives in
+        self._moved.discard(index)
+        if last in self._moved:
+            self._moved.discard(last)
+            self._moved.add(index)
+        self.count = last
+
+    def _remove_slots(self, indices, count_density=True):
+        """Bulk _swap_remove: drops many slots at once, filling the holes from the tail.
+
+        Buckets are updated a cell at a time, so this beats a _swap_remove loop when
+        thousands of pellets go together (a chunk being unloaded). count_density=False
+        keeps the pellets counted in the pyramid.
+        """
+        indices = np.unique(np.asarray(indices, dtype=np.intp))
+        if len(indices) == 0:
+            return
+        new_count = self.count - len(indices)
+        self.grid.remove_many(indices, self.cell_xs[indices], self.cell_ys[indices])
+        if count_density:
+            self.pyramid.add(self.xs[indices], self.ys[indices], -1)
+        # Surviving pellets past the new end move down into the holes below it
+        holes = indices[indices < new_count]
+        tail = np.arange(new_count, self.count)
+        survivors = tail[~np.isin(tail, indices)]
+        if len(holes):
+            self.grid.remove_many(survivors, self.cell_xs[survivors], self.cell_ys[survivors])
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[holes] = column[survivors]
+            self.grid.insert_many(holes, self.cell_xs[holes], self.cell_ys[holes])
+        if self._moved:
+            removed = set(indices.tolist())
+            relocated = dict(zip(survivors.tolist(), holes.tolist()))
+            self._moved = {relocated.get(index, index) for index in self._moved if index not in removed}
+        self.count = new_count
 
     def remove_food(self, index):
         """Removes food and potentially replenishes."""
-        if 0 <= index < len(self.foods):
-            removed_food = self.foods.pop(index)
+        if 0 <= index < self.count:
+            removed_food = self._make_food(index)
+            self.pyramid.add_one(removed_food.pos.x, removed_food.pos.y, -1)
+            self._swap_remove(index)
             # Randomly replenish
-            if random.random() < REPLENISH_CHANCE:
+            if self.rng.random() < REPLENISH_CHANCE:
                 self._spawn_one_food()
             return removed_food
         return None
 
-    def draw(self, surface, snake_head_pos, screen_center, zoom):
-        """Draws food relative to snake head, scaled by zoom."""
-        # Uses the current FOOD_RADIUS constant
-        screen_radius = int(FOOD_RADIUS * zoom)
-        if screen_radius < 1: screen_radius = 1
+    def remove_foods(self, indices):
+        """Removes a batch of pellets, replenishing in bulk. Returns the total value eaten."""
+        indices = np.unique(np.asarray(indices, dtype=np.intp))
+        indices = indices[(indices >= 0) & (indices < self.count)]
+        if len(indices) == 0:
+            return 0
+        total_value = float(self.values[indices].sum())
+        self.pyramid.add(self.xs[indices], self.ys[indices], -1)
+        # Highest slot first, so the last live pellet is never one still waiting to go
+        for index in indices[::-1].tolist():
+            self._swap_remove(index)
+        # Roll every replenish chance at once and spawn the survivors together
+        respawn_count = int(np.count_nonzero(self.rng.random(len(indices)) < REPLENISH_CHANCE))
+        if respawn_count:
+            self._spawn_random_food(respawn_count)
+        return total_value
 
+    @staticmethod
+    def view_rect(center, view_width, view_height, zoom):
+        """World rect holding every pellet a view_width x view_height screen centered on center can show."""
         # Calculate visible world bounds for culling
-        view_width_world = surface.get_width() / zoom
-        view_height_world = surface.get_height() / zoom
-        view_rect_world = pygame.Rect(
-            snake_head_pos.x - view_width_world / 2 - FOOD_RADIUS,
-            snake_head_pos.y - view_height_world / 2 - FOOD_RADIUS,
+        view_width_world = view_width / zoom
+        view_height_world = view_height / zoom
+        return pygame.Rect(
+            center.x - view_width_world / 2 - FOOD_RADIUS,
+            center.y - view_height_world / 2 - FOOD_RADIUS,
             view_width_world + FOOD_RADIUS * 2,
             view_height_world + FOOD_RADIUS * 2
         )
 
-        for food in self.foods:
-            # Basic culling (check if food's world position is potentially visible)
-            if not view_rect_world.collidepoint(food.pos.x, food.pos.y):
-                 continue
+    def _visible_positions(self, view_rect, alpha):
+        """Returns the (interpolated) world positions of the pellets potentially inside view_rect."""
+        # Basic culling (only pellets whose world position is potentially visible)
+        visible = self._indices_in_rect(view_rect.left, view_rect.top, view_rect.right, view_rect.bottom)
+        xs = self.xs[visible]
+        ys = self.ys[visible]
+        if alpha < 1.0 and self._moved:
+            prev_xs = self.prev_xs[visible]
+            prev_ys = self.prev_ys[visible]
+            xs = prev_xs + (xs - prev_xs) * alpha
+            ys = prev_ys + (ys - prev_ys) * alpha
+        return self._with_unloaded(xs, ys, *self._unloaded_positions(view_rect))
+
+    def _unloaded_positions(self, view_rect):
+        """Lists of xs and ys arrays of pellets inside view_rect kept outside the columns; none here."""
+        return [], []
+
+    @staticmethod
+    def _with_unloaded(xs, ys, extra_xs, extra_ys):
+        """Appends the unloaded pellets from _unloaded_positions to column positions."""
+        if not extra_xs:
+            return xs, ys
+        return np.concatenate([xs] + extra_xs), np.concatenate([ys] + extra_ys)
+
+    def draw(self, surface, snake_head_pos, screen_center, zoom, alpha=1.0):
+        """Draws food relative to snake head, scaled by zoom.
+
+        alpha in [0, 1] interpolates pellets pulled this tick between their
+        start-of-tick and current positions.
+        """
+        if zoom < DENSITY_DRAW_ZOOM:
+            self.draw_density(surface, snake_head_pos, screen_center, zoom)
+            return
+        view_rect_world = self.view_rect(snake_head_pos, surface.get_width(), surface.get_height(), zoom)
+        xs, ys = self._visible_positions(view_rect_world, alpha)
+        draw_pellets(surface, xs, ys, snake_head_pos, screen_center, zoom)
+
+    def draw_density(self, surface, snake_head_pos, screen_center, zoom):
+        """Draws the pyramid level matching the zoom as shaded bins instead of individual pellets.
+
+        The level is picked so bins are at least DENSITY_MIN_BIN_PIXELS across, so the
+        work depends on the screen size, not on how many pellets are in view.
+        """
+        view_rect_world = self.view_rect(snake_head_pos, surface.get_width(), surface.get_height(), zoom)
+        draw_density_bins(surface, *self._density_region(view_rect_world, zoom), snake_head_pos, screen_center, zoom)
+
+    def _density_region(self, view_rect, zoom):
+        """(counts, left, top, bin size) of the pyramid level drawn at this zoom, over view_rect."""
+        pyramid = self.pyramid
+        level = pyramid.level_for(zoom, DENSITY_MIN_BIN_PIXELS)
+        counts, left, top = pyramid.region(level, view_rect.left, view_rect.top, view_rect.right, view_rect.bottom)
+        return counts, left, top, pyramid.bin_size(level)
+
+    def frame(self, view_rect, zoom):
+        """Copies what drawing view_rect at this zoom needs into a FoodFrame, which later ticks leave alone.
+
+        Only the pellets inside view_rect are copied (or, zoomed out, the density
+        bins), so the cost follows the view rather than the world.
+        """
+        if zoom < DENSITY_DRAW_ZOOM:
+            counts, left, top, bin_size = self._density_region(view_rect, zoom)
+            return FoodFrame(self.count, density=(counts.copy(), left, top, bin_size))
+        # One culling pass; unloaded pellets never move, so they are their own previous positions
+        visible = self._indices_in_rect(view_rect.left, view_rect.top, view_rect.right, view_rect.bottom)
+        extra_xs, extra_ys = self._unloaded_positions(view_rect)
+        xs, ys = self._with_unloaded(self.xs[visible], self.ys[visible], extra_xs, extra_ys)
+        if self._moved:
+            prev_xs, prev_ys = self._with_unloaded(self.prev_xs[visible], self.prev_ys[visible], extra_xs, extra_ys)
+        else:
+            prev_xs, prev_ys = xs, ys
+        return FoodFrame(self.count, xs, ys, prev_xs, prev_ys)
+
+def draw_pellets(surface, xs, ys, camera_pos, screen_center, zoom):
+    """Draws pellets at world positions xs, ys around camera_pos."""
+    # Uses the current FOOD_RADIUS constant
+    screen_radius = int(FOOD_RADIUS * zoom)
+    if screen_radius < 1: screen_radius = 1
+
+    # World pos -> Camera Space (relative to head) -> View Space (apply zoom) -> Screen Space
+    screen_xs = ((xs - camera_pos.x) * zoom + screen_center.x).astype(np.int32)
+    screen_ys = ((ys - camera_pos.y) * zoom + screen_center.y).astype(np.int32)
+
+    # Tiny pellets: splat pixels directly; bigger ones: batch-blit a cached sprite
+    if screen_radius <= SPLAT_MAX_SCREEN_RADIUS and splat_circles(
+            surface, screen_xs, screen_ys, screen_radius, FOOD_COLOR):
+        return
+    blit_circles(surface, screen_xs, screen_ys, screen_radius, FOOD_COLOR)
+
+def draw_density_bins(surface, counts, left, top, bin_size, camera_pos, screen_center, zoom):
+    """Draws density bins (counts, top left corner at world left, top) as one scaled, shaded tile."""
+    if counts.size == 0:
+        return
+    # One pixel per bin, food colored, with the density as its alpha
+    shade = np.minimum(counts / (bin_size * bin_size * DENSITY_FULL_SHADE), 1.0)
+    tile = pygame.Surface((counts.shape[1], counts.shape[0]), pygame.SRCALPHA)
+    tile.fill(FOOD_COLOR)
+    alpha = pygame.surfarray.pixels_alpha(tile)
+    alpha[:] = (shade.T * 255).astype(np.uint8) # surfarray is indexed [x, y]
+    del alpha # Unlocks the surface
+    screen_left = (left - camera_pos.x) * zoom + screen_center.x
+    screen_top = (top - camera_pos.y) * zoom + screen_center.y
+    scaled_size = (math.ceil(counts.shape[1] * bin_size * zoom), math.ceil(counts.shape[0] * bin_size * zoom))
+    surface.blit(pygame.transform.scale(tile, scaled_size), (math.floor(screen_left), math.floor(screen_top)))
+
+class FoodFrame:
+    """One tick's food as drawn from another thread: copied pellet positions or density bins, never mutated."""
+
+    def __init__(self, count, xs=None, ys=None, prev_xs=None, prev_ys=None, density=None):
+        self.count = count # Live pellets in the whole world, for the HUD
+        self.xs, self.ys = xs, ys
+        self.prev_xs, self.prev_ys = prev_xs, prev_ys # Start-of-tick positions, for interpolation
+        self.density = density # (counts, left, top, bin size) when zoomed out, else None
+
+    def draw(self, surface, camera_pos, screen_center, zoom, alpha=1.0):
+        if self.density is not None:
+            draw_density_bins(surface, *self.density, camera_pos, screen_center, zoom)
+            return
+        xs, ys = self.xs, self.ys
+        if alpha < 1.0 and self.prev_xs is not xs:
+            xs = self.prev_xs + (xs - self.prev_xs) * alpha
+            ys = self.prev_ys + (ys - self.prev_ys) * alpha
+        draw_pellets(surface, xs, ys, camera_pos, screen_center, zoom)
+
+class ChunkedFoodManager(FoodManager):
+    """FoodManager over a world cut into square chunks that only exist once needed.
+
+    A chunk's pellets are generated from a seed derived from the world seed and the
+    chunk coordinates the first time a head comes near it, and live in the columns
+    while loaded. Chunks no head has been near for CHUNK_EVICT_TICKS are unloaded:
+    untouched ones are dropped (they regenerate identically), while chunks that came
+    within magnet reach of a head, were eaten from or were replenished keep their
+    pellets as compressed bytes. Replenished pellets landing in an unloaded chunk
+    wait as pending arrays, merged per chunk. Startup cost and memory scale with the area snakes have visited, not the world.
+
+    Drawing never loads chunks: unloaded chunks in view are decoded into a small
+    render cache instead, so rendering cannot change the simulation state.
+
+    The density pyramid covers the whole world, loaded or not. A chunk that was
+    never loaded holds its expected pellet count, spread evenly over its bins,
+    until its first load swaps in the pellets it generates; from then on its
+    pellets stay counted while unloaded, as do pending ones.
+    """
+
+    def __init__(self, initial_food_count=INITIAL_FOOD_COUNT, seed=None, world_rect=None):
+        self.world_seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self.loaded = {} # chunk key -> tick a head was last near it
+        self.saved = {} # chunk key -> compressed pellets of a modified, unloaded chunk
+        self.pending = {} # chunk key -> (xs, ys, values) of every pellet spawned there while unloaded
+        self.dirty = set() # Keys of chunks that no longer match their generated pellets
+        self.counted = set() # Keys of chunks whose own pellets the pyramid counts, rather than an estimate
+        self.render_cache = OrderedDict() # chunk key -> decoded pellets, least recently drawn first
+        self.tick = 0
+        # Chunks currently within reach of a head, and the chunk ranges they came from
+        self._active = set()
+        self._active_bounds = None
+        self._active_heads = None
+        super().__init__(initial_food_count, seed)
+        self.set_world_rect(world_rect if world_rect is not None else self.spawn_area_rect)
+        # initial_food_count keeps its meaning as pellets per default spawn area
+        self.density = initial_food_count / SPAWN_AREA
+        self.pyramid = DensityPyramid(self.spawn_area_rect)
+        self.estimated = self._estimated_counts()
+        self.pyramid.load_base(self.estimated)
+
+    def set_world_rect(self, world_rect):
+        """Sets the world bounds and the chunk range clipping limits derived from them."""
+        world = self.spawn_area_rect = pygame.Rect(world_rect)
+        # Far edges are exclusive, hence the - 1
+        self._clip_low = np.array([[world.left], [world.top], [-math.inf], [-math.inf]])
+        self._clip_high = np.array([[math.inf], [math.inf], [world.right - 1], [world.bottom - 1]])
+
+    def spawn_initial_food(self):
+        """Nothing to do up front; chunks are generated as heads approach them."""
+
+    def _estimated_counts(self):
+        """Finest pyramid level of the average fully generated world, in whole pellets.
+
+        Each bin expects density times its area inside the world. Rounding the
+        running total instead of each bin keeps the sum right where bins expect
+        fractions of a pellet.
+        """
+        pyramid = self.pyramid
+        height, width = pyramid.levels[0].shape
+        size = pyramid.base_bin_size
+        world = self.spawn_area_rect
+        widths = np.diff(np.clip(pyramid.left + size * np.arange(width + 1), world.left, world.right))
+        heights = np.diff(np.clip(pyramid.top + size * np.arange(height + 1), world.top, world.bottom))
+        totals = np.floor(np.cumsum(np.outer(heights, widths).ravel() * self.density) + 0.5)
+        return np.diff(totals, prepend=0).astype(np.int32).reshape(height, width)
+
+    def _chunk_bins(self, key):
+        """(rows, columns) slices of the finest pyramid bins whose top left corner lies in the chunk."""
+        pyramid = self.pyramid
+        height, width = pyramid.levels[0].shape
+        size = pyramid.base_bin_size
+        left, top, right, bottom = self.chunk_rect(key)
+        x0, x1 = (min(max(math.ceil((edge - pyramid.left) / size), 0), width) for edge in (left, right))
+        y0, y1 = (min(max(math.ceil((edge - pyramid.top) / size), 0), height) for edge in (top, bottom))
+        return slice(y0, y1), slice(x0, x1)
+
+    @staticmethod
+    def chunk_rect(key):
+        """Returns the (left, top, right, bottom) world bounds of a chunk."""
+        return (key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE, (key[0] + 1) * CHUNK_SIZE, (key[1] + 1) * CHUNK_SIZE)
+
+    @staticmethod
+    def _chunk_codes(xs, ys):
+        """Packs the chunk key of each point into one int64, for vectorized grouping."""
+        chunk_xs = np.floor(np.asarray(xs, dtype=np.float64) / CHUNK_SIZE).astype(np.int64) + CHUNK_KEY_OFFSET
+        chunk_ys = np.floor(np.asarray(ys, dtype=np.float64) / CHUNK_SIZE).astype(np.int64) + CHUNK_KEY_OFFSET
+        return (chunk_xs << 32) | chunk_ys
+
+    @staticmethod
+    def _chunk_key(code):
+        return ((code >> 32) - CHUNK_KEY_OFFSET, (code & 0xFFFFFFFF) - CHUNK_KEY_OFFSET)
+
+    def _chunk_bounds(self, lefts, tops, rights, bottoms):
+        """Vectorized inclusive chunk index ranges of rects, clipped to the world's chunks.
+
+        Returns [min chunk xs, min chunk ys, max chunk xs, max chunk ys] as lists.
+        """
+        rects = np.array((lefts, tops, rights, bottoms), dtype=np.float64).reshape(4, -1)
+        np.maximum(rects, self._clip_low, out=rects)
+        np.minimum(rects, self._clip_high, out=rects)
+        return np.floor(rects / CHUNK_SIZE).astype(np.int64).tolist()
+
+    def _chunk_keys_in(self, bounds):
+        """Set of chunk keys covered by the ranges returned from _chunk_bounds."""
+        keys = set()
+        for min_cx, min_cy, max_cx, max_cy in zip(*bounds):
+            keys.update((cx, cy) for cx in range(min_cx, max_cx + 1) for cy in range(min_cy, max_cy + 1))
+        return keys
+
+    def _generate_chunk(self, key):
+        """The chunk's pellets as first generated, from its own seed."""
+        left, top, right, bottom = self.chunk_rect(key)
+        world = self.spawn_area_rect
+        left, top = max(left, world.left), max(top, world.top)
+        right, bottom = min(right, world.right), min(bottom, world.bottom)
+        if right <= left or bottom <= top:
+            return (np.empty(0, dtype=FOOD_POS_DTYPE),) * 3
+        rng = np.random.default_rng([self.world_seed, key[0] + CHUNK_KEY_OFFSET, key[1] + CHUNK_KEY_OFFSET])
+        amount = round((right - left) * (bottom - top) * self.density)
+        # Clamp below the far edges so float32 rounding cannot push a pellet into the next chunk
+        xs = np.minimum(rng.uniform(left, right, amount).astype(FOOD_POS_DTYPE),
+                        np.nextafter(FOOD_POS_DTYPE(right), FOOD_POS_DTYPE(left)))
+        ys = np.minimum(rng.uniform(top, bottom, amount).astype(FOOD_POS_DTYPE),
+                        np.nextafter(FOOD_POS_DTYPE(bottom), FOOD_POS_DTYPE(top)))
+        return xs, ys, np.full(amount, FOOD_VALUE, dtype=np.float32)
+
+    def _chunk_pellets(self, key):
+        """Current pellets of an unloaded chunk: saved or generated, plus pending spawns."""
+        saved = self.saved.get(key)
+        if saved is not None:
+            xs, ys, values = np.frombuffer(zlib.decompress(saved), dtype=np.float32).reshape(3, -1)
+        else:
+            xs, ys, values = self._generate_chunk(key)
+        pending = self.pending.get(key)
+        if pending is not None:
+            xs, ys, values = (np.concatenate(pair) for pair in zip((xs, ys, values), pending))
+        return xs, ys, values
+
+    def _load_chunk(self, key):
+        xs, ys, values = self._chunk_pellets(key)
+        if key not in self.counted:
+            # First load: the pyramid held the chunk's estimate (plus any pending pellets); swap in what it generated
+            generated = len(xs) - len(self.pending.get(key, ((),))[0])
+            rows, columns = self._chunk_bins(key)
+            self.pyramid.add_block(rows, columns, -self.estimated[rows, columns])
+            self.pyramid.add(xs[:generated], ys[:generated], 1)
+            self.counted.add(key)
+        self.saved.pop(key, None)
+        if self.pending.pop(key, None) is not None:
+            self.dirty.add(key)
+        self.render_cache.pop(key, None)
+        self.loaded[key] = self.tick
+        if len(xs):
+            self.add_foods(xs, ys, values, count_density=False) # Already counted
+
+    def _unload_chunks(self, keys):
+        """Moves every live pellet in these chunks out of the columns, saving the modified chunks."""
+        codes = self._chunk_codes(self.xs[:self.count], self.ys[:self.count])
+        evicted = np.array([((cx + CHUNK_KEY_OFFSET) << 32) | (cy + CHUNK_KEY_OFFSET) for cx, cy in keys],
+                           dtype=np.int64)
+        indices = np.flatnonzero(np.isin(codes, evicted))
+        order = np.argsort(codes[indices], kind="stable")
+        indices, sorted_codes = indices[order], codes[indices][order]
+        for key, code in zip(keys, evicted.tolist()):
+            del self.loaded[key]
+            self.render_cache.pop(key, None)
+            if key in self.dirty:
+                start, end = np.searchsorted(sorted_codes, [code, code + 1])
+                chunk = indices[start:end]
+                packed = np.concatenate((self.xs[chunk], self.ys[chunk], self.values[chunk]))
+                self.saved[key] = zlib.compress(packed.astype(np.float32).tobytes(), 1)
+        self._remove_slots(indices, count_density=False) # Unloaded pellets stay in the pyramid
+
+    def _mark_dirty(self, xs, ys):
+        for code in np.unique(self._chunk_codes(xs, ys)).tolist():
+            self.dirty.add(self._chunk_key(code))
+
+    def _load_around(self, head_xs, head_ys, snake_radii):
+        """Keeps every chunk within magnet reach + CHUNK_LOAD_MARGIN of a head loaded.
+
+        Chunks inside magnet reach are marked dirty, since pellets there can be pulled
+        or eaten. The collision query repeats the magnet query's heads within a tick,
+        and most ticks no head crosses into a new chunk range, so both cases return early.
+        """
+        head_xs = np.asarray(head_xs, dtype=np.float64)
+        head_ys = np.asarray(head_ys, dtype=np.float64)
+        heads_key = (self.tick, head_xs.tolist(), head_ys.tolist(), np.asarray(snake_radii).tolist())
+        if heads_key == self._active_heads:
+            return
+        self._active_heads = heads_key
+        reaches = MAGNET_RADIUS_FACTOR * np.asarray(snake_radii, dtype=np.float64)
+        # Both ranges in one call: magnet reach first, then reach plus margin
+        reaches = np.concatenate((reaches, reaches + CHUNK_LOAD_MARGIN))
+        head_xs = np.concatenate((head_xs, head_xs))
+        head_ys = np.concatenate((head_ys, head_ys))
+        bounds = self._chunk_bounds(head_xs - reaches, head_ys - reaches, head_xs + reaches, head_ys + reaches)
+        if bounds == self._active_bounds:
+            return
+        self._active_bounds = bounds
+        heads = len(reaches) // 2
+        near = [values[:heads] for values in bounds]
+        ahead = [values[heads:] for values in bounds]
+        active = self._chunk_keys_in(ahead)
+        # Chunks dropping out of range were last used now
+        for key in self._active - active:
+            if key in self.loaded:
+                self.loaded[key] = self.tick
+        self._active = active
+        for key in active:
+            if key not in self.loaded:
+                self._load_chunk(key)
+        self.dirty.update(self._chunk_keys_in(near))
+
+    def update_many(self, head_xs, head_ys, snake_radii):
+        self._load_around(head_xs, head_ys, snake_radii)
+        super().update_many(head_xs, head_ys, snake_radii)
+
+    def check_collisions_many(self, head_xs, head_ys, snake_radii):
+        self._load_around(head_xs, head_ys, snake_radii)
+        return super().check_collisions_many(head_xs, head_ys, snake_radii)
+
+    def begin_tick(self):
+        super().begin_tick()
+        self.tick += 1
+        if self.tick % CHUNK_EVICT_INTERVAL == 0:
+            stale = [key for key, last_used in self.loaded.items()
+                     if key not in self._active and self.tick - last_used > CHUNK_EVICT_TICKS]
+            if stale:
+                self._unload_chunks(stale)
+
+    def remove_food(self, index):
+        if 0 <= index < self.count:
+            self._mark_dirty(self.xs[index:index + 1], self.ys[index:index + 1])
+        return super().remove_food(index)
+
+    def remove_foods(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        indices = indices[(indices >= 0) & (indices < self.count)]
+        self._mark_dirty(self.xs[indices], self.ys[indices])
+        return super().remove_foods(indices)
 
-            # World pos -> Camera Space (relative to head)
-            camera_space_pos = food.pos - snake_head_pos
-            # Camera Space -> View Space (apply zoom)
-            view_space_pos = camera_space_pos * zoom
-            # View Space -> Screen Space (center on screen)
-            screen_pos = view_space_pos + screen_center
+    def _place_foods(self, xs, ys, values):
+        """Adds pellets landing in loaded chunks; those landing in unloaded chunks wait as pending."""
+        values = np.broadcast_to(np.asarray(values, dtype=np.float32), np.shape(xs))
+        codes = self._chunk_codes(xs, ys)
+        live = np.zeros(len(xs), dtype=bool)
+        for code in np.unique(codes).tolist():
+            key = self._chunk_key(code)
+            in_chunk = codes == code
+            if key in self.loaded:
+                live |= in_chunk
+                self.dirty.add(key)
+            else:
+                batch = (xs[in_chunk].astype(FOOD_POS_DTYPE), ys[in_chunk].astype(FOOD_POS_DTYPE),
+                         values[in_chunk].copy())
+                pending = self.pending.get(key)
+                # One set of arrays per chunk, however many respawns land there
+                self.pending[key] = batch if pending is None else tuple(
+                    np.concatenate(pair) for pair in zip(pending, batch))
+                self.render_cache.pop(key, None)
+        if live.any():
+            self.add_foods(xs[live], ys[live], values[live])
+        if not live.all():
+            self.pyramid.add(xs[~live], ys[~live], 1) # Pending pellets are in the world, so counted
 
-            pygame.draw.circle(surface, food.color, (int(screen_pos.x), int(screen_pos.y)), screen_radius) 
\ No newline at end of file
+    def _unloaded_positions(self, view_rect):
+        """Pellets in view from unloaded chunks, decoded through the render cache."""
+        extra_xs, extra_ys = [], []
+        render_cache = self.render_cache
+        bounds = self._chunk_bounds(view_rect.left, view_rect.top, view_rect.right, view_rect.bottom)
+        for key in sorted(self._chunk_keys_in(bounds)):
+            if key in self.loaded:
+                continue
+            pellets = render_cache.pop(key, None)
+            if pellets is None:
+                pellets = self._chunk_pellets(key)[:2]
+            render_cache[key] = pellets # Most recently drawn goes last
+            chunk_xs, chunk_ys = pellets
+            inside = ((chunk_xs >= view_rect.left) & (chunk_xs <= view_rect.right) &
+                      (chunk_ys >= view_rect.top) & (chunk_ys <= view_rect.bottom))
+            extra_xs.append(chunk_xs[inside])
+            extra_ys.append(chunk_ys[inside])
+        while len(render_cache) > CHUNK_RENDER_CACHE_SIZE:
+            render_cache.popitem(last=False)
+        return extra_xs, extra_ys
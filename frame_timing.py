@@ -0,0 +1,170 @@
+import csv
+import json
+import time
+from collections import deque
+
+# Frame Timing Constants
+ROLLING_WINDOW = 300 # Frames kept for the rolling percentiles (~5s at 60 FPS)
+MAX_RECORDS = 100_000 # Per-frame records kept for export
+OVERLAY_REFRESH_FRAMES = 15 # Re-render the overlay text this often
+OVERLAY_COLOR = (255, 255, 0) # Yellow
+PERCENTILES = (50, 95, 99)
+# Display order for the overlay; unknown sections are appended after these
+SECTION_ORDER = [
+    "frame",
+    "events",
+    "update", "update.move", "update.food", "update.collision",
+    "draw", "draw.background", "draw.boundary", "draw.food", "draw.snake", "draw.hud",
+]
+
+class _NullSection:
+    """Shared do-nothing context manager handed out while timing is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SECTION = _NullSection()
+
+class _Section:
+    """Times one `with` block and adds it to the current frame record."""
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+class FrameTimer:
+    """Collects per-frame, per-section wall times in milliseconds.
+
+    Wrap phases in `with timer.section("draw.food"):`. While disabled every
+    call returns immediately, so the hooks can stay in the main loop.
+    """
+
+    def __init__(self, enabled=False, window=ROLLING_WINDOW, max_records=MAX_RECORDS):
+        self.enabled = enabled
+        self.window = deque(maxlen=window)
+        self.records = deque(maxlen=max_records)
+        self.frame_index = 0
+        self._current = None
+        self._starts = {}
+        self._frame_start = 0.0
+        self._overlay_surfaces = []
+        self._overlay_age = OVERLAY_REFRESH_FRAMES
+
+    def toggle(self):
+        """Flips timing on or off; returns the new state."""
+        self.enabled = not self.enabled
+        self._current = None
+        self._starts.clear()
+        return self.enabled
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._frame_start = time.perf_counter()
+
+    def section(self, name):
+        if not self.enabled or self._current is None:
+            return NULL_SECTION
+        return _Section(self, name)
+
+    def start(self, name):
+        """Starts timing a phase that spans code a `with` block can't wrap neatly."""
+        if self.enabled and self._current is not None:
+            self._starts[name] = time.perf_counter()
+
+    def stop(self, name):
+        start = self._starts.pop(name, None)
+        if start is not None:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """Adds a duration to the current frame (sections may run several times per frame)."""
+        if self._current is not None:
+            self._current[name] = self._current.get(name, 0.0) + seconds * 1000.0
+
+    def end_frame(self):
+        if not self.enabled or self._current is None:
+            return
+        self._current["frame"] = (time.perf_counter() - self._frame_start) * 1000.0
+        record = {"frame_index": self.frame_index, **self._current}
+        self.window.append(record)
+        self.records.append(record)
+        self.frame_index += 1
+        self._current = None
+
+    def section_names(self):
+        """Section names seen in the rolling window, in overlay order."""
+        seen = set()
+        for record in self.window:
+            seen.update(record)
+        seen.discard("frame_index")
+        ordered = [name for name in SECTION_ORDER if name in seen]
+        return ordered + sorted(seen - set(ordered))
+
+    def percentiles(self, name, percentiles=PERCENTILES):
+        """Returns the requested percentiles (ms) of a section over the rolling window."""
+        values = sorted(record[name] for record in self.window if name in record)
+        if not values:
+            return None
+        last = len(values) - 1
+        return tuple(values[min(last, int(round(p / 100 * last)))] for p in percentiles)
+
+    def summary(self):
+        """Returns {section: {"p50": ms, "p95": ms, "p99": ms}} for the rolling window."""
+        result = {}
+        for name in self.section_names():
+            values = self.percentiles(name)
+            result[name] = {f"p{p}": value for p, value in zip(PERCENTILES, values)}
+        return result
+
+    def overlay_lines(self):
+        lines = ["section              p50     p95     p99 (ms)"]
+        for name in self.section_names():
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f"{name:18s} {p50:7.2f} {p95:7.2f} {p99:7.2f}")
+        return lines
+
+    def draw_overlay(self, surface, font, topleft=(10, 10)):
+        """Draws the rolling percentiles, re-rendering the text only every few frames."""
+        if not self.enabled:
+            return
+        self._overlay_age += 1
+        if self._overlay_age >= OVERLAY_REFRESH_FRAMES:
+            self._overlay_surfaces = [font.render(line, True, OVERLAY_COLOR) for line in self.overlay_lines()]
+            self._overlay_age = 0
+        x, y = topleft
+        for text_surface in self._overlay_surfaces:
+            surface.blit(text_surface, (x, y))
+            y += text_surface.get_height() + 2
+
+    def export(self, path):
+        """Writes every recorded frame to CSV or JSON, chosen by the file extension."""
+        records = list(self.records)
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"summary": self.summary(), "frames": records}, f, indent=1)
+            return
+        names = set()
+        for record in records:
+            names.update(record)
+        names.discard("frame_index")
+        ordered = [name for name in SECTION_ORDER if name in names]
+        fieldnames = ["frame_index"] + ordered + sorted(names - set(ordered))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(records)
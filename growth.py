@@ -0,0 +1,125 @@
+"""Snake growth model: radius and body length as functions of weight.
+
+radius = BASE_RADIUS * (weight / INITIAL_WEIGHT) ** GROWTH_EXPONENT, and length is
+how many segments of that radius the weight fills: floor(weight / (pi * radius**2)),
+at least 1. Because length only changes at discrete weights, the thresholds for
+the first INITIAL_TABLE_LENGTH lengths are tabulated up front; below the last
+one, length is a binary search. Heavier weights use the formula directly (for
+arrays, vectorized, re-checking only quotients within rounding of an integer),
+so a lookup never extends the table and always agrees with the scalar formula.
+"""
+import bisect
+import math
+import numpy as np
+
+# Growth Constants
+BASE_RADIUS = 0.5 # Used for drawing size and initial radius calc
+INITIAL_WEIGHT = 1
+GROWTH_EXPONENT = 0.2 # Controls radius growth
+MIN_RADIUS = 1e-9
+INITIAL_TABLE_LENGTH = 1024 # Lengths tabulated up front; only length_threshold() extends the table
+NEAR_INTEGER_TOLERANCE = 1e-12 # Relative distance from an integer at which vectorized lengths are re-checked
+
+class GrowthModel:
+    """Radius/length formula with vectorized and inverse (weight threshold) queries."""
+
+    def __init__(self, base_radius=BASE_RADIUS, initial_weight=INITIAL_WEIGHT, growth_exponent=GROWTH_EXPONENT):
+        if not growth_exponent < 0.5:
+            raise ValueError("length only grows with weight for growth exponents below 0.5")
+        self.base_radius = base_radius
+        self.initial_weight = initial_weight
+        self.growth_exponent = growth_exponent
+        # thresholds[i] is the smallest weight whose length is at least i + 2
+        self.thresholds = []
+        self.threshold_array = np.empty(0)
+        self._extend_table(INITIAL_TABLE_LENGTH)
+
+    def radius(self, weight):
+        effective_weight = max(1, weight)
+        return max(MIN_RADIUS, self.base_radius * (effective_weight / self.initial_weight) ** self.growth_exponent)
+
+    def calculate_size(self, weight):
+        """Calculates radius first based on weight, then floored length (the reference formula)."""
+        effective_weight = max(1, weight)
+        new_radius = self.radius(weight)
+        segment_area = math.pi * new_radius**2
+        if segment_area <= 0:
+            return new_radius, 1
+        return new_radius, max(1, math.floor(effective_weight / segment_area))
+
+    def lookup_size(self, weight):
+        """Same result as calculate_size, with length read from the threshold table."""
+        return self.radius(weight), self.length(weight)
+
+    def length(self, weight):
+        if weight >= self.thresholds[-1]:
+            return self.calculate_size(weight)[1] # Past the table: the formula, never a table extension
+        return bisect.bisect_right(self.thresholds, weight) + 1
+
+    def calculate_sizes(self, weights):
+        """Vectorized calculate_size: returns (radii, lengths) arrays for an array of weights.
+
+        Lengths match the scalar formula exactly; radii can differ from it in the last
+        bit, as NumPy's pow is not guaranteed to round like math's.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        effective_weights = np.maximum(1, weights)
+        radii = np.maximum(MIN_RADIUS, self.base_radius * (effective_weights / self.initial_weight)
+                           ** self.growth_exponent)
+        return radii, self.lengths(weights)
+
+    def lengths(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        lengths = np.searchsorted(self.threshold_array, weights, side="right") + 1
+        beyond = np.flatnonzero(weights >= self.thresholds[-1])
+        if len(beyond):
+            heavy = weights.flat[beyond]
+            radii = np.maximum(MIN_RADIUS, self.base_radius * (heavy / self.initial_weight) ** self.growth_exponent)
+            quotients = heavy / (np.pi * radii**2)
+            lengths.flat[beyond] = np.maximum(1, np.floor(quotients))
+            # NumPy's pow may round differently from math's; that only matters right at an integer
+            near = np.abs(quotients - np.round(quotients)) <= quotients * NEAR_INTEGER_TOLERANCE
+            for index in beyond[near].tolist():
+                lengths.flat[index] = self.calculate_size(float(weights.flat[index]))[1]
+        return lengths
+
+    def length_threshold(self, length):
+        """Smallest weight whose length is at least `length` (0 for length 1)."""
+        if length <= 1:
+            return 0.0
+        if length - 2 >= len(self.thresholds):
+            self._extend_table(max(length, 2 * (len(self.thresholds) + 1)))
+        return self.thresholds[length - 2]
+
+    def next_length_threshold(self, weight):
+        """Smallest weight above `weight` at which length steps up."""
+        return self.length_threshold(self.length(weight) + 1)
+
+    def _estimated_thresholds(self, lengths):
+        # weight / (pi * radius**2) reaches L at weight ** (1 - 2e) = L * pi * b**2 / w0 ** (2e)
+        e = self.growth_exponent
+        scale = math.pi * self.base_radius**2 / self.initial_weight ** (2 * e)
+        return (lengths * scale) ** (1 / (1 - 2 * e))
+
+    def _exact_threshold(self, length, weight):
+        """Walks an estimate to the exact float where the formula's length reaches `length`."""
+        while self.calculate_size(weight)[1] < length:
+            weight = math.nextafter(weight, math.inf)
+        while True:
+            below = math.nextafter(weight, -math.inf)
+            if self.calculate_size(below)[1] < length:
+                return weight
+            weight = below
+
+    def _extend_table(self, max_length):
+        """Tabulates the thresholds for every length up to max_length."""
+        first = len(self.thresholds) + 2
+        if max_length < first:
+            return
+        lengths = np.arange(first, max_length + 1, dtype=np.float64)
+        estimates = self._estimated_thresholds(lengths)
+        for length, estimate in zip(range(first, max_length + 1), estimates.tolist()):
+            self.thresholds.append(self._exact_threshold(length, max(1.0, estimate)))
+        self.threshold_array = np.array(self.thresholds)
+
+DEFAULT_GROWTH_MODEL = GrowthModel()
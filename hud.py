@@ -0,0 +1,108 @@
+"""HUD layer: cached text lines and a pellet density minimap.
+
+Text surfaces are kept per line and only re-rendered when that line's text
+changes, so a frame where weight, zoom and food count hold still blits three
+cached surfaces instead of rendering three strings. The minimap draws one level
+of the food.DensityPyramid that FoodManager keeps current as pellets spawn, move
+and get eaten, and rebuilds its image only when the pyramid's version changes.
+"""
+import numpy as np
+import pygame
+
+# HUD Constants
+HUD_MARGIN = 10 # Pixels from the screen edge
+HUD_LINE_SPACING = 2
+MINIMAP_SIZE = 160 # Minimap side in pixels
+MINIMAP_MAX_BINS = 64 # Uses the finest pyramid level with at most this many bins per side
+MINIMAP_BORDER_COLOR = (120, 120, 120)
+MINIMAP_PELLET_COLOR = (255, 192, 203) # Brightest bin; matches FOOD_COLOR
+MINIMAP_SNAKE_COLOR = (255, 255, 255)
+MINIMAP_SNAKE_RADIUS = 3
+
+class TextCache:
+    """Rendered text surfaces keyed by slot; a slot re-renders only when its text changes."""
+
+    def __init__(self, font, color, antialias=True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.entries = {} # slot -> (text, surface)
+        self.renders = 0
+
+    def render(self, slot, text):
+        entry = self.entries.get(slot)
+        if entry is not None and entry[0] == text:
+            return entry[1]
+        surface = self.font.render(text, self.antialias, self.color)
+        self.entries[slot] = (text, surface)
+        self.renders += 1
+        return surface
+
+class Hud:
+    """Right-aligned stack of text lines at the top right of the screen."""
+
+    def __init__(self, font, color, margin=HUD_MARGIN, spacing=HUD_LINE_SPACING):
+        self.text = TextCache(font, color)
+        self.margin = margin
+        self.spacing = spacing
+
+    def draw(self, surface, lines):
+        """Blits each line below the last; returns the bottom of the stack."""
+        right = surface.get_width() - self.margin
+        top = self.margin
+        for slot, line in enumerate(lines):
+            text_surface = self.text.render(slot, line)
+            text_rect = text_surface.get_rect(topright=(right, top))
+            surface.blit(text_surface, text_rect)
+            top = text_rect.bottom + self.spacing
+        return top
+
+def minimap_level(pyramid):
+    """The finest pyramid level with at most MINIMAP_MAX_BINS bins per side."""
+    level = 0
+    while level < len(pyramid.levels) - 1 and max(pyramid.levels[level].shape) > MINIMAP_MAX_BINS:
+        level += 1
+    return level
+
+class Minimap:
+    """Pellet density over the whole world rect, scaled into a square in a screen corner."""
+
+    def __init__(self, pyramid, world_rect, size=MINIMAP_SIZE):
+        self.pyramid = pyramid
+        self.world_rect = pygame.Rect(world_rect)
+        self.size = size
+        self.level = minimap_level(pyramid)
+        self.image = None
+        self.version = None
+        self.rebuilds = 0
+
+    def _rebuild(self, counts, version):
+        # Scale by a high percentile so a few magnet-packed bins do not wash the rest out
+        peak = max(1.0, float(np.percentile(counts, 99)))
+        shade = np.minimum(counts / peak, 1.0)
+        # surfarray is indexed [x, y], the grid [y, x]
+        pixels = (shade.T[:, :, None] * np.array(MINIMAP_PELLET_COLOR, dtype=np.float64)).astype(np.uint8)
+        self.image = pygame.transform.scale(pygame.surfarray.make_surface(pixels), (self.size, self.size))
+        self.version = version
+        self.rebuilds += 1
+
+    def draw(self, surface, snake_head_pos, topright, counts=None, version=None):
+        """Draws the map with its top right corner at topright, marking the snake's head.
+
+        counts and version stand in for the pyramid's level and version when the
+        pyramid belongs to another thread (a copy taken with the version it had).
+        """
+        if counts is None:
+            counts, version = self.pyramid.levels[self.level], self.pyramid.version
+        if self.version != version:
+            self._rebuild(counts, version)
+        rect = self.image.get_rect(topright=topright)
+        surface.blit(self.image, rect)
+        pygame.draw.rect(surface, MINIMAP_BORDER_COLOR, rect, 1)
+        # Snake marker, clamped to the map edge while it is outside the world
+        u = (snake_head_pos.x - self.world_rect.left) / self.world_rect.width
+        v = (snake_head_pos.y - self.world_rect.top) / self.world_rect.height
+        marker = (rect.left + min(max(u, 0.0), 1.0) * (rect.width - 1),
+                  rect.top + min(max(v, 0.0), 1.0) * (rect.height - 1))
+        pygame.draw.circle(surface, MINIMAP_SNAKE_COLOR, marker, MINIMAP_SNAKE_RADIUS)
+        return rect
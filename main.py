@@ -1,16 +1,24 @@
 import pygame
 import sys
 import math # Import math for area calculation
-from snake import Snake # Removed BASE_RADIUS import
+import time
+import argparse
 from background import draw_background # Import background drawing function
-from food import FoodManager, SPAWN_AREA_WIDTH, SPAWN_AREA_HEIGHT # Import FoodManager and boundary constants
+from simulation import Simulation, run_headless, world_boundary_rect # Game state and update phase
 from movement_controller import PlayerController, AIController
+from frame_timing import FrameTimer # Per-phase timing hooks and overlay
+from replay import InputRecorder, replay # Input logs for reproducible runs
+from hud import Hud, Minimap, HUD_MARGIN # Cached HUD text and the density minimap
+from sim_thread import SimulationThread, InputController # Simulation on a worker thread
 
 # Constants
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 # BACKGROUND_COLOR is now handled by draw_background
-FPS = 60 # Frames per second
+FPS = 60 # Render frame cap (0 = uncapped)
+# Fixed-timestep simulation: movement constants are per tick, so they hold at any frame rate
+TICK_RATE = 60 # Simulation ticks per second
+MAX_CATCH_UP_TICKS = 5 # Ticks run in one frame at most; the rest of a backlog is dropped
 TEXT_COLOR = (255, 255, 255) # White for text
 BOUNDARY_COLOR = (255, 0, 0) # Red for boundary
 BOUNDARY_LINE_WIDTH = 3
@@ -21,168 +29,343 @@ TARGET_VISUAL_RADIUS = 10.0
 ZOOM_SENSITIVITY = 0.1
 MIN_MANUAL_ZOOM = 0.1 # Wider min zoom
 MAX_MANUAL_ZOOM = 10.0 # Wider max zoom
-
-# Calculate World Boundary Rect
-world_boundary_rect = pygame.Rect(
-    -SPAWN_AREA_WIDTH // 2,
-    -SPAWN_AREA_HEIGHT // 2,
-    SPAWN_AREA_WIDTH,
-    SPAWN_AREA_HEIGHT
-)
+# Frame timing controls
+TIMING_OVERLAY_KEY = pygame.K_F3 # Toggle timing + overlay
+TIMING_EXPORT_KEY = pygame.K_F4 # Dump recorded frames
+DEFAULT_TIMINGS_PATH = "frame_timings.csv"
 
 def draw_boundary(surface, boundary_rect, snake_head_pos, screen_center, zoom):
-    """Draws the world boundary rectangle transformed to screen coordinates."""
-    # Function to transform world point to screen point
-    def world_to_screen(world_pos):
-        camera_space = world_pos - snake_head_pos
-        view_space = camera_space * zoom
-        screen_pos = view_space + screen_center
-        return screen_pos
-
-    # Get corner points in world coordinates
-    top_left = world_to_screen(boundary_rect.topleft)
-    top_right = world_to_screen(boundary_rect.topright)
-    bottom_left = world_to_screen(boundary_rect.bottomleft)
-    bottom_right = world_to_screen(boundary_rect.bottomright)
-
-    # Draw the lines (consider clipping later if needed)
-    pygame.draw.line(surface, BOUNDARY_COLOR, top_left, top_right, BOUNDARY_LINE_WIDTH)
-    pygame.draw.line(surface, BOUNDARY_COLOR, top_right, bottom_right, BOUNDARY_LINE_WIDTH)
-    pygame.draw.line(surface, BOUNDARY_COLOR, bottom_right, bottom_left, BOUNDARY_LINE_WIDTH)
-    pygame.draw.line(surface, BOUNDARY_COLOR, bottom_left, top_left, BOUNDARY_LINE_WIDTH)
-
-def main():
-    # Initialize Pygame
-    pygame.init()
+    """Draws the world boundary rectangle transformed to screen coordinates.
+
+    Each edge is clipped to the screen first, so extreme zooms never hand pygame
+    huge line coordinates, and edges entirely off screen are skipped.
+    """
+    # World -> Camera Space (relative to head) -> View Space (apply zoom) -> Screen Space
+    left = (boundary_rect.left - snake_head_pos.x) * zoom + screen_center.x
+    right = (boundary_rect.right - snake_head_pos.x) * zoom + screen_center.x
+    top = (boundary_rect.top - snake_head_pos.y) * zoom + screen_center.y
+    bottom = (boundary_rect.bottom - snake_head_pos.y) * zoom + screen_center.y
+
+    # Clip against the screen grown by the line width so thick edges still reach the border
+    min_x = min_y = -BOUNDARY_LINE_WIDTH
+    max_x = surface.get_width() + BOUNDARY_LINE_WIDTH
+    max_y = surface.get_height() + BOUNDARY_LINE_WIDTH
+    span_left, span_right = max(left, min_x), min(right, max_x)
+    span_top, span_bottom = max(top, min_y), min(bottom, max_y)
+
+    # Horizontal edges (top, bottom), then vertical edges (left, right)
+    if span_left <= span_right:
+        for y in (top, bottom):
+            if min_y <= y <= max_y:
+                pygame.draw.line(surface, BOUNDARY_COLOR, (span_left, y), (span_right, y), BOUNDARY_LINE_WIDTH)
+    if span_top <= span_bottom:
+        for x in (left, right):
+            if min_x <= x <= max_x:
+                pygame.draw.line(surface, BOUNDARY_COLOR, (x, span_top), (x, span_bottom), BOUNDARY_LINE_WIDTH)
+
+def hud_lines(snake, manual_zoom_factor, food_count):
+    """The HUD text: weight and size, area bounds and zoom, food count."""
+    # Calculate area bounds for display
+    segment_area = math.pi * snake.radius**2
+    lower_bound = math.floor(snake.length) * segment_area # Use floor length for bounds
+    upper_bound = math.ceil(snake.length) * segment_area # Use ceil length for bounds
+    return (f"Weight: {snake.weight:.0f} (Radius: {snake.radius:.2f}, Length: {snake.length:d})",
+            f"Bounds: [{lower_bound:.1f} - {upper_bound:.1f}] Zoom: {manual_zoom_factor:.2f}",
+            f"Food Count: {food_count}")
 
-    # Set up the display
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Slither Clone")
-    clock = pygame.time.Clock() # Create a clock object
+def view_zoom(snake_radius, manual_zoom_factor):
+    """Effective zoom: TARGET_VISUAL_RADIUS on screen for the snake's radius at manual zoom 1."""
+    world_radius = snake_radius if snake_radius > 1e-9 else 1e-9 # Avoid division by zero
+    return (TARGET_VISUAL_RADIUS / world_radius) * manual_zoom_factor
 
-    # Center of the screen - useful for camera calculations and drawing
-    screen_center = pygame.Vector2(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+def draw_game_over(surface, font, screen_center):
+    game_over_surface = font.render("GAME OVER!", True, GAME_OVER_COLOR)
+    surface.blit(game_over_surface, game_over_surface.get_rect(center=screen_center))
 
-    # Font for displaying score/length
+def load_fonts():
+    """(HUD font, game over font), falling back to pygame's default font."""
     try:
-        ui_font = pygame.font.SysFont("Arial", 20) # Slightly smaller font
-        game_over_font = pygame.font.SysFont("Arial", 72) # Larger font for game over message
+        return pygame.font.SysFont("Arial", 20), pygame.font.SysFont("Arial", 72)
     except pygame.error:
         print("Warning: System font 'Arial' not found, using default font.")
-        ui_font = pygame.font.Font(None, 24) # Default font
-        game_over_font = pygame.font.Font(None, 80) # Larger default font for game over message
+        return pygame.font.Font(None, 24), pygame.font.Font(None, 80)
 
-    # Create the player snake at world position (0, 0)
-    # Its screen position will be handled by the camera
-    player_snake = Snake(0, 0)
-    food_manager = FoodManager() # Create the food manager
+class GameScreen:
+    """The window and everything drawn on it, shared by main() and main_threaded().
 
-    manual_zoom_factor = 1.0 # Start at 1.0 manual zoom
-    game_state = "playing" # Initial game state
-    snake_alive = True
+    The two loops differ only in where a frame's snake and food come from: the
+    live Simulation, or the RenderState the worker thread last published.
+    """
 
-    # Game loop
-    running = True
-    while running:
-        # Event handling
+    def __init__(self, pyramid, timer, timings_path=None):
+        # Set up the display
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Slither Clone")
+        self.clock = pygame.time.Clock() # Create a clock object
+        # Center of the screen - useful for camera calculations and drawing
+        self.screen_center = pygame.Vector2(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        # Fonts for the HUD and the game over message
+        self.ui_font, self.game_over_font = load_fonts()
+        self.hud = Hud(self.ui_font, TEXT_COLOR)
+        self.minimap = Minimap(pyramid, world_boundary_rect)
+        self.timer = timer
+        self.timings_path = timings_path
+        self.manual_zoom_factor = 1.0 # Start at 1.0 manual zoom
+
+    def handle_events(self, playing, toggle_controller):
+        """Handles this frame's events; returns False once the window is closed.
+
+        toggle_controller() switches between player and AI control and returns
+        whether the AI steers now.
+        """
+        timer = self.timer
+        running = True
+        timer.start("events")
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == TIMING_OVERLAY_KEY:
+                    print(f"Frame timing {'enabled' if timer.toggle() else 'disabled'}")
+                elif event.key == TIMING_EXPORT_KEY:
+                    export_path = self.timings_path or DEFAULT_TIMINGS_PATH
+                    timer.export(export_path)
+                    print(f"Wrote {len(timer.records)} frame records to {export_path}")
             # Only handle game input if playing
-            if game_state == "playing":
+            if playing:
                 if event.type == pygame.MOUSEWHEEL: # Handle scroll wheel
                     # Increase/decrease zoom factor
-                    manual_zoom_factor += event.y * ZOOM_SENSITIVITY
+                    manual_zoom_factor = self.manual_zoom_factor + event.y * ZOOM_SENSITIVITY
                     # Clamp zoom factor within limits
-                    manual_zoom_factor = max(MIN_MANUAL_ZOOM, min(MAX_MANUAL_ZOOM, manual_zoom_factor))
+                    self.manual_zoom_factor = max(MIN_MANUAL_ZOOM, min(MAX_MANUAL_ZOOM, manual_zoom_factor))
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 3:  # Right mouse button
-                        is_ai = player_snake.toggle_controller()
-                        print(f"Switched to {'AI' if is_ai else 'Player'} control mode")
+                        print(f"Switched to {'AI' if toggle_controller() else 'Player'} control mode")
             # Allow closing window even when game over
+        timer.stop("events")
+        return running
 
-        # --- Update Phase ---
-        if snake_alive:
-            player_snake.move(screen_center)
-            food_manager.update(player_snake.head_pos, player_snake.radius) # Update food positions (magnet effect)
-
-            # Check for food collisions
-            eaten_food_index = food_manager.check_collision(player_snake.head_pos, player_snake.radius)
-            if eaten_food_index is not None:
-                eaten_food = food_manager.remove_food(eaten_food_index)
-                if eaten_food:
-                    player_snake.grow(eaten_food.value)
-                # Consider spawning new food here if desired
-                # food_manager.spawn_one_food()
-
-            # Check for boundary collisions
-            if not world_boundary_rect.collidepoint(player_snake.head_pos.x, player_snake.head_pos.y):
-                game_state = "game_over"
-                snake_alive = False
-                print("GAME OVER - Hit Boundary") # Console message
+    def effective_zoom(self, snake):
+        return view_zoom(snake.radius, self.manual_zoom_factor)
 
-        # --- Drawing Phase ---
+    def draw(self, snake, food, food_count, game_state, snake_alive, alpha, minimap_counts=None,
+             pyramid_version=None):
+        """Draws one frame around the snake's head interpolated by alpha, then flips the display.
+
+        food is drawn through FoodManager.draw's signature, so it can be the
+        FoodManager itself or a FoodFrame. minimap_counts and pyramid_version
+        stand in for the pyramid when it belongs to another thread.
+        """
+        timer, screen, screen_center = self.timer, self.screen, self.screen_center
         # Calculate effective zoom to achieve TARGET_VISUAL_RADIUS at manual_zoom=1
-        # effective_zoom = (TARGET_VISUAL_RADIUS / world_radius) * manual_zoom
-        world_radius = player_snake.radius if player_snake.radius > 1e-9 else 1e-9 # Avoid division by zero
-        effective_zoom = (TARGET_VISUAL_RADIUS / world_radius) * manual_zoom_factor
+        effective_zoom = self.effective_zoom(snake)
 
-        # Remove camera_offset, pass snake_head_pos to draw functions
-        snake_head_pos = player_snake.head_pos
+        # Camera follows the head interpolated between the last two ticks
+        snake_head_pos = snake.interpolated_head(alpha)
 
-        draw_background(screen, snake_head_pos, screen_center, SCREEN_WIDTH, SCREEN_HEIGHT, effective_zoom)
-        draw_boundary(screen, world_boundary_rect, snake_head_pos, screen_center, effective_zoom)
+        timer.start("draw")
+        with timer.section("draw.background"):
+            draw_background(screen, snake_head_pos, screen_center, SCREEN_WIDTH, SCREEN_HEIGHT, effective_zoom)
+        with timer.section("draw.boundary"):
+            draw_boundary(screen, world_boundary_rect, snake_head_pos, screen_center, effective_zoom)
 
         # Draw food and snake only if snake is alive
         if snake_alive:
-            food_manager.draw(screen, snake_head_pos, screen_center, effective_zoom)
-            player_snake.draw(screen, screen_center, effective_zoom)
-
-        # Calculate area bounds for display
-        segment_area = math.pi * player_snake.radius**2
-        lower_bound = math.floor(player_snake.length) * segment_area # Use floor length for bounds
-        upper_bound = math.ceil(player_snake.length) * segment_area # Use ceil length for bounds
-
-        # Get food count
-        food_count = len(food_manager.foods)
-
-        # Draw UI Text (with area bounds and food count)
-        info_text_line1 = f"Weight: {player_snake.weight:.0f} (Radius: {player_snake.radius:.2f}, Length: {player_snake.length:d})"
-        info_text_line2 = f"Bounds: [{lower_bound:.1f} - {upper_bound:.1f}] Zoom: {manual_zoom_factor:.2f}"
-        info_text_line3 = f"Food Count: {food_count}"
+            with timer.section("draw.food"):
+                food.draw(screen, snake_head_pos, screen_center, effective_zoom, alpha)
+            with timer.section("draw.snake"):
+                snake.draw(screen, screen_center, effective_zoom, snake_head_pos, alpha)
 
-        text_surface1 = ui_font.render(info_text_line1, True, TEXT_COLOR)
-        text_rect1 = text_surface1.get_rect()
-        text_rect1.topright = (SCREEN_WIDTH - 10, 10)
+        timer.start("draw.hud")
 
-        text_surface2 = ui_font.render(info_text_line2, True, TEXT_COLOR)
-        text_rect2 = text_surface2.get_rect()
-        text_rect2.topright = (SCREEN_WIDTH - 10, text_rect1.bottom + 2)
+        # Draw UI Text (with area bounds and food count); lines whose text is unchanged reuse their surfaces
+        hud_bottom = self.hud.draw(screen, hud_lines(snake, self.manual_zoom_factor, food_count))
 
-        text_surface3 = ui_font.render(info_text_line3, True, TEXT_COLOR)
-        text_rect3 = text_surface3.get_rect()
-        text_rect3.topright = (SCREEN_WIDTH - 10, text_rect2.bottom + 2) # Position below line 2
-
-        screen.blit(text_surface1, text_rect1)
-        screen.blit(text_surface2, text_rect2)
-        screen.blit(text_surface3, text_rect3) # Blit the third line
+        # Minimap of pellet density below the text
+        self.minimap.draw(screen, snake_head_pos, (SCREEN_WIDTH - HUD_MARGIN, hud_bottom + HUD_MARGIN),
+                          minimap_counts, pyramid_version)
 
         # Draw Game Over message if applicable
         if game_state == "game_over":
-            game_over_text = "GAME OVER!"
-            game_over_surface = game_over_font.render(game_over_text, True, GAME_OVER_COLOR)
-            game_over_rect = game_over_surface.get_rect(center=screen_center)
-            screen.blit(game_over_surface, game_over_rect)
+            draw_game_over(screen, self.game_over_font, screen_center)
+
+        # Timing overlay sits at the top left, opposite the HUD text
+        timer.draw_overlay(screen, self.ui_font)
+        timer.stop("draw.hud")
+        timer.stop("draw")
 
         # Update the display
         pygame.display.flip()
 
-        # Cap the frame rate
-        clock.tick(FPS)
+    def close(self, recorder=None, record_path=None):
+        """Writes the timings and closes the input log, if either was asked for, then quits pygame."""
+        if self.timings_path:
+            self.timer.export(self.timings_path)
+            print(f"Wrote {len(self.timer.records)} frame records to {self.timings_path}")
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.ticks} ticks to {record_path}")
+        pygame.quit()
 
-    # Quit Pygame
-    pygame.quit()
+def start_recording(simulation, record_path):
+    """An InputRecorder writing the simulation's per-tick inputs to record_path, or None."""
+    if not record_path:
+        return None
+    recorder = simulation.recorder = InputRecorder(record_path, simulation)
+    print(f"Recording inputs to {record_path} (seed {simulation.seed})")
+    return recorder
+
+def main(timings_path=None, seed=None, record_path=None, fps=FPS, tick_rate=TICK_RATE, chunked_food=False):
+    # Initialize Pygame
+    pygame.init()
+
+    # Create the simulation (player snake at world position (0, 0) plus food)
+    # Its screen position will be handled by the camera
+    # Timing starts enabled when an export path is given, otherwise toggle it with F3
+    timer = FrameTimer(enabled=timings_path is not None)
+    simulation = Simulation(PlayerController, (SCREEN_WIDTH, SCREEN_HEIGHT), timer, seed, chunked_food=chunked_food)
+    game_screen = GameScreen(simulation.food_manager.pyramid, timer, timings_path)
+    recorder = start_recording(simulation, record_path)
+
+    # Fixed-timestep state: real time not yet simulated, in seconds
+    tick_seconds = 1.0 / tick_rate
+    accumulator = tick_seconds # Run the first tick straight away
+    game_screen.clock.tick()
+
+    # Game loop
+    running = True
+    while running:
+        timer.begin_frame()
+        # Event handling
+        running = game_screen.handle_events(simulation.game_state == "playing",
+                                            lambda: simulation.player_snake.toggle_controller())
+
+        # --- Update Phase ---
+        # Run as many fixed ticks as real time has accumulated, up to the catch-up cap
+        was_alive = simulation.snake_alive
+        simulation.zoom = game_screen.manual_zoom_factor
+        ticks_this_frame = 0
+        with timer.section("update"):
+            while accumulator >= tick_seconds and ticks_this_frame < MAX_CATCH_UP_TICKS:
+                simulation.step()
+                accumulator -= tick_seconds
+                ticks_this_frame += 1
+        if accumulator >= tick_seconds:
+            accumulator %= tick_seconds # Too far behind: drop the backlog instead of spiralling
+        if was_alive and not simulation.snake_alive:
+            print("GAME OVER - Hit Boundary") # Console message
+
+        # --- Drawing Phase ---
+        # How far rendering sits between the last two ticks
+        game_screen.draw(simulation.player_snake, simulation.food_manager, simulation.food_manager.count,
+                         simulation.game_state, simulation.snake_alive, accumulator / tick_seconds)
+
+        timer.end_frame()
+
+        # Cap the frame rate; the real time elapsed feeds the simulation
+        accumulator += game_screen.clock.tick(fps) / 1000.0
+
+    game_screen.close(recorder, record_path)
     sys.exit()
 
+def main_threaded(timings_path=None, seed=None, record_path=None, fps=FPS, tick_rate=TICK_RATE,
+                  chunked_food=False):
+    """The game with the simulation on a worker thread; this thread only handles events and draws.
+
+    Each frame draws the latest RenderState the worker published, interpolated
+    by how far real time has moved toward its next tick, and queues the mouse
+    and zoom for the worker. Timing sections cover this thread only.
+    """
+    pygame.init()
+    timer = FrameTimer(enabled=timings_path is not None)
+    # The worker gets its own (disabled) timer: FrameTimer is not shared across threads
+    simulation = Simulation(InputController, (SCREEN_WIDTH, SCREEN_HEIGHT), None, seed, chunked_food=chunked_food)
+    game_screen = GameScreen(simulation.food_manager.pyramid, timer, timings_path)
+    recorder = start_recording(simulation, record_path)
+    worker = SimulationThread(simulation, tick_rate)
+    worker.start()
+
+    def toggle_controller():
+        worker.inputs.push("toggle")
+        return not worker.state.snake.is_ai_controlled # Applied by the worker on its next tick
+
+    was_alive = True
+    running = True
+    while running:
+        timer.begin_frame()
+        state = worker.state # The published front state; the worker only ever replaces it
+        running = game_screen.handle_events(state.game_state == "playing", toggle_controller)
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        worker.inputs.push("steer", mouse_x, mouse_y, pygame.mouse.get_pressed()[0],
+                           game_screen.manual_zoom_factor, game_screen.effective_zoom(state.snake))
+        if worker.error is not None:
+            raise worker.error
+        if was_alive and not state.snake_alive:
+            print("GAME OVER - Hit Boundary")
+        was_alive = state.snake_alive
+
+        # How far real time has moved from this state toward the worker's next tick
+        alpha = min(1.0, (time.perf_counter() - state.published_at) / worker.tick_seconds)
+        game_screen.draw(state.snake, state.food, state.food.count, state.game_state, state.snake_alive, alpha,
+                         state.minimap_counts, state.pyramid_version)
+
+        timer.end_frame()
+        game_screen.clock.tick(fps)
+
+    worker.stop()
+    game_screen.close(recorder, record_path)
+    sys.exit()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Slither Clone")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation only: no window, no rendering, no frame cap")
+    parser.add_argument("--steps", type=int, default=None, help="headless: number of ticks to run")
+    parser.add_argument("--seconds", type=float, default=None, help="headless: wall-clock budget")
+    parser.add_argument("--timings", default=None, metavar="PATH",
+                        help="record per-phase frame timings and write them to PATH (.csv or .json) on exit")
+    parser.add_argument("--fps", type=int, default=FPS, help="render frame cap, 0 for uncapped")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="simulation ticks per second")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible run")
+    parser.add_argument("--record", default=None, metavar="PATH", help="record per-tick inputs to PATH")
+    parser.add_argument("--replay", default=None, metavar="PATH",
+                        help="re-run a recorded input log headless and check its final state hash")
+    parser.add_argument("--chunked-food", action="store_true",
+                        help="generate food lazily in chunks around the snake instead of all at startup")
+    parser.add_argument("--sim-thread", action="store_true",
+                        help="run the simulation on a worker thread, overlapping it with rendering")
+    return parser.parse_args(argv)
+
+def main_replay(path):
+    """Replays an input log at maximum speed and reports whether the final state matches."""
+    stats = replay(path)
+    print(f"Replayed {stats['ticks']} ticks in {stats['seconds']:.2f}s ({stats['ticks_per_second']:.1f} ticks/s)")
+    print(f"State hash {stats['state_hash']} {'matches' if stats['matches'] else 'DOES NOT match'} the recording")
+    return stats
+
+def main_headless(steps=None, seconds=None, timings_path=None, seed=None, chunked_food=False):
+    """Runs the AI-driven simulation uncapped and prints ticks per second."""
+    if steps is None and seconds is None:
+        seconds = 10.0
+    timer = FrameTimer(enabled=timings_path is not None)
+    stats = run_headless(steps=steps, duration=seconds, screen_size=(SCREEN_WIDTH, SCREEN_HEIGHT), timer=timer,
+                         seed=seed, chunked_food=chunked_food)
+    print(f"Ticks: {stats['ticks']} in {stats['seconds']:.2f}s "
+          f"({stats['ticks_per_second']:.1f} ticks/s, setup {stats['setup_seconds']:.2f}s)")
+    print(f"Deaths: {stats['deaths']} Final weight: {stats['final_weight']:.0f} Food count: {stats['food_count']}")
+    if timings_path:
+        for line in timer.overlay_lines():
+            print(line)
+        timer.export(timings_path)
+    return stats
+
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    args = parse_args()
+    if args.replay:
+        sys.exit(0 if main_replay(args.replay)["matches"] else 1)
+    elif args.headless:
+        main_headless(args.steps, args.seconds, args.timings, args.seed, args.chunked_food)
+    elif args.sim_thread:
+        main_threaded(args.timings, args.seed, args.record, args.fps, args.tick_rate, args.chunked_food)
+    else:
+        main(args.timings, args.seed, args.record, args.fps, args.tick_rate, args.chunked_food) 
\ No newline at end of file
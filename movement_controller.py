@@ -1,6 +1,8 @@
 import pygame
 import math
 import random
+import time
+import numpy as np
 
 # Movement Constants
 SNAKE_SPEED = 1
@@ -8,14 +10,34 @@ BOOST_SPEED = 4
 ROTATION_SPEED = 50
 ANGLE_TOLERANCE = 0.5
 MAX_MOUSE_MOVEMENT_SPEED = 100.0  # Maximum pixels per frame the mouse can move
+DEFAULT_SCREEN_SIZE = (1920, 1080)  # Virtual screen used when there is no display (headless)
+# Foraging AI Constants
+FORAGE_BIN_SIZE = 50 # Food is scored per density pyramid bin at least this many world units across
+FORAGE_RADIUS = 400 # World units around the head considered when planning
+FORAGE_MIN_DISTANCE = 100 # Closer bins are skipped: the snake would only circle them
+FORAGE_EDGE_MARGIN = 150 # Targets stay this far inside the world boundary
+FORAGE_HEADING_BONUS = 1.0 # Extra weight for food straight ahead over food behind
+FORAGE_STEER_DISTANCE = 100 # Virtual mouse distance from the screen center when steering at a target
+THINK_BUDGET_SECONDS = 0.002 # Wall-clock time ThinkScheduler spends re-planning per tick
+
+def current_screen_size():
+    """Returns the display size, or the default virtual screen size when headless."""
+    screen = pygame.display.get_surface() if pygame.display.get_init() else None
+    if screen is None:
+        return DEFAULT_SCREEN_SIZE
+    return screen.get_size()
 
 class MovementController:
     """Base class for snake movement controllers."""
     
-    def __init__(self, snake):
+    def __init__(self, snake, screen_size=None, rng=None):
         """Initialize the controller with a reference to the snake."""
         self.snake = snake
         self.boosting = False
+        # Controller-owned RNG so seeded runs are reproducible
+        self.rng = rng if rng is not None else random.Random()
+        # Screen the virtual mouse lives on; fixed here so headless runs never touch the display
+        self.screen_size = tuple(screen_size) if screen_size is not None else current_screen_size()
         
         # Track both desired and actual mouse positions
         self.desired_mouse_pos = pygame.Vector2(0, 0)
@@ -102,11 +124,53 @@ class MovementController:
         raise NotImplementedError("Subclasses must implement update_desired_position")
 
 
+def rotate_to_target_batch(dir_xs, dir_ys, target_xs, target_ys):
+    """Vectorized _rotate_to_target: turns each direction toward its target, in place.
+
+    Targets need not be normalized; zero-length targets leave their direction alone,
+    as in move().
+    """
+    lengths = np.hypot(target_xs, target_ys)
+    valid = lengths > 0
+    lengths[~valid] = 1
+    target_xs = target_xs / lengths
+    target_ys = target_ys / lengths
+    # Vector2.angle_to is the plain difference of the two polar angles, not wrapped into
+    # +-180 degrees, so a small turn across the wrap reads as a full ROTATION_SPEED turn.
+    # Reproduce that rather than "fixing" it, so batch and scalar snakes steer alike.
+    angle_magnitude = np.abs(np.degrees(np.arctan2(target_ys, target_xs) - np.arctan2(dir_ys, dir_xs)))
+    cross_product = dir_xs * target_ys - dir_ys * target_xs
+    turning = valid & (angle_magnitude > ANGLE_TOLERANCE) & (cross_product != 0)
+    rotation = np.radians(np.copysign(np.minimum(angle_magnitude[turning], ROTATION_SPEED), cross_product[turning]))
+    cos, sin = np.cos(rotation), np.sin(rotation)
+    old_xs, old_ys = dir_xs[turning], dir_ys[turning]
+    dir_xs[turning] = old_xs * cos - old_ys * sin
+    dir_ys[turning] = old_xs * sin + old_ys * cos
+
+
+def move_batch(head_xs, head_ys, dir_xs, dir_ys, target_xs, target_ys, boosting, bounds=None):
+    """Advances a batch of snake heads one tick in one NumPy pass, updating the arrays in place.
+
+    The vectorized counterpart of move() minus the body update: heading rotation toward
+    each target vector (actual mouse position minus screen center), boost speed and head
+    integration. With bounds as (left, top, right, bottom) it returns a mask of the heads
+    still inside the world (same half-open test as Rect.collidepoint); otherwise all True.
+    """
+    rotate_to_target_batch(dir_xs, dir_ys, target_xs, target_ys)
+    speeds = np.where(boosting, BOOST_SPEED, SNAKE_SPEED)
+    head_xs += dir_xs * speeds
+    head_ys += dir_ys * speeds
+    if bounds is None:
+        return np.ones(len(head_xs), dtype=bool)
+    left, top, right, bottom = bounds
+    return (head_xs >= left) & (head_xs < right) & (head_ys >= top) & (head_ys < bottom)
+
+
 class PlayerController(MovementController):
     """Controller that uses the real mouse for input."""
     
-    def __init__(self, snake):
-        super().__init__(snake)
+    def __init__(self, snake, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
         # Initialize with current true mouse position
         mouse_pos = pygame.mouse.get_pos()
         self.desired_mouse_pos = pygame.Vector2(mouse_pos)
@@ -132,33 +196,31 @@ class PlayerController(MovementController):
 class AIController(MovementController):
     """Controller that uses a virtual mouse for AI-controlled movement."""
     
-    def __init__(self, snake):
-        super().__init__(snake)
+    def __init__(self, snake, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
         # Initialize virtual mouse at screen center
-        screen = pygame.display.get_surface()
         center_pos = pygame.Vector2(
-            screen.get_width() // 2,
-            screen.get_height() // 2
+            self.screen_size[0] // 2,
+            self.screen_size[1] // 2
         )
         self.desired_mouse_pos = center_pos.copy()
         self.actual_mouse_pos = center_pos.copy()
         
         # AI behavior timers and state
         self.target_change_timer = 0
-        self.target_change_interval = random.randint(30, 120)
+        self.target_change_interval = self.rng.randint(30, 120)
         self.boost_timer = 0
-        self.boost_interval = random.randint(180, 360)
+        self.boost_interval = self.rng.randint(180, 360)
         self.boost_duration = 0
     
     def _set_random_target(self):
         """Set a new random target mouse position on screen."""
-        screen = pygame.display.get_surface()
-        screen_width, screen_height = screen.get_size()
+        screen_width, screen_height = self.screen_size
         
         # Keep targets away from edges
         margin = 100
-        x = random.uniform(margin, screen_width - margin)
-        y = random.uniform(margin, screen_height - margin)
+        x = self.rng.uniform(margin, screen_width - margin)
+        y = self.rng.uniform(margin, screen_height - margin)
         
         self.desired_mouse_pos = pygame.Vector2(x, y)
     
@@ -169,13 +231,18 @@ class AIController(MovementController):
     
     def update_ai(self):
         """Update AI decisions including movement target and boost."""
+        self._update_target()
+        self._update_boost()
+
+    def _update_target(self):
         # Update target change timer
         self.target_change_timer += 1
         if self.target_change_timer >= self.target_change_interval:
             self._set_random_target()
             self.target_change_timer = 0
-            self.target_change_interval = random.randint(30, 120)
-        
+            self.target_change_interval = self.rng.randint(30, 120)
+
+    def _update_boost(self):
         # Update boost timer
         self.boost_timer += 1
         
@@ -187,10 +254,103 @@ class AIController(MovementController):
         # Otherwise, consider starting a boost
         elif self.boost_timer >= self.boost_interval:
             # 70% chance to start boosting when timer hits
-            if random.random() < 0.7:
+            if self.rng.random() < 0.7:
                 self.start_boost()
-                self.boost_duration = random.randint(15, 45)
+                self.boost_duration = self.rng.randint(15, 45)
             
             # Reset boost timer regardless of decision
             self.boost_timer = 0
-            self.boost_interval = random.randint(180, 360) 
\ No newline at end of file
+            self.boost_interval = self.rng.randint(180, 360) 
+
+class ForagingController(AIController):
+    """AI that steers toward nearby dense food and away from the world edge.
+
+    plan() picks a world-space target from the food density pyramid around the
+    head, so it reads a small window of bin counts instead of scanning pellets.
+    It is meant to be called now and then by a ThinkScheduler; between plans
+    the snake keeps steering at its last target. Until its first plan it
+    wanders like AIController. Boosting is AIController's.
+    """
+
+    def __init__(self, snake, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
+        self.target = None # World position being steered at, or None before the first plan
+        self.plans = 0
+
+    def plan(self, food_manager, boundary_rect):
+        """Re-targets at the best-scoring food bin within FORAGE_RADIUS."""
+        head = self.snake.head_pos
+        direction = self.snake.direction
+        safe_rect = boundary_rect.inflate(-2 * FORAGE_EDGE_MARGIN, -2 * FORAGE_EDGE_MARGIN)
+        pyramid = food_manager.pyramid
+        level = pyramid.level_for(1.0, FORAGE_BIN_SIZE)
+        bin_size = pyramid.bin_size(level)
+        counts, left, top = pyramid.region(level, head.x - FORAGE_RADIUS, head.y - FORAGE_RADIUS,
+                                           head.x + FORAGE_RADIUS, head.y + FORAGE_RADIUS)
+        self.plans += 1
+        if counts.size:
+            center_xs = left + (np.arange(counts.shape[1]) + 0.5) * bin_size
+            center_ys = top + (np.arange(counts.shape[0]) + 0.5) * bin_size
+            dxs = center_xs[None, :] - head.x
+            dys = center_ys[:, None] - head.y
+            distances = np.sqrt(dxs * dxs + dys * dys)
+            # Near food beats far food; food ahead beats food that needs a U-turn
+            facing = (dxs * direction.x + dys * direction.y) / np.maximum(distances, 1e-9)
+            scores = counts / (1 + distances / bin_size) * (1 + FORAGE_HEADING_BONUS * (1 + facing) / 2)
+            unsafe = ((center_xs[None, :] < safe_rect.left) | (center_xs[None, :] > safe_rect.right)
+                      | (center_ys[:, None] < safe_rect.top) | (center_ys[:, None] > safe_rect.bottom)
+                      | (distances > FORAGE_RADIUS) | (distances < FORAGE_MIN_DISTANCE))
+            scores[unsafe] = -1.0
+            best = int(np.argmax(scores))
+            if scores.flat[best] > 0:
+                row, column = divmod(best, counts.shape[1])
+                self.target = pygame.Vector2(float(center_xs[column]), float(center_ys[row]))
+                return
+        # Nothing worth eating in reach: carry on ahead, kept inside the safe rect
+        ahead = head + direction * FORAGE_RADIUS
+        self.target = pygame.Vector2(min(max(ahead.x, safe_rect.left), safe_rect.right),
+                                     min(max(ahead.y, safe_rect.top), safe_rect.bottom))
+
+    def _update_target(self):
+        if self.target is None:
+            super()._update_target()
+            return
+        steer = self.target - self.snake.head_pos
+        # Once there, hold the heading until the next plan rather than orbit the spot
+        if steer.length_squared() > FORAGE_BIN_SIZE * FORAGE_BIN_SIZE:
+            screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+            self.desired_mouse_pos = screen_center + steer.normalize() * FORAGE_STEER_DISTANCE
+
+
+class ThinkScheduler:
+    """Time-slices ForagingController.plan() calls across many snakes.
+
+    Each tick it re-plans controllers round-robin, starting where the last tick
+    stopped, until budget_seconds of wall-clock time is spent (at least one plan
+    per tick, so everyone is reached eventually). The rest keep their last
+    target, so the cost per tick stays flat however many bots there are.
+    Wall-clock budgets make runs timing-dependent; pass plans_per_tick instead
+    for a fixed number of plans per tick and reproducible seeded runs.
+    """
+
+    def __init__(self, budget_seconds=THINK_BUDGET_SECONDS, plans_per_tick=None):
+        self.budget_seconds = budget_seconds
+        self.plans_per_tick = plans_per_tick
+        self.cursor = 0 # Index of the next controller to plan
+        self.last_plans = 0
+
+    def run(self, controllers, food_manager, boundary_rect):
+        """Plans as many controllers as the budget allows this tick; returns how many."""
+        count = len(controllers)
+        planned = 0
+        deadline = time.perf_counter() + self.budget_seconds
+        limit = count if self.plans_per_tick is None else min(count, self.plans_per_tick)
+        while planned < limit:
+            self.cursor %= count
+            controllers[self.cursor].plan(food_manager, boundary_rect)
+            self.cursor += 1
+            planned += 1
+            if self.plans_per_tick is None and time.perf_counter() >= deadline:
+                break
+        self.last_plans = planned
+        return planned
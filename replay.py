@@ -0,0 +1,121 @@
+"""Compact per-tick input recording and fast headless replay.
+
+A log is a fixed header followed by one packed record per simulated tick:
+
+    header: magic, version, seed, initial food count, screen size, flags
+            (bit 0 = chunked food), tick count and the final state hash
+            (filled in on close)
+    record: steering mouse position (2 x float64), flags (bit 0 = boost),
+            manual zoom (float32)  -> 21 bytes per tick
+
+The steering position recorded is the controller's rate-limited mouse
+position, so replay reproduces the snake's heading exactly whatever
+controller produced it.
+"""
+import struct
+import time
+import numpy as np
+import pygame
+from movement_controller import MovementController
+from simulation import Simulation
+
+# Log Format Constants
+LOG_MAGIC = b"SLRP"
+LOG_VERSION = 2
+HEADER_FORMAT = "<4sHQIHHBI32s" # magic, version, seed, food count, screen w/h, flags, ticks, sha256 digest
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_DTYPE = np.dtype([("x", "<f8"), ("y", "<f8"), ("flags", "u1"), ("zoom", "<f4")]) # Packed, 21 bytes
+FLAG_BOOST = 1
+HEADER_FLAG_CHUNKED_FOOD = 1
+
+class InputRecorder:
+    """Appends one record per tick for a Simulation; attach with simulation.recorder = recorder."""
+
+    def __init__(self, path, simulation):
+        self.simulation = simulation
+        self.ticks = 0
+        self.file = open(path, "wb")
+        self._write_header(b"\0" * 32)
+
+    def _write_header(self, digest):
+        simulation = self.simulation
+        self.file.write(struct.pack(
+            HEADER_FORMAT, LOG_MAGIC, LOG_VERSION, simulation.seed,
+            simulation.food_manager.initial_food_count, simulation.screen_size[0],
+            simulation.screen_size[1], HEADER_FLAG_CHUNKED_FOOD if simulation.chunked_food else 0,
+            self.ticks, digest))
+
+    def record(self, controller, zoom):
+        position = controller.actual_mouse_pos
+        flags = FLAG_BOOST if controller.boosting else 0
+        self.file.write(struct.pack("<ddBf", position.x, position.y, flags, zoom))
+        self.ticks += 1
+
+    def close(self):
+        """Writes the tick count and final state hash into the header and closes the log."""
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self._write_header(bytes.fromhex(self.simulation.state_hash()))
+        self.file.close()
+
+class InputLog:
+    """A recorded log loaded in one read; records is a NumPy structured array."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, food_count, width, height, flags, ticks, digest = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f"{path} is not a version {LOG_VERSION} input log")
+        self.seed = seed
+        self.initial_food_count = food_count
+        self.screen_size = (width, height)
+        self.chunked_food = bool(flags & HEADER_FLAG_CHUNKED_FOOD)
+        self.final_hash = digest.hex() if any(digest) else None
+        self.records = np.frombuffer(data, dtype=RECORD_DTYPE, offset=HEADER_SIZE)
+        if len(self.records) != ticks and self.final_hash is not None:
+            raise ValueError(f"{path} is truncated: header says {ticks} ticks, found {len(self.records)}")
+
+class ReplayController(MovementController):
+    """Controller that feeds recorded steering and boost back in, one record per move."""
+
+    def __init__(self, snake, records, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
+        self.records = records
+        self.index = 0
+
+    def update_desired_position(self):
+        record = self.records[min(self.index, len(self.records) - 1)]
+        self.index += 1
+        self.desired_mouse_pos = pygame.Vector2(float(record["x"]), float(record["y"]))
+        self.boosting = bool(record["flags"] & FLAG_BOOST)
+
+    def _limit_mouse_movement(self):
+        # The recorded position is already the rate-limited one
+        self.actual_mouse_pos = self.desired_mouse_pos.copy()
+
+def replay(path):
+    """Re-runs a log headless and uncapped; returns stats including whether the hash matched."""
+    log = InputLog(path)
+    records = log.records
+
+    def controller_class(snake, screen_size=None, rng=None):
+        return ReplayController(snake, records, screen_size, rng)
+
+    simulation = Simulation(controller_class, log.screen_size, seed=log.seed,
+                            initial_food_count=log.initial_food_count, chunked_food=log.chunked_food)
+    start = time.perf_counter()
+    for record in records:
+        simulation.zoom = float(record["zoom"])
+        simulation.step()
+    elapsed = time.perf_counter() - start
+    state_hash = simulation.state_hash()
+    return {
+        "ticks": len(records),
+        "seconds": elapsed,
+        "ticks_per_second": len(records) / elapsed if elapsed > 0 else float("inf"),
+        "state_hash": state_hash,
+        "recorded_hash": log.final_hash,
+        "matches": state_hash == log.final_hash,
+    }
@@ -0,0 +1,502 @@
+"""Authoritative multiplayer server: one shared world, streamed to each client by view.
+
+Every client drives one snake with its mouse position (in its own screen
+coordinates, like PlayerController) and a boost flag. The server runs the world
+at a fixed tick rate with the batched Arena food pass. After each tick, each
+client gets a snapshot holding only the pellets and snake segments inside its
+view rect, using the same culling rule as FoodManager.draw. That keeps bandwidth
+and the per-client encoding cost tied to the view size, not the world size.
+
+Snapshots are deltas against the last snapshot the client acknowledged. Pellets
+are keyed by their stable FoodManager id, snakes by their client id. Until an
+ack arrives, updates are sent again against the same base. If a client never
+acks, or its base has fallen out of HISTORY_LENGTH, it gets a full snapshot
+(base tick 0).
+
+Wire format: TCP, little-endian. Every message is a FRAME_FORMAT header
+(payload length, message type) followed by its payload:
+
+    client -> server  JOIN      screen width, height
+                      INPUT     acked tick, mouse x, mouse y, boost, zoom
+    server -> client  WELCOME   client id, tick rate
+                      SNAPSHOT  tick, base tick, own head x/y and weight, then
+                                removed pellet ids, upserted pellets (ids, xs, ys),
+                                removed snake ids, upserted snakes (id, radius,
+                                segment count, xs, ys each)
+
+Run `python server.py --bots 8 --ticks 600` to serve simulated clients over
+loopback and print the bandwidth each one used.
+"""
+import argparse
+import asyncio
+import random
+import struct
+import time
+from collections import OrderedDict
+import numpy as np
+import pygame
+from arena import spawn_snake, feed_snakes, crashed_snakes
+from collision import BodyIndex
+from food import FoodManager, ChunkedFoodManager, INITIAL_FOOD_COUNT
+from movement_controller import MovementController, DEFAULT_SCREEN_SIZE
+from simulation import world_boundary_rect
+
+# Server Constants
+SERVER_TICK_RATE = 30 # World ticks (and snapshots) per second
+HISTORY_LENGTH = 64 # Sent snapshots kept per client as possible delta bases
+MAX_BUFFERED_BYTES = 1 << 18 # Skip a client's snapshot while this much is still unsent
+MIN_VIEW_ZOOM = 1.0 # Clamp on the client zoom, which bounds the view rect (and so the bandwidth)
+MAX_VIEW_ZOOM = 100.0
+MOUSE_STEER_DISTANCE = 100 # Initial virtual mouse distance from the screen center
+BOT_ZOOM = 4.0 # Simulated clients' zoom; a real client's effective zoom starts near 20
+
+# Wire Format Constants
+FRAME_FORMAT = "<IB" # payload length, message type
+FRAME_SIZE = struct.calcsize(FRAME_FORMAT)
+MSG_JOIN = 1
+MSG_INPUT = 2
+MSG_WELCOME = 3
+MSG_SNAPSHOT = 4
+JOIN_FORMAT = "<HH" # screen width, height
+INPUT_FORMAT = "<Iff?f" # acked tick, mouse x, mouse y, boost, zoom
+WELCOME_FORMAT = "<IH" # client id, tick rate
+SNAPSHOT_HEADER_FORMAT = "<IIfff" # tick, base tick, head x, head y, weight
+SNAPSHOT_HEADER_SIZE = struct.calcsize(SNAPSHOT_HEADER_FORMAT)
+COUNTS_FORMAT = "<II" # removed count, upserted count
+COUNTS_SIZE = struct.calcsize(COUNTS_FORMAT)
+SNAKE_ENTRY_FORMAT = "<IfI" # snake id, radius, segment count
+SNAKE_ENTRY_SIZE = struct.calcsize(SNAKE_ENTRY_FORMAT)
+MAX_MESSAGE_SIZE = 1 << 24
+
+def encode_message(message_type, payload):
+    return struct.pack(FRAME_FORMAT, len(payload), message_type) + payload
+
+async def read_message(reader):
+    """Reads one framed message; returns (message type, payload bytes)."""
+    length, message_type = struct.unpack(FRAME_FORMAT, await reader.readexactly(FRAME_SIZE))
+    if length > MAX_MESSAGE_SIZE:
+        raise ConnectionError(f"message of {length} bytes exceeds MAX_MESSAGE_SIZE")
+    return message_type, await reader.readexactly(length)
+
+class NetworkController(MovementController):
+    """Controller steered by the latest client input; the mouse is still rate limited like a player's."""
+
+    def __init__(self, snake, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
+        screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.desired_mouse_pos = screen_center + snake.direction * MOUSE_STEER_DISTANCE
+        self.actual_mouse_pos = self.desired_mouse_pos.copy()
+
+    def set_input(self, mouse_x, mouse_y, boost):
+        self.desired_mouse_pos = pygame.Vector2(mouse_x, mouse_y)
+        self.boosting = bool(boost)
+
+    def update_desired_position(self):
+        pass # Set between ticks by set_input
+
+class ViewState:
+    """What one snapshot left a client seeing: pellets sorted by id, and each snake's encoded entry."""
+
+    def __init__(self, pellet_ids, pellet_xs, pellet_ys, snakes):
+        self.pellet_ids = pellet_ids
+        self.pellet_xs = pellet_xs
+        self.pellet_ys = pellet_ys
+        self.snakes = snakes
+
+EMPTY_VIEW = ViewState(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32),
+                       np.empty(0, dtype=np.float32), {})
+
+class ClientSession:
+    """Server-side state for one connected client."""
+
+    def __init__(self, client_id, snake, screen_size, writer=None):
+        self.id = client_id
+        self.snake = snake
+        self.screen_size = tuple(screen_size)
+        self.screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.zoom = MIN_VIEW_ZOOM
+        self.writer = writer
+        self.acked_tick = 0
+        self.history = OrderedDict() # tick -> ViewState of every snapshot sent
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+        self.deaths = 0
+
+    def apply_input(self, acked_tick, mouse_x, mouse_y, boost, zoom):
+        self.snake.controller.set_input(mouse_x, mouse_y, boost)
+        self.zoom = min(MAX_VIEW_ZOOM, max(MIN_VIEW_ZOOM, zoom))
+        # Acks can arrive out of date; only ever move the base forward
+        if acked_tick > self.acked_tick and acked_tick in self.history:
+            self.acked_tick = acked_tick
+
+    def view_rect(self):
+        return FoodManager.view_rect(self.snake.head_pos, self.screen_size[0], self.screen_size[1], self.zoom)
+
+class GameServer:
+    """The authoritative world plus per-client snapshot encoding.
+
+    The synchronous core (add_client, step, snapshot_for) has no networking in
+    it; start() and run() put it behind an asyncio TCP server.
+    """
+
+    def __init__(self, initial_food_count=INITIAL_FOOD_COUNT, seed=None, tick_rate=SERVER_TICK_RATE,
+                 chunked_food=False):
+        self.rng = random.Random(seed)
+        food_manager_class = ChunkedFoodManager if chunked_food else FoodManager
+        self.food_manager = food_manager_class(initial_food_count, seed)
+        self.body_index = BodyIndex()
+        self.tick_rate = tick_rate
+        self.tick_count = 0
+        self.clients = {}
+        self.next_client_id = 1
+        self.server = None
+        self.handlers = set() # Connection handler tasks, awaited on close
+        # Per-tick snake extents, shared by every client's view test
+        self._snake_ids = np.empty(0, dtype=np.int64)
+        self._snake_bounds = np.empty((0, 4))
+
+    def add_client(self, screen_size=DEFAULT_SCREEN_SIZE, writer=None):
+        snake = spawn_snake(self.rng, NetworkController, screen_size)
+        client = ClientSession(self.next_client_id, snake, screen_size, writer)
+        self.clients[client.id] = client
+        self.next_client_id += 1
+        return client
+
+    def remove_client(self, client_id):
+        self.clients.pop(client_id, None)
+
+    def step(self):
+        """Moves every client's snake, runs the batched food pass for all of them, then handles deaths."""
+        self.tick_count += 1
+        clients = list(self.clients.values())
+        if clients:
+            for client in clients:
+                client.snake.move(client.screen_center)
+            feed_snakes(self.food_manager, [client.snake for client in clients])
+
+        # Snakes running into a body or leaving the world die, dropping their mass, and respawn;
+        # the client keeps its id
+        crashed = set(crashed_snakes(self.body_index, [client.snake for client in clients]))
+        for index, client in enumerate(clients):
+            head = client.snake.head_pos
+            if index in crashed or not world_boundary_rect.collidepoint(head.x, head.y):
+                self.food_manager.drop_mass(client.snake)
+                client.snake = spawn_snake(self.rng, NetworkController, client.screen_size)
+                client.deaths += 1
+        self._update_snake_bounds()
+
+    def _update_snake_bounds(self):
+        clients = list(self.clients.values())
+        self._snake_ids = np.fromiter((client.id for client in clients), dtype=np.int64, count=len(clients))
+        self._snake_bounds = np.empty((len(clients), 4))
+        for row, client in enumerate(clients):
+            xs, ys = client.snake.body_arrays()
+            radius = client.snake.radius
+            self._snake_bounds[row] = (xs.min() - radius, ys.min() - radius, xs.max() + radius, ys.max() + radius)
+
+    def _visible_pellets(self, rect):
+        food_manager = self.food_manager
+        indices = food_manager._indices_in_rect(rect.left, rect.top, rect.right, rect.bottom)
+        ids = food_manager.ids[indices]
+        order = np.argsort(ids)
+        return (ids[order], food_manager.xs[indices[order]].astype(np.float32),
+                food_manager.ys[indices[order]].astype(np.float32))
+
+    def _visible_snakes(self, rect):
+        """Encoded entries for every snake overlapping rect, holding only its segments inside it."""
+        bounds = self._snake_bounds
+        overlapping = np.flatnonzero((bounds[:, 0] <= rect.right) & (bounds[:, 2] >= rect.left)
+                                     & (bounds[:, 1] <= rect.bottom) & (bounds[:, 3] >= rect.top))
+        entries = {}
+        for snake_id in self._snake_ids[overlapping].tolist():
+            snake = self.clients[snake_id].snake
+            radius = snake.radius
+            xs, ys = snake.body_arrays()
+            inside = ((xs >= rect.left - radius) & (xs <= rect.right + radius)
+                      & (ys >= rect.top - radius) & (ys <= rect.bottom + radius))
+            xs = xs[inside].astype(np.float32)
+            ys = ys[inside].astype(np.float32)
+            if len(xs):
+                entries[snake_id] = (struct.pack(SNAKE_ENTRY_FORMAT, snake_id, radius, len(xs))
+                                     + xs.tobytes() + ys.tobytes())
+        return entries
+
+    def snapshot_for(self, client):
+        """Encodes this tick's view for client as a delta against its acked snapshot."""
+        rect = client.view_rect()
+        ids, xs, ys = self._visible_pellets(rect)
+        snakes = self._visible_snakes(rect)
+        base_tick = client.acked_tick if client.acked_tick in client.history else 0
+        base = client.history[base_tick] if base_tick else EMPTY_VIEW
+
+        # Pellets: upsert the new and the moved, drop the ones that left the view
+        positions = np.minimum(np.searchsorted(base.pellet_ids, ids), max(len(base.pellet_ids) - 1, 0))
+        if len(base.pellet_ids):
+            unchanged = ((base.pellet_ids[positions] == ids) & (base.pellet_xs[positions] == xs)
+                         & (base.pellet_ys[positions] == ys))
+        else:
+            unchanged = np.zeros(len(ids), dtype=bool)
+        changed = ~unchanged
+        removed_pellets = np.setdiff1d(base.pellet_ids, ids, assume_unique=True)
+
+        # Snakes: whole entries, resent only when they differ from the base
+        upserted_snakes = [entry for snake_id, entry in snakes.items() if base.snakes.get(snake_id) != entry]
+        removed_snakes = np.array([snake_id for snake_id in base.snakes if snake_id not in snakes], dtype=np.uint32)
+
+        snake = client.snake
+        payload = b"".join([
+            struct.pack(SNAPSHOT_HEADER_FORMAT, self.tick_count, base_tick, snake.head_pos.x, snake.head_pos.y,
+                        snake.weight),
+            struct.pack(COUNTS_FORMAT, len(removed_pellets), int(changed.sum())),
+            removed_pellets.astype(np.int64).tobytes(),
+            ids[changed].tobytes(), xs[changed].tobytes(), ys[changed].tobytes(),
+            struct.pack(COUNTS_FORMAT, len(removed_snakes), len(upserted_snakes)),
+            removed_snakes.tobytes(),
+        ] + upserted_snakes)
+
+        client.history[self.tick_count] = ViewState(ids, xs, ys, snakes)
+        while len(client.history) > HISTORY_LENGTH:
+            client.history.popitem(last=False)
+        return payload
+
+    def tick(self):
+        """Steps the world and sends every connected client its snapshot."""
+        self.step()
+        for client in list(self.clients.values()):
+            writer = client.writer
+            if writer is None or writer.is_closing():
+                continue
+            # A client that is not keeping up skips snapshots; its next one is a delta from its ack
+            if writer.transport.get_write_buffer_size() > MAX_BUFFERED_BYTES:
+                continue
+            message = encode_message(MSG_SNAPSHOT, self.snapshot_for(client))
+            writer.write(message)
+            client.bytes_sent += len(message)
+            client.snapshots_sent += 1
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Starts accepting clients; returns the bound port."""
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle_connection(self, reader, writer):
+        client = None
+        self.handlers.add(asyncio.current_task())
+        try:
+            message_type, payload = await read_message(reader)
+            if message_type != MSG_JOIN:
+                return
+            client = self.add_client(struct.unpack(JOIN_FORMAT, payload), writer)
+            writer.write(encode_message(MSG_WELCOME, struct.pack(WELCOME_FORMAT, client.id, self.tick_rate)))
+            while True:
+                message_type, payload = await read_message(reader)
+                if message_type == MSG_INPUT:
+                    client.apply_input(*struct.unpack(INPUT_FORMAT, payload))
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass # Disconnected or sent garbage; either way the session ends
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            if client is not None:
+                self.remove_client(client.id)
+            writer.close()
+
+    async def run(self, ticks=None):
+        """Ticks at tick_rate (for `ticks` ticks, or forever), sleeping off any time left over."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+        count = 0
+        while ticks is None or count < ticks:
+            self.tick()
+            count += 1
+            next_tick += interval
+            # Always yield, so input and acks are read between ticks even when running behind
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        # Closing a connection ends its handler at EOF, which also removes the client
+        for client in list(self.clients.values()):
+            if client.writer is not None:
+                client.writer.close()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+
+def decode_snapshot(payload):
+    """Parses a SNAPSHOT payload into a dict of plain values and NumPy arrays."""
+    tick, base_tick, head_x, head_y, weight = struct.unpack_from(SNAPSHOT_HEADER_FORMAT, payload)
+    offset = SNAPSHOT_HEADER_SIZE
+    removed_count, upserted_count = struct.unpack_from(COUNTS_FORMAT, payload, offset)
+    offset += COUNTS_SIZE
+    removed_pellets = np.frombuffer(payload, np.int64, removed_count, offset)
+    offset += removed_pellets.nbytes
+    pellet_ids = np.frombuffer(payload, np.int64, upserted_count, offset)
+    offset += pellet_ids.nbytes
+    pellet_xs = np.frombuffer(payload, np.float32, upserted_count, offset)
+    offset += pellet_xs.nbytes
+    pellet_ys = np.frombuffer(payload, np.float32, upserted_count, offset)
+    offset += pellet_ys.nbytes
+
+    removed_count, upserted_count = struct.unpack_from(COUNTS_FORMAT, payload, offset)
+    offset += COUNTS_SIZE
+    removed_snakes = np.frombuffer(payload, np.uint32, removed_count, offset)
+    offset += removed_snakes.nbytes
+    snakes = {}
+    for _ in range(upserted_count):
+        snake_id, radius, count = struct.unpack_from(SNAKE_ENTRY_FORMAT, payload, offset)
+        offset += SNAKE_ENTRY_SIZE
+        xs = np.frombuffer(payload, np.float32, count, offset)
+        ys = np.frombuffer(payload, np.float32, count, offset + xs.nbytes)
+        offset += xs.nbytes + ys.nbytes
+        snakes[snake_id] = (radius, xs, ys)
+    return {
+        "tick": tick, "base_tick": base_tick, "head": (head_x, head_y), "weight": weight,
+        "removed_pellets": removed_pellets, "pellet_ids": pellet_ids, "pellet_xs": pellet_xs,
+        "pellet_ys": pellet_ys, "removed_snakes": removed_snakes, "snakes": snakes,
+    }
+
+class ClientView:
+    """A client's reconstruction of its view: pellets {id: (x, y)} and snakes {id: (radius, xs, ys)}."""
+
+    def __init__(self, pellets=None, snakes=None, head=(0.0, 0.0), weight=0.0):
+        self.pellets = pellets if pellets is not None else {}
+        self.snakes = snakes if snakes is not None else {}
+        self.head = head
+        self.weight = weight
+
+    def apply(self, snapshot):
+        """Returns the view this snapshot describes, with self as its base."""
+        pellets = dict(self.pellets)
+        for pellet_id in snapshot["removed_pellets"].tolist():
+            del pellets[pellet_id]
+        pellets.update(zip(snapshot["pellet_ids"].tolist(),
+                           zip(snapshot["pellet_xs"].tolist(), snapshot["pellet_ys"].tolist())))
+        snakes = dict(self.snakes)
+        for snake_id in snapshot["removed_snakes"].tolist():
+            del snakes[snake_id]
+        snakes.update(snapshot["snakes"])
+        return ClientView(pellets, snakes, snapshot["head"], snapshot["weight"])
+
+class SimulatedClient:
+    """Loopback client: rebuilds its view from the deltas, acks each one and wanders about."""
+
+    def __init__(self, screen_size=DEFAULT_SCREEN_SIZE, zoom=BOT_ZOOM, seed=None):
+        self.screen_size = tuple(screen_size)
+        self.zoom = zoom
+        self.rng = random.Random(seed)
+        self.mouse = pygame.Vector2(self.screen_size[0] // 2 + MOUSE_STEER_DISTANCE, self.screen_size[1] // 2)
+        self.boost = False
+        self.client_id = None
+        self.tick_rate = None
+        self.views = OrderedDict() # tick -> ClientView, kept as delta bases
+        self.latest_tick = 0
+        self.bytes_received = 0
+        self.snapshots_received = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(encode_message(MSG_JOIN, struct.pack(JOIN_FORMAT, *self.screen_size)))
+        message_type, payload = await read_message(self.reader)
+        if message_type != MSG_WELCOME:
+            raise ConnectionError(f"expected WELCOME, got message type {message_type}")
+        self.client_id, self.tick_rate = struct.unpack(WELCOME_FORMAT, payload)
+
+    @property
+    def view(self):
+        return self.views[self.latest_tick] if self.latest_tick else ClientView()
+
+    def apply_snapshot(self, payload):
+        """Rebuilds the view a snapshot describes from its base; returns its tick."""
+        snapshot = decode_snapshot(payload)
+        base_tick = snapshot["base_tick"]
+        base = self.views[base_tick] if base_tick else ClientView()
+        self.views[snapshot["tick"]] = base.apply(snapshot)
+        self.latest_tick = snapshot["tick"]
+        # Bases older than the server's history will never be referenced again
+        while len(self.views) > HISTORY_LENGTH:
+            self.views.popitem(last=False)
+        return snapshot["tick"]
+
+    def steer(self):
+        """Random wander: nudge the virtual mouse around the screen center, boosting now and then."""
+        center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        offset = (self.mouse - center).rotate(self.rng.uniform(-15, 15))
+        self.mouse = center + offset
+        self.boost = self.rng.random() < 0.05
+
+    async def run(self, snapshots):
+        """Receives `snapshots` snapshots (or until disconnected), answering each with input + ack."""
+        try:
+            for _ in range(snapshots):
+                message_type, payload = await read_message(self.reader)
+                if message_type != MSG_SNAPSHOT:
+                    continue
+                self.bytes_received += FRAME_SIZE + len(payload)
+                self.snapshots_received += 1
+                tick = self.apply_snapshot(payload)
+                self.steer()
+                self.writer.write(encode_message(MSG_INPUT, struct.pack(
+                    INPUT_FORMAT, tick, self.mouse.x, self.mouse.y, self.boost, self.zoom)))
+                await self.writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+async def run_loopback(bot_count, ticks, initial_food_count=INITIAL_FOOD_COUNT, seed=None, tick_rate=SERVER_TICK_RATE,
+                       chunked_food=False):
+    """Serves bot_count simulated clients over loopback for `ticks` ticks; returns (server, clients)."""
+    server = GameServer(initial_food_count, seed, tick_rate, chunked_food)
+    port = await server.start()
+    clients = [SimulatedClient(seed=None if seed is None else seed + i) for i in range(bot_count)]
+    for client in clients:
+        await client.connect("127.0.0.1", port)
+    await asyncio.gather(server.run(ticks), *(client.run(ticks) for client in clients))
+    for client in clients:
+        await client.close()
+    await server.close()
+    return server, clients
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--bots", type=int, default=0, help="serve this many simulated loopback clients, then exit")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--food", type=int, default=INITIAL_FOOD_COUNT)
+    parser.add_argument("--tick-rate", type=int, default=SERVER_TICK_RATE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunked-food", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.bots:
+        start = time.perf_counter()
+        server, clients = asyncio.run(run_loopback(args.bots, args.ticks, args.food, args.seed, args.tick_rate,
+                                                   args.chunked_food))
+        elapsed = time.perf_counter() - start
+        print(f"{args.bots} clients x {server.food_manager.count} pellets: {server.tick_count} ticks in {elapsed:.2f}s")
+        for client in clients:
+            per_snapshot = client.bytes_received / max(1, client.snapshots_received)
+            print(f"  client {client.client_id}: {client.snapshots_received} snapshots, "
+                  f"{per_snapshot:.0f} bytes each, {per_snapshot * args.tick_rate / 1024:.1f} KiB/s")
+        return server, clients
+
+    async def serve():
+        server = GameServer(args.food, args.seed, args.tick_rate, args.chunked_food)
+        port = await server.start(args.host, args.port)
+        print(f"Serving on {args.host}:{port} at {args.tick_rate} ticks/s")
+        await server.run()
+    asyncio.run(serve())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Runs a Simulation on a worker thread and hands the render loop immutable frames.
+
+The worker owns the Simulation outright: only it touches snakes, food and
+controllers. After every tick it builds a RenderState holding what a frame is
+drawn from, and publishes it by replacing one reference. That gives two
+buffers in play at any time, the published front state the render thread is
+drawing and the back state the worker is filling, and no state is written once
+published. States are built from fresh or shared read-only arrays rather than
+copied Vector2 lists: the pellets culled to the view, a copy of the head path's
+live window (the body cache is shared as is) and the minimap's pyramid level,
+copied only when the pyramid has changed.
+
+Input goes the other way through a collections.deque: the render thread
+appends and the worker pops, both atomic under the GIL, so neither side ever
+waits on a lock. On a multi-core host a frame then costs about max(sim, render)
+instead of sim + render, to the extent both loops spend their time in NumPy and
+SDL calls that release the GIL.
+"""
+import threading
+import time
+from collections import deque
+import pygame
+from food import FoodManager
+from hud import minimap_level
+from movement_controller import MovementController
+
+# Worker Constants
+SIM_TICK_RATE = 60 # Simulation ticks per second
+MAX_BEHIND_TICKS = 5 # A worker further behind than this drops the backlog instead of catching up
+VIEW_MARGIN_PIXELS = 32 # Pellets are culled to the view grown by this, so zoom and camera can drift a little
+
+class InputController(MovementController):
+    """Player steering fed from the input queue, so the worker never reads the mouse itself."""
+
+    def __init__(self, snake, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
+        screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.desired_mouse_pos = screen_center.copy()
+        self.actual_mouse_pos = screen_center.copy()
+
+    def set_input(self, mouse_x, mouse_y, boost):
+        self.desired_mouse_pos = pygame.Vector2(mouse_x, mouse_y)
+        self.boosting = bool(boost)
+
+    def update_desired_position(self):
+        pass # Set between ticks from the input queue
+
+class InputQueue:
+    """Single producer, single consumer event queue; push and drain never block."""
+
+    def __init__(self):
+        self.events = deque()
+
+    def push(self, *event):
+        self.events.append(event)
+
+    def drain(self):
+        """Pops every event pushed so far, oldest first."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.popleft())
+            except IndexError:
+                return events
+
+class RenderState:
+    """One published tick: the snake, food and HUD values a frame is drawn from. Never mutated."""
+    __slots__ = ("tick", "published_at", "game_state", "snake_alive", "snake", "food", "minimap_counts",
+                 "pyramid_version")
+
+    def __init__(self, tick, published_at, game_state, snake_alive, snake, food, minimap_counts, pyramid_version):
+        self.tick = tick
+        self.published_at = published_at # perf_counter() time, for interpolating toward the next tick
+        self.game_state = game_state
+        self.snake_alive = snake_alive
+        self.snake = snake # Snake.frozen_copy()
+        self.food = food # food.FoodFrame
+        self.minimap_counts = minimap_counts
+        self.pyramid_version = pyramid_version
+
+class SimulationThread:
+    """Steps a Simulation at a fixed rate on a worker thread, publishing a RenderState per tick.
+
+    Push ("steer", mouse_x, mouse_y, boost, manual_zoom, view_zoom) once a frame
+    and ("toggle",) to switch between player and AI control; read `state` for the
+    latest tick. tick() runs one step synchronously, without the thread.
+    """
+
+    def __init__(self, simulation, tick_rate=SIM_TICK_RATE):
+        self.simulation = simulation
+        self.tick_seconds = 1.0 / tick_rate
+        self.inputs = InputQueue()
+        self.view_zoom = 1.0 # Zoom the food is culled for, as last sent by the render loop
+        self.minimap_level = minimap_level(simulation.food_manager.pyramid)
+        self._minimap = (None, None) # (pyramid version, copied level) last published
+        self.thread = None
+        self.running = False
+        self.error = None # Exception that stopped the worker, for the render loop to re-raise
+        self.state = None
+        self.publish()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        try:
+            next_tick = time.perf_counter()
+            while self.running:
+                now = time.perf_counter()
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                    continue
+                self.tick()
+                next_tick += self.tick_seconds
+                if now - next_tick > MAX_BEHIND_TICKS * self.tick_seconds:
+                    next_tick = now # Too far behind: drop the backlog instead of spiralling
+        except BaseException as error:
+            self.error = error
+            self.running = False
+
+    def _apply_inputs(self):
+        simulation = self.simulation
+        for event in self.inputs.drain():
+            snake = simulation.player_snake
+            if event[0] == "steer":
+                _, mouse_x, mouse_y, boost, manual_zoom, view_zoom = event
+                if isinstance(snake.controller, InputController):
+                    snake.controller.set_input(mouse_x, mouse_y, boost)
+                simulation.zoom = manual_zoom # Recorded with the tick, like the single-threaded loop
+                self.view_zoom = view_zoom
+            elif event[0] == "toggle" and simulation.snake_alive:
+                snake.toggle_controller(InputController)
+
+    def tick(self):
+        """Applies queued input, steps the simulation once and publishes the result."""
+        self._apply_inputs()
+        self.simulation.step()
+        self.publish()
+
+    def publish(self):
+        simulation = self.simulation
+        snake = simulation.player_snake
+        food_manager = simulation.food_manager
+        # The camera trails the head by up to one move; cull to where it can be
+        width, height = simulation.screen_size
+        view_rect = FoodManager.view_rect(snake.head_pos, width, height, self.view_zoom)
+        margin = snake.path.last_step + VIEW_MARGIN_PIXELS / self.view_zoom
+        view_rect = view_rect.inflate(2 * margin, 2 * margin)
+        pyramid = food_manager.pyramid
+        if self._minimap[0] != pyramid.version:
+            self._minimap = (pyramid.version, pyramid.levels[self.minimap_level].copy())
+        # A single reference store: the render thread sees the old state or the new one, never a mix
+        self.state = RenderState(simulation.tick_count, time.perf_counter(), simulation.game_state,
+                                 simulation.snake_alive, snake.frozen_copy(),
+                                 food_manager.frame(view_rect, self.view_zoom), self._minimap[1], self._minimap[0])
@@ -0,0 +1,142 @@
+import pygame
+import time
+import random
+import hashlib
+import struct
+from snake import Snake
+from food import FoodManager, ChunkedFoodManager, SPAWN_AREA_WIDTH, SPAWN_AREA_HEIGHT, INITIAL_FOOD_COUNT
+from movement_controller import PlayerController, AIController, DEFAULT_SCREEN_SIZE
+from frame_timing import FrameTimer
+
+# Calculate World Boundary Rect
+world_boundary_rect = pygame.Rect(
+    -SPAWN_AREA_WIDTH // 2,
+    -SPAWN_AREA_HEIGHT // 2,
+    SPAWN_AREA_WIDTH,
+    SPAWN_AREA_HEIGHT
+)
+
+class Simulation:
+    """Game state plus the per-tick update phase, with no display or rendering."""
+
+    def __init__(self, controller_class=PlayerController, screen_size=DEFAULT_SCREEN_SIZE, timer=None,
+                 seed=None, initial_food_count=INITIAL_FOOD_COUNT, chunked_food=False):
+        self.screen_size = tuple(screen_size)
+        # One seed drives the food RNG and the controller RNG, so a run can be reproduced
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Subsystem timing hooks; a disabled timer costs next to nothing
+        self.timer = timer if timer is not None else FrameTimer()
+        # Center of the screen - the controllers steer relative to it
+        self.screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.controller_class = controller_class
+        # Chunked food generates the world lazily around the snake instead of all up front
+        self.chunked_food = chunked_food
+        food_manager_class = ChunkedFoodManager if chunked_food else FoodManager
+        self.food_manager = food_manager_class(initial_food_count, seed)
+        self.tick_count = 0
+        # Manual zoom is part of the recorded input, though only rendering reads it
+        self.zoom = 1.0
+        # Optional per-tick input recorder (see replay.InputRecorder)
+        self.recorder = None
+        self.reset_snake()
+
+    def reset_snake(self):
+        """Creates a fresh snake at world position (0, 0) and resumes play."""
+        self.player_snake = Snake(0, 0, self.controller_class, self.screen_size, self.rng)
+        self.game_state = "playing"
+        self.snake_alive = True
+
+    def step(self):
+        """Advances the simulation by one tick: move, magnet, eating and boundary checks."""
+        self.tick_count += 1
+        if not self.snake_alive:
+            return
+        player_snake = self.player_snake
+        food_manager = self.food_manager
+        timer = self.timer
+        food_manager.begin_tick()
+
+        with timer.section("update.move"):
+            player_snake.move(self.screen_center)
+        if self.recorder is not None:
+            self.recorder.record(player_snake.controller, self.zoom)
+        with timer.section("update.food"):
+            food_manager.update(player_snake.head_pos, player_snake.radius) # Update food positions (magnet effect)
+
+        with timer.section("update.collision"):
+            # Check for food collisions, eating every overlapping pellet this tick
+            eaten_indices = food_manager.check_collisions(player_snake.head_pos, player_snake.radius)
+            if len(eaten_indices) > 0:
+                eaten_value = food_manager.remove_foods(eaten_indices)
+                player_snake.grow(eaten_value)
+
+            # Check for boundary collisions
+            if not world_boundary_rect.collidepoint(player_snake.head_pos.x, player_snake.head_pos.y):
+                self.game_state = "game_over"
+                self.snake_alive = False
+                food_manager.drop_mass(player_snake) # The dead snake's mass becomes food
+
+    def state_hash(self):
+        """Hex digest of the snake and food state, for checking that a replay matches its recording."""
+        digest = hashlib.sha256()
+        snake = self.player_snake
+        digest.update(struct.pack("<5d?", snake.head_pos.x, snake.head_pos.y, snake.direction.x,
+                                  snake.direction.y, snake.weight, self.snake_alive))
+        path = snake.path
+        digest.update(path.xs[path.start:path.end].tobytes())
+        digest.update(path.ys[path.start:path.end].tobytes())
+        food_manager = self.food_manager
+        for column in (food_manager.xs, food_manager.ys, food_manager.values):
+            digest.update(column[:food_manager.count].tobytes())
+        return digest.hexdigest()
+
+def run_headless(steps=None, duration=None, controller_class=AIController, screen_size=DEFAULT_SCREEN_SIZE,
+                 timer=None, seed=None, chunked_food=False):
+    """Runs the simulation uncapped with no display until `steps` ticks or `duration` seconds.
+
+    The snake is respawned whenever it dies so long soak runs keep exercising the update
+    phase. Returns a stats dict including the measured ticks per second, plus per-section
+    percentiles when an enabled FrameTimer is passed in.
+    """
+    if steps is None and duration is None:
+        raise ValueError("run_headless needs a step count or a wall-clock duration")
+
+    setup_start = time.perf_counter()
+    simulation = Simulation(controller_class, screen_size, timer, seed, chunked_food=chunked_food)
+    timer = simulation.timer
+    setup_seconds = time.perf_counter() - setup_start
+
+    deaths = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+    ticks = 0
+    while steps is None or ticks < steps:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        timer.begin_frame()
+        with timer.section("update"):
+            simulation.step()
+        timer.end_frame()
+        ticks += 1
+        if not simulation.snake_alive:
+            deaths += 1
+            simulation.reset_snake()
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else float("inf"),
+        "setup_seconds": setup_seconds,
+        "deaths": deaths,
+        "final_weight": simulation.player_snake.weight,
+        "food_count": simulation.food_manager.count,
+        "seed": simulation.seed,
+        "state_hash": simulation.state_hash(),
+    }
+    if timer.enabled:
+        stats["timings_ms"] = timer.summary()
+    return stats
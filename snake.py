@@ -1,68 +1,199 @@
 import pygame
 import math
+import numpy as np
 from movement_controller import MovementController, PlayerController, AIController
+from sprites import circle_sprite
+from growth import DEFAULT_GROWTH_MODEL, BASE_RADIUS, INITIAL_WEIGHT, GROWTH_EXPONENT
 
 # Snake Constants
 SNAKE_COLOR = (0, 255, 0) # Bright Green
 SNAKE_ALT_COLOR = (0, 200, 0) # Darker Green
 AI_SNAKE_COLOR = (0, 100, 255) # Bright Blue
 AI_SNAKE_ALT_COLOR = (0, 70, 180) # Darker Blue
-BASE_RADIUS = 0.5 # Used for drawing size and initial radius calc
-INITIAL_WEIGHT = 1
-GROWTH_EXPONENT = 0.2 # Controls radius growth
+PATH_INITIAL_CAPACITY = 256 # Head path points before the first compaction
+PATH_KEEP_FACTOR = 1.5 # Keep this many body lengths of head path
+MIN_PATH_STEP = 1e-6 # Head moves shorter than this don't add a path point
+LOD_MAX_SCREEN_RADIUS = 2 # At or below this many pixels, draw the body as a thick polyline
+
+class HeadPath:
+    """Head positions, oldest first, with cumulative arc length for each point.
+
+    Points live in the window [start, end) of flat arrays. Appending writes at
+    `end` and pruning just advances `start`; when `end` reaches the capacity the
+    live window is slid back to the front (growing if it is over half full), so
+    both are amortized O(1) and the window stays contiguous for searchsorted.
+    """
+
+    def __init__(self, x, y, capacity=PATH_INITIAL_CAPACITY):
+        self.xs = np.empty(capacity)
+        self.ys = np.empty(capacity)
+        self.arc = np.empty(capacity) # Arc length from an arbitrary origin up to each point
+        self.start = 0
+        self.end = 0
+        self.last_step = 0.0 # Arc length added by the most recent append
+        self.appended = 0 # Points ever appended; point i is number appended - (end - i), stable across compaction
+        self.append(x, y)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def last(self):
+        return self.xs[self.end - 1], self.ys[self.end - 1]
+
+    def length(self):
+        """Arc length covered between the oldest and newest point."""
+        return self.arc[self.end - 1] - self.arc[self.start]
+
+    def append(self, x, y):
+        """Adds a new newest point; returns False for moves below MIN_PATH_STEP."""
+        step = None
+        if self.end > self.start:
+            last_x, last_y = self.last()
+            step = math.hypot(x - last_x, y - last_y)
+            if step <= MIN_PATH_STEP:
+                self.last_step = 0.0
+                return False
+        if self.end == len(self.xs):
+            self._compact() # Rebases arc lengths, so read them only afterwards
+        arc = 0.0 if step is None else self.arc[self.end - 1] + step
+        self.last_step = step or 0.0
+        self.xs[self.end] = x
+        self.ys[self.end] = y
+        self.arc[self.end] = arc
+        self.end += 1
+        self.appended += 1
+        return True
+
+    def _compact(self):
+        """Slides the live window to the front, doubling the arrays if it is over half full."""
+        live = len(self)
+        capacity = len(self.xs)
+        if live * 2 > capacity:
+            capacity *= 2
+        origin = self.arc[self.start] if live else 0.0
+        for name in ("xs", "ys", "arc"):
+            old = getattr(self, name)
+            new = old if capacity == len(old) else np.empty(capacity)
+            new[:live] = old[self.start:self.end]
+            setattr(self, name, new)
+        self.arc[:live] -= origin # Rebase so arc lengths never grow without bound
+        self.start = 0
+        self.end = live
+
+    def copy(self):
+        """A compact copy of just the live window, for handing to another thread."""
+        path = HeadPath.__new__(HeadPath)
+        path.xs = self.xs[self.start:self.end].copy()
+        path.ys = self.ys[self.start:self.end].copy()
+        path.arc = self.arc[self.start:self.end].copy()
+        path.start, path.end = 0, len(path.xs)
+        path.last_step = self.last_step
+        path.appended = self.appended
+        return path
+
+    def trim_to_length(self, max_length):
+        """Drops the oldest points that aren't needed to still span max_length."""
+        arcs = self.arc[self.start:self.end]
+        keep_from = np.searchsorted(arcs, arcs[-1] - max_length, side="right") - 1
+        if keep_from > 0:
+            self.start += int(keep_from)
+
+    def points_at(self, distances_back):
+        """Interpolates the points lying the given arc distances back from the newest point.
+
+        Distances past the oldest point clamp to it.
+        """
+        distances_back = np.asarray(distances_back, dtype=np.float64)
+        xs = self.xs[self.start:self.end]
+        ys = self.ys[self.start:self.end]
+        arcs = self.arc[self.start:self.end]
+        if len(arcs) == 1:
+            return np.full(distances_back.shape, xs[0]), np.full(distances_back.shape, ys[0])
+        targets = arcs[-1] - distances_back
+        upper = np.clip(np.searchsorted(arcs, targets), 1, len(arcs) - 1)
+        lower = upper - 1
+        fraction = np.clip((targets - arcs[lower]) / (arcs[upper] - arcs[lower]), 0.0, 1.0)
+        return (xs[lower] + (xs[upper] - xs[lower]) * fraction,
+                ys[lower] + (ys[upper] - ys[lower]) * fraction)
 
 class Snake:
     # Constants as class attributes
     BASE_RADIUS = BASE_RADIUS
     INITIAL_WEIGHT = INITIAL_WEIGHT
     GROWTH_EXPONENT = GROWTH_EXPONENT
+    growth_model = DEFAULT_GROWTH_MODEL
 
-    def __init__(self, x, y, controller_class=PlayerController):
+    def __init__(self, x, y, controller_class=PlayerController, screen_size=None, rng=None):
         self.head_pos = pygame.Vector2(x, y)
         self.weight = Snake.INITIAL_WEIGHT
         self.radius, self.length = self.__class__._calculate_size(self.weight)
         self.direction = pygame.Vector2(1, 0)
-        self.controller = controller_class(self)
+        self.controller = controller_class(self, screen_size, rng)
         self.is_ai_controlled = isinstance(self.controller, AIController)
 
-        # NEW: Store head path and desired segment spacing
-        self.head_path = [self.head_pos.copy() for _ in range(5)] # Initialize with a few points
+        # Head path (arc-length indexed) and desired segment spacing
+        self.path = HeadPath(x, y)
         self.segment_spacing = self.radius * 1.5 # Default spacing (e.g., 1.5 times radius)
 
-        # Initialize body based on initial position and spacing
-        self.body = [self.head_pos.copy()] * self.length
-        self.update_body() # Calculate initial body segment positions
+        # Segment positions are computed lazily from the path and cached until it changes
+        self._body_arrays = None
+        self.update_body()
 
     @classmethod
     def _calculate_size(cls, weight):
         """Calculates radius first based on weight, then floored length."""
-        effective_weight = max(1, weight)
-        new_radius = cls.BASE_RADIUS * (effective_weight / cls.INITIAL_WEIGHT) ** cls.GROWTH_EXPONENT
-        new_radius = max(1e-9, new_radius)
-        segment_area = math.pi * new_radius**2
-        if segment_area <= 0:
-            new_length = 1
-        else:
-            required_length = max(1, math.floor(effective_weight / segment_area))
-            new_length = required_length
-        return new_radius, new_length # Return integer length
+        return cls.growth_model.calculate_size(weight)
+
+    def draw(self, surface, screen_center, zoom, camera_pos=None, alpha=1.0):
+        """Draws the body tail first, centered on camera_pos (default: this snake's head).
 
-    def draw(self, surface, screen_center, zoom):
+        alpha in [0, 1] renders the snake part way through its last tick's move.
+        """
+        lag = self.interpolation_lag(alpha)
+        if camera_pos is None:
+            camera_pos = self.interpolated_head(alpha)
         # Use world radius * zoom for drawing to reflect zoom changes
         screen_radius = int(self.radius * zoom)
         if screen_radius < 1: screen_radius = 1
-        
+
         # Choose color based on control mode
         main_color = AI_SNAKE_COLOR if self.is_ai_controlled else SNAKE_COLOR
         alt_color = AI_SNAKE_ALT_COLOR if self.is_ai_controlled else SNAKE_ALT_COLOR
-        
-        # Draw based on actual segment positions in self.body
-        for i, segment_world_pos in enumerate(reversed(self.body)):
-            color = main_color if i % 2 == 0 else alt_color
-            camera_space_pos = segment_world_pos - self.head_pos
-            view_space_pos = camera_space_pos * zoom
-            screen_pos = view_space_pos + screen_center
-            pygame.draw.circle(surface, color, (int(screen_pos.x), int(screen_pos.y)), screen_radius)
+
+        # World pos -> Camera Space -> View Space (apply zoom) -> Screen Space, tail first
+        xs, ys = self.body_arrays(lag)
+        screen_xs = ((xs[::-1] - camera_pos.x) * zoom + screen_center.x).astype(np.int32)
+        screen_ys = ((ys[::-1] - camera_pos.y) * zoom + screen_center.y).astype(np.int32)
+
+        if screen_radius <= LOD_MAX_SCREEN_RADIUS:
+            self._draw_polyline(surface, screen_xs, screen_ys, screen_radius, main_color)
+            return
+
+        # Skip segments entirely off screen; keep the tail-first index for the color banding
+        width, height = surface.get_size()
+        on_screen = np.flatnonzero(
+            (screen_xs >= -screen_radius) & (screen_xs < width + screen_radius) &
+            (screen_ys >= -screen_radius) & (screen_ys < height + screen_radius))
+        sprites = (circle_sprite(screen_radius, main_color), circle_sprite(screen_radius, alt_color))
+        surface.blits([
+            (sprites[i & 1], (x - screen_radius, y - screen_radius))
+            for i, x, y in zip(on_screen.tolist(),
+                               screen_xs[on_screen].tolist(), screen_ys[on_screen].tolist())
+        ], doreturn=False)
+
+    @staticmethod
+    def _draw_polyline(surface, screen_xs, screen_ys, screen_radius, color):
+        """Low-zoom level of detail: one thick line through the segments, dropping any
+        that land on the same pixel as the previous kept one."""
+        if len(screen_xs) > 1:
+            moved = np.ones(len(screen_xs), dtype=bool)
+            moved[1:] = (screen_xs[1:] != screen_xs[:-1]) | (screen_ys[1:] != screen_ys[:-1])
+            screen_xs, screen_ys = screen_xs[moved], screen_ys[moved]
+        points = list(zip(screen_xs.tolist(), screen_ys.tolist()))
+        if len(points) == 1:
+            pygame.draw.circle(surface, color, points[0], screen_radius)
+            return
+        pygame.draw.lines(surface, color, False, points, 2 * screen_radius)
 
     def start_boost(self):
         """Delegate to controller."""
@@ -79,23 +210,23 @@ class Snake:
     def grow(self, amount=1):
         """Increases weight and recalculates target length/radius."""
         self.weight += amount
-        # Update radius and target length (self.length)
-        self.radius, self.length = self.__class__._calculate_size(self.weight)
+        # Update radius and target length (self.length); length comes from the threshold table
+        self.radius, self.length = self.growth_model.lookup_size(self.weight)
         # Adjust spacing based on new radius? Optional.
         # self.segment_spacing = self.radius * 1.5
         # Body length will adjust automatically in update_body
 
-    def toggle_controller(self):
-        """Switch between player and AI controller."""
-        from movement_controller import PlayerController, AIController
-        
-        if isinstance(self.controller, PlayerController):
+    def toggle_controller(self, player_class=PlayerController):
+        """Switch between player and AI controller (player_class is the non-AI side)."""
+        screen_size = self.controller.screen_size
+        rng = self.controller.rng
+        if not self.is_ai_controlled:
             # Switch to AI controller
-            self.controller = AIController(self)
+            self.controller = AIController(self, screen_size, rng)
             self.is_ai_controlled = True
         else:
             # Switch to player controller
-            self.controller = PlayerController(self)
+            self.controller = player_class(self, screen_size, rng)
             self.is_ai_controlled = False
         return self.is_ai_controlled
     
@@ -107,64 +238,70 @@ class Snake:
         """Delegate to controller."""
         self.controller.handle_mouse_up(button)
 
-    # NEW: Method to update body positions
+    def frozen_copy(self):
+        """A controller-less copy that can still draw() this tick, for handing to another thread.
+
+        The path is copied (only its live window) and the cached body arrays are
+        shared: they are replaced, never written, when the path changes.
+        """
+        copy = Snake.__new__(Snake)
+        copy.head_pos = pygame.Vector2(self.head_pos)
+        copy.direction = pygame.Vector2(self.direction)
+        copy.weight, copy.radius, copy.length = self.weight, self.radius, self.length
+        copy.segment_spacing = self.segment_spacing
+        copy.is_ai_controlled = self.is_ai_controlled
+        copy.controller = None
+        copy.path = self.path.copy()
+        copy._body_arrays = self._body_arrays
+        return copy
+
+    @property
+    def head_path(self):
+        """Head path points, oldest first, as Vector2s (copies)."""
+        path = self.path
+        return [pygame.Vector2(x, y) for x, y in
+                zip(path.xs[path.start:path.end].tolist(), path.ys[path.start:path.end].tolist())]
+
+    @property
+    def body(self):
+        """Body segment positions, head first, as Vector2s (copies)."""
+        xs, ys = self.body_arrays()
+        return [pygame.Vector2(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def body_arrays(self, lag=0.0):
+        """Returns (xs, ys) of every body segment, head first, cached until the path changes.
+
+        A non-zero lag shifts every segment that far back along the path (uncached).
+        """
+        if lag:
+            return self.segment_positions(np.arange(self.length), lag)
+        if self._body_arrays is None:
+            self._body_arrays = self.segment_positions(np.arange(self.length))
+        return self._body_arrays
+
+    def segment_positions(self, indices, lag=0.0):
+        """Positions of just the requested segments (0 is the head), by arc-length lookup."""
+        return self.path.points_at(np.asarray(indices) * self.segment_spacing + lag)
+
+    def interpolation_lag(self, alpha):
+        """Arc distance behind the current head that is `alpha` of the way through the last move."""
+        return (1.0 - alpha) * self.path.last_step if alpha < 1.0 else 0.0
+
+    def interpolated_head(self, alpha):
+        """Head position `alpha` of the way from the previous tick's head to the current one."""
+        lag = self.interpolation_lag(alpha)
+        if not lag:
+            return self.head_pos
+        xs, ys = self.path.points_at([lag])
+        return pygame.Vector2(float(xs[0]), float(ys[0]))
+
     def update_body(self):
-        """Recalculates body segment positions based on head path and spacing."""
-        # Ensure head_path has the current head position
-        if not self.head_path or self.head_pos.distance_to(self.head_path[-1]) > 1e-6:
-             self.head_path.append(self.head_pos.copy())
-
-        new_body = [self.head_pos.copy()] # First segment is always the head
-        current_segment_pos = self.head_pos.copy()
-        path_idx = len(self.head_path) - 1
-        dist_covered_on_path = 0.0
-
-        # Calculate positions for the remaining segments
-        for _ in range(1, self.length):
-            target_dist_back = self.segment_spacing # How far back from the previous segment
-
-            # Traverse the path backwards
-            while target_dist_back > 0 and path_idx > 0:
-                vec_to_prev_point = self.head_path[path_idx - 1] - self.head_path[path_idx]
-                dist_between_points = vec_to_prev_point.length()
-
-                if dist_between_points < 1e-6: # Skip zero-length segments in path
-                    path_idx -= 1
-                    continue
-
-                dist_available_on_segment = dist_between_points - dist_covered_on_path
-
-                if target_dist_back <= dist_available_on_segment:
-                    # The next segment position lies on the current path segment
-                    fraction = (dist_covered_on_path + target_dist_back) / dist_between_points
-                    current_segment_pos = self.head_path[path_idx] + vec_to_prev_point * fraction
-                    dist_covered_on_path += target_dist_back # Update how much of the current segment is used
-                    target_dist_back = 0 # Found the position
-                    break # Exit inner while loop
-                else:
-                    # Need to consume this entire segment and move to the previous one
-                    target_dist_back -= dist_available_on_segment
-                    dist_covered_on_path = 0.0 # Reset for the new path segment
-                    path_idx -= 1
-                    current_segment_pos = self.head_path[path_idx] # Move to the previous path point
-
-            if target_dist_back > 0:
-                # Ran out of path, place segment at the oldest point
-                current_segment_pos = self.head_path[0].copy()
-
-            new_body.append(current_segment_pos.copy())
-
-        self.body = new_body
-
-        # Prune old head path points (optional optimization)
+        """Records the head on the path and prunes path no body segment can reach.
+
+        Segment positions follow from the path by arc length, so nothing per segment
+        happens here; see body_arrays / segment_positions.
+        """
+        self.path.append(self.head_pos.x, self.head_pos.y)
         # Keep enough path points to cover the snake's length plus buffer
-        max_path_length_needed = self.length * self.segment_spacing * 1.5
-        current_path_length = 0
-        keep_from_index = len(self.head_path) - 1
-        while keep_from_index > 0:
-            dist = self.head_path[keep_from_index].distance_to(self.head_path[keep_from_index-1])
-            if current_path_length + dist > max_path_length_needed:
-                break
-            current_path_length += dist
-            keep_from_index -= 1
-        self.head_path = self.head_path[keep_from_index:] 
\ No newline at end of file
+        self.path.trim_to_length(self.length * self.segment_spacing * PATH_KEEP_FACTOR)
+        self._body_arrays = None
@@ -0,0 +1,321 @@
+"""Binary world snapshots: written in bulk, loaded by memory-mapping.
+
+A snapshot is a fixed header, a JSON manifest, then raw array data:
+
+    header:   magic, version, manifest length
+    manifest: the kind of world (Simulation, Arena or a bare FoodManager), its
+              scalars, RNG states, every snake's head, direction, weight and
+              controller state, and the name, dtype, shape and offset of each array
+    arrays:   food columns, the density pyramid's finest level and head paths,
+              each starting on an ARRAY_ALIGNMENT boundary after the manifest
+
+Loading maps the file copy-on-write and hands the arrays to the restored world
+as-is, so nothing is copied, sorted or respawned up front. The food grid comes
+back as saved per-cell groups that only become sets when a cell is first
+touched. A restored world continues tick-for-tick like the one saved.
+"""
+import json
+import mmap
+import struct
+import numpy as np
+import pygame
+import movement_controller
+from snake import Snake
+from food import FoodManager, ChunkedFoodManager, DensityPyramid
+from arena import Arena
+from simulation import Simulation
+
+# Snapshot Format Constants
+SNAPSHOT_MAGIC = b"SLSN"
+SNAPSHOT_VERSION = 5
+HEADER_FORMAT = "<4sHI" # magic, version, manifest length in bytes
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ARRAY_ALIGNMENT = 64
+CONTROLLER_SKIP_FIELDS = ("snake", "rng") # Re-linked on load rather than saved
+
+class SnapshotWriter:
+    """Collects arrays while the manifest is built, then writes everything in one pass."""
+
+    def __init__(self):
+        self.arrays = []
+        self.entries = {}
+        self.size = 0
+
+    def add(self, name, array):
+        array = np.ascontiguousarray(array)
+        offset = -self.size % ARRAY_ALIGNMENT + self.size
+        self.entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        self.arrays.append((offset, array))
+        self.size = offset + array.nbytes
+
+    def write(self, path, manifest):
+        manifest = dict(manifest, arrays=self.entries)
+        encoded = json.dumps(manifest).encode("utf-8")
+        data_start = _data_start(len(encoded))
+        with open(path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded)))
+            f.write(encoded)
+            for offset, array in self.arrays:
+                f.seek(data_start + offset)
+                f.write(array.data)
+            f.truncate(data_start + self.size)
+
+def _data_start(manifest_length):
+    end = HEADER_SIZE + manifest_length
+    return end + -end % ARRAY_ALIGNMENT
+
+class SnapshotReader:
+    """A mapped snapshot; array() returns writable copy-on-write views into the file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, manifest_length = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} snapshot")
+            self.manifest = json.loads(f.read(manifest_length))
+            self.data_start = _data_start(manifest_length)
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def array(self, name):
+        entry = self.manifest["arrays"][name]
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"]))
+        array = np.frombuffer(self.buffer, dtype=dtype, count=count, offset=self.data_start + entry["offset"])
+        return array.reshape(entry["shape"])
+
+# --- Saving ---
+
+def _vector(value):
+    return [value.x, value.y]
+
+def _random_state(rng):
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+def _controller_state(controller):
+    """Plain attributes of a controller; Vector2s are tagged, anything else unserializable is skipped."""
+    state = {}
+    for name, value in vars(controller).items():
+        if name in CONTROLLER_SKIP_FIELDS:
+            continue
+        if isinstance(value, pygame.Vector2):
+            state[name] = {"vector": _vector(value)}
+        elif isinstance(value, tuple):
+            state[name] = {"tuple": list(value)}
+        elif value is None or isinstance(value, (bool, int, float, str)):
+            state[name] = value
+    return state
+
+def _scheduler_state(scheduler):
+    if scheduler is None:
+        return None
+    return {"budget_seconds": scheduler.budget_seconds, "plans_per_tick": scheduler.plans_per_tick,
+            "cursor": scheduler.cursor}
+
+def _save_snake(writer, snake, prefix):
+    path = snake.path
+    writer.add(prefix + "path_xs", path.xs[path.start:path.end])
+    writer.add(prefix + "path_ys", path.ys[path.start:path.end])
+    writer.add(prefix + "path_arc", path.arc[path.start:path.end])
+    return {
+        "head_pos": _vector(snake.head_pos),
+        "direction": _vector(snake.direction),
+        "weight": snake.weight,
+        "segment_spacing": snake.segment_spacing,
+        "path_last_step": path.last_step,
+        "controller_class": type(snake.controller).__name__,
+        "controller": _controller_state(snake.controller),
+    }
+
+def _save_food(writer, food_manager):
+    count = food_manager.count
+    for name in food_manager.COLUMNS:
+        writer.add("food." + name, getattr(food_manager, name)[:count])
+    # The grid's grouping is saved too, so loading never re-buckets pellet by pellet
+    grid_keys, grid_items, grid_starts = food_manager.grid.groups()
+    writer.add("food.grid_keys", grid_keys)
+    writer.add("food.grid_items", grid_items)
+    writer.add("food.grid_starts", grid_starts)
+    writer.add("food.pyramid", food_manager.pyramid.levels[0])
+    state = {
+        "chunked": isinstance(food_manager, ChunkedFoodManager),
+        "count": count,
+        "initial_food_count": food_manager.initial_food_count,
+        "spawn_area_rect": list(food_manager.spawn_area_rect),
+        "rng": food_manager.rng.bit_generator.state,
+        "moved": sorted(food_manager._moved),
+        "next_id": food_manager.next_id,
+    }
+    if state["chunked"]:
+        state.update({
+            "world_seed": food_manager.world_seed,
+            "density": food_manager.density,
+            "tick": food_manager.tick,
+            "loaded": [[cx, cy, tick] for (cx, cy), tick in food_manager.loaded.items()],
+            "active": [list(key) for key in food_manager._active],
+            "dirty": [list(key) for key in food_manager.dirty],
+            "counted": [list(key) for key in food_manager.counted],
+            "saved": [list(key) for key in food_manager.saved],
+            "pending": [list(key) for key in food_manager.pending],
+        })
+        for (cx, cy), packed in food_manager.saved.items():
+            writer.add(f"chunk.saved.{cx}.{cy}", np.frombuffer(packed, dtype=np.uint8))
+        for (cx, cy), pending in food_manager.pending.items():
+            for column, name in zip(pending, ("xs", "ys", "values")):
+                writer.add(f"chunk.pending_{name}.{cx}.{cy}", column)
+    return state
+
+def save_snapshot(path, world):
+    """Writes a Simulation, Arena or FoodManager to path."""
+    writer = SnapshotWriter()
+    if isinstance(world, FoodManager):
+        manifest = {"kind": "food", "food": _save_food(writer, world)}
+    elif isinstance(world, Simulation):
+        manifest = {
+            "kind": "simulation",
+            "seed": world.seed,
+            "screen_size": list(world.screen_size),
+            "chunked_food": world.chunked_food,
+            "tick_count": world.tick_count,
+            "zoom": world.zoom,
+            "game_state": world.game_state,
+            "snake_alive": world.snake_alive,
+            "rng": _random_state(world.rng),
+            "snakes": [_save_snake(writer, world.player_snake, "snake.0.")],
+            "food": _save_food(writer, world.food_manager),
+        }
+    elif isinstance(world, Arena):
+        manifest = {
+            "kind": "arena",
+            "screen_size": list(world.screen_size),
+            "tick_count": world.tick_count,
+            "deaths": world.deaths,
+            "controller_class": world.controller_class.__name__,
+            "scheduler": _scheduler_state(world.scheduler),
+            "rng": _random_state(world.rng),
+            "snakes": [_save_snake(writer, snake, f"snake.{i}.") for i, snake in enumerate(world.snakes)],
+            "food": _save_food(writer, world.food_manager),
+        }
+    else:
+        raise TypeError(f"can't snapshot a {type(world).__name__}")
+    writer.write(path, manifest)
+
+# --- Loading ---
+
+def _set_random_state(rng, state):
+    version, internal, gauss_next = state
+    rng.setstate((version, tuple(internal), gauss_next))
+
+def _restore_controller(controller, state):
+    for name, value in state.items():
+        if isinstance(value, dict) and "vector" in value:
+            value = pygame.Vector2(value["vector"])
+        elif isinstance(value, dict) and "tuple" in value:
+            value = tuple(value["tuple"])
+        setattr(controller, name, value)
+
+def _resolve_controller_class(name, controller_class):
+    if controller_class is not None:
+        return controller_class
+    resolved = getattr(movement_controller, name, None)
+    if resolved is None:
+        raise ValueError(f"unknown controller class {name}; pass controller_class to load_snapshot")
+    return resolved
+
+def _load_snake(reader, state, prefix, screen_size, rng, controller_class=None):
+    controller_class = _resolve_controller_class(state["controller_class"], controller_class)
+    head_x, head_y = state["head_pos"]
+    snake = Snake(head_x, head_y, controller_class, screen_size, rng)
+    snake.direction = pygame.Vector2(state["direction"])
+    snake.weight = state["weight"]
+    snake.radius, snake.length = Snake._calculate_size(snake.weight)
+    snake.segment_spacing = state["segment_spacing"]
+    path = snake.path
+    path.xs = reader.array(prefix + "path_xs")
+    path.ys = reader.array(prefix + "path_ys")
+    path.arc = reader.array(prefix + "path_arc")
+    path.start, path.end = 0, len(path.xs)
+    path.appended = len(path.xs)
+    path.last_step = state["path_last_step"]
+    snake._body_arrays = None
+    if state["controller_class"] == controller_class.__name__:
+        _restore_controller(snake.controller, state["controller"])
+    return snake
+
+def _load_food(reader, state):
+    """Rebuilds a FoodManager around the mapped columns, without spawning anything."""
+    food_manager_class = ChunkedFoodManager if state["chunked"] else FoodManager
+    food_manager = food_manager_class(0, 0)
+    food_manager.initial_food_count = state["initial_food_count"]
+    if state["chunked"]:
+        food_manager.set_world_rect(state["spawn_area_rect"]) # Also re-derives the chunk clipping limits
+    else:
+        food_manager.spawn_area_rect = pygame.Rect(state["spawn_area_rect"])
+    for name in food_manager.COLUMNS:
+        setattr(food_manager, name, reader.array("food." + name))
+    food_manager.count = state["count"]
+    food_manager.next_id = state["next_id"]
+    food_manager.rng.bit_generator.state = state["rng"]
+    food_manager._moved = set(state["moved"])
+    food_manager.grid.load_groups(reader.array("food.grid_keys"), reader.array("food.grid_items"),
+                                  reader.array("food.grid_starts"))
+    food_manager.pyramid = DensityPyramid(food_manager.spawn_area_rect)
+    food_manager.pyramid.load_base(reader.array("food.pyramid"))
+    if state["chunked"]:
+        food_manager.world_seed = state["world_seed"]
+        food_manager.density = state["density"]
+        food_manager.estimated = food_manager._estimated_counts()
+        food_manager.tick = state["tick"]
+        food_manager.loaded = {(cx, cy): tick for cx, cy, tick in state["loaded"]}
+        food_manager._active = {tuple(key) for key in state["active"]}
+        food_manager.dirty = {tuple(key) for key in state["dirty"]}
+        food_manager.counted = {tuple(key) for key in state["counted"]}
+        food_manager.saved = {(cx, cy): reader.array(f"chunk.saved.{cx}.{cy}").tobytes()
+                              for cx, cy in state["saved"]}
+        food_manager.pending = {(cx, cy): tuple(reader.array(f"chunk.pending_{name}.{cx}.{cy}")
+                                                for name in ("xs", "ys", "values"))
+                                for cx, cy in state["pending"]}
+    return food_manager
+
+def load_snapshot(path, controller_class=None):
+    """Restores the world saved at path: a Simulation, Arena or FoodManager.
+
+    Snake controllers are recreated from their saved class name, or as
+    controller_class when given (e.g. to take over a saved AI game as the player).
+    """
+    reader = SnapshotReader(path)
+    manifest = reader.manifest
+    kind = manifest["kind"]
+    if kind == "food":
+        return _load_food(reader, manifest["food"])
+
+    screen_size = tuple(manifest["screen_size"])
+    if kind == "simulation":
+        snake_state = manifest["snakes"][0]
+        simulation_controller_class = _resolve_controller_class(snake_state["controller_class"], controller_class)
+        world = Simulation(simulation_controller_class, screen_size, seed=manifest["seed"], initial_food_count=0,
+                           chunked_food=manifest["chunked_food"])
+        world.tick_count = manifest["tick_count"]
+        world.zoom = manifest["zoom"]
+        world.game_state = manifest["game_state"]
+        world.snake_alive = manifest["snake_alive"]
+        world.player_snake = _load_snake(reader, snake_state, "snake.0.", screen_size, world.rng, controller_class)
+    elif kind == "arena":
+        scheduler_state = manifest["scheduler"]
+        scheduler = None
+        if scheduler_state is not None:
+            scheduler = movement_controller.ThinkScheduler(scheduler_state["budget_seconds"],
+                                                           scheduler_state["plans_per_tick"])
+            scheduler.cursor = scheduler_state["cursor"]
+        world = Arena(0, 0, None, screen_size, _resolve_controller_class(manifest["controller_class"], None),
+                      scheduler)
+        world.tick_count = manifest["tick_count"]
+        world.deaths = manifest["deaths"]
+        world.snakes = [_load_snake(reader, state, f"snake.{i}.", screen_size, world.rng, controller_class)
+                        for i, state in enumerate(manifest["snakes"])]
+    else:
+        raise ValueError(f"{path} holds an unknown world kind {kind!r}")
+    # Restore the shared RNG last: building snakes above may have drawn from it
+    _set_random_state(world.rng, manifest["rng"])
+    world.food_manager = _load_food(reader, manifest["food"])
+    return world
@@ -0,0 +1,69 @@
+import pygame
+import numpy as np
+
+# Sprite Cache Constants
+SPRITE_CACHE_LIMIT = 512 # Cached sprites before the cache is flushed (zooming creates many sizes)
+SPRITE_COLORKEY = (0, 0, 0) # Transparent color of sprite backgrounds
+
+_circle_sprites = {}
+
+def circle_sprite(radius, color):
+    """Returns a cached surface holding a filled circle, drawn at (radius, radius).
+
+    Blit it at (x - radius, y - radius) to cover the same pixels as
+    pygame.draw.circle(surface, color, (x, y), radius).
+    """
+    key = (radius, color)
+    sprite = _circle_sprites.get(key)
+    if sprite is None:
+        if len(_circle_sprites) >= SPRITE_CACHE_LIMIT:
+            _circle_sprites.clear()
+        size = 2 * radius + 1
+        # Colorkeyed (not per-pixel alpha) so blits can use RLE runs instead of blending
+        sprite = pygame.Surface((size, size))
+        colorkey = SPRITE_COLORKEY if color != SPRITE_COLORKEY else (255, 0, 255)
+        sprite.fill(colorkey)
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        _circle_sprites[key] = sprite
+    return sprite
+
+_circle_offsets = {}
+
+def circle_offsets(radius):
+    """Returns (dxs, dys): the pixel offsets pygame.draw.circle fills around its center."""
+    offsets = _circle_offsets.get(radius)
+    if offsets is None:
+        size = 2 * radius + 1
+        stencil = pygame.Surface((size, size))
+        pygame.draw.circle(stencil, (255, 255, 255), (radius, radius), radius)
+        mask = pygame.surfarray.array2d(stencil) != 0
+        dxs, dys = np.nonzero(mask)
+        offsets = _circle_offsets[radius] = (dxs - radius, dys - radius)
+    return offsets
+
+def splat_circles(surface, screen_xs, screen_ys, radius, color):
+    """Writes small filled circles straight into the surface's pixel buffer.
+
+    Returns False (drawing nothing) when the surface's pixel format can't be
+    referenced as a 2D array, so callers can fall back to blitting.
+    """
+    try:
+        pixels = pygame.surfarray.pixels2d(surface)
+    except ValueError:
+        return False
+    mapped_color = surface.map_rgb(color)
+    width, height = pixels.shape
+    for dx, dy in zip(*circle_offsets(radius)):
+        xs = screen_xs + dx
+        ys = screen_ys + dy
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        pixels[xs[inside], ys[inside]] = mapped_color
+    del pixels # Releases the surface lock
+    return True
+
+def blit_circles(surface, screen_xs, screen_ys, radius, color):
+    """Blits one cached circle sprite per position in a single batch."""
+    sprite = circle_sprite(radius, color)
+    surface.blits([(sprite, (x - radius, y - radius))
+                   for x, y in zip(screen_xs.tolist(), screen_ys.tolist())], doreturn=False)
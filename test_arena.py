@@ -0,0 +1,30 @@
+import unittest
+from arena import Arena
+from movement_controller import ForagingController, ThinkScheduler
+from simulation import world_boundary_rect
+
+class TestArena(unittest.TestCase):
+
+    def test_population_stays_steady_and_inside_the_world(self):
+        arena = Arena(snake_count=40, initial_food_count=20000, seed=5)
+        stats = arena.run(steps=50)
+        self.assertEqual(stats["ticks"], 50)
+        self.assertEqual(len(arena.snakes), 40)
+        for snake in arena.snakes:
+            self.assertTrue(world_boundary_rect.collidepoint(snake.head_pos.x, snake.head_pos.y))
+        self.assertGreater(stats["snake_pellets_per_second"], 0)
+
+    def test_scheduler_replans_round_robin_within_its_budget(self):
+        arena = Arena(snake_count=30, initial_food_count=20000, seed=5, controller_class=ForagingController,
+                      scheduler=ThinkScheduler(plans_per_tick=7))
+        arena.run(steps=5)
+        # 35 plans over 30 snakes: everyone once, the first five twice
+        self.assertEqual([snake.controller.plans for snake in arena.snakes], [2] * 5 + [1] * 25)
+
+        # A zero time budget still makes progress, one plan per tick
+        arena.scheduler = ThinkScheduler(budget_seconds=0.0)
+        arena.step()
+        self.assertEqual(arena.scheduler.last_plans, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import pygame
+from background import BackgroundLayer, GRID_SPACING, GRID_COLOR, MAX_LAYER_GRID_SPACING
+
+class TestBackgroundLayer(unittest.TestCase):
+
+    def render(self, layer, head, zoom):
+        surface = pygame.Surface((640, 480))
+        layer.draw(surface, pygame.Vector2(head), pygame.Vector2(320, 240), 640, 480, zoom)
+        return pygame.image.tobytes(surface, "RGB")
+
+    def test_scrolling_a_whole_cell_wraps_to_the_same_image(self):
+        layer = BackgroundLayer()
+        for zoom in (0.5, 1.0, 3.0):
+            first = self.render(layer, (12.0, -30.0), zoom)
+            self.assertEqual(self.render(layer, (12.0 + GRID_SPACING, -30.0 - GRID_SPACING), zoom), first)
+            self.assertNotEqual(self.render(layer, (12.0 + GRID_SPACING / 2, -30.0), zoom), first)
+
+    def test_rerenders_only_when_the_pixel_spacing_changes(self):
+        layer = BackgroundLayer()
+        self.render(layer, (0, 0), 0.3) # 30 pixels between lines
+        cached = layer.layer
+        self.render(layer, (50, 50), 0.302) # Still 30 whole pixels, as when a snake eats
+        self.assertIs(layer.layer, cached)
+        self.render(layer, (50, 50), 0.32)
+        self.assertIsNot(layer.layer, cached)
+        self.assertEqual(layer.layer.get_size(), (640 + 32, 480 + 32))
+
+    def test_sparse_grids_draw_directly_without_a_layer(self):
+        layer = BackgroundLayer()
+        self.render(layer, (0, 0), 0.3)
+        for zoom in (MAX_LAYER_GRID_SPACING / GRID_SPACING * 1.01, 20.0, 200.0):
+            image = self.render(layer, (1.0, -1.0), zoom) # The lines through the origin stay in view
+            self.assertIsNone(layer.layer)
+            self.assertIn(bytes(GRID_COLOR), image) # Lines are still drawn
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import random
+import numpy as np
+import pygame
+from arena import Arena, spawn_snake
+from collision import BodyIndex, segment_distances, SELF_NECK_DIAMETERS
+from movement_controller import MovementController, AIController, SNAKE_SPEED, BOOST_SPEED
+from snake import Snake
+
+class ScriptedController(MovementController):
+    """Turns by a fixed angle every move (straight ahead by default)."""
+
+    turn = 0.0
+
+    def update_desired_position(self):
+        center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.desired_mouse_pos = center + self.snake.direction.rotate(self.turn) * 100
+
+    def _limit_mouse_movement(self):
+        self.actual_mouse_pos = self.desired_mouse_pos.copy()
+
+class TestBodyIndex(unittest.TestCase):
+
+    def brute_force_hits(self, snake, snakes):
+        """Every other snake whose whole body (by arc length) the head's last move touches."""
+        path = snake.path
+        px, py = path.xs[path.end - 2], path.ys[path.end - 2]
+        qx, qy = path.xs[path.end - 1], path.ys[path.end - 1]
+        hits = []
+        for other in snakes:
+            if other is snake:
+                continue
+            other_path = other.path
+            newer = np.arange(other_path.start + 1, other_path.end)
+            head_arc = other_path.arc[other_path.end - 1]
+            newer = newer[other_path.arc[newer] >= head_arc - (other.length - 1) * other.segment_spacing]
+            distances = segment_distances(px, py, qx, qy, other_path.xs[newer - 1], other_path.ys[newer - 1],
+                                          other_path.xs[newer], other_path.ys[newer])
+            if len(distances) and distances.min() < snake.radius + other.radius:
+                hits.append(other)
+        return hits
+
+    def test_hits_match_a_brute_force_scan(self):
+        rng = random.Random(4)
+        screen_size = (800, 600)
+        screen_center = pygame.Vector2(400, 300)
+        # A crowded patch so bodies keep crossing
+        snakes = [Snake(rng.uniform(-150, 150), rng.uniform(-150, 150), AIController, screen_size, rng)
+                  for _ in range(16)]
+        for snake in snakes:
+            snake.grow(rng.uniform(0, 400))
+        index = BodyIndex()
+        hits = 0
+        for tick in range(100):
+            if tick % 40 == 39: # Replace a few, as deaths do
+                snakes[:3] = [spawn_snake(rng, AIController, screen_size) for _ in range(3)]
+            for snake in snakes:
+                snake.move(screen_center)
+            index.update(snakes)
+            for snake in snakes:
+                expected = self.brute_force_hits(snake, snakes)
+                self.assertEqual(sorted(map(id, index.head_hits(snake))), sorted(map(id, expected)))
+                hits += len(expected)
+        self.assertGreater(hits, 0)
+
+        # Incremental upkeep indexes exactly the live path segments of live snakes
+        self.assertEqual(set(index.entries), set(snakes))
+        self.assertEqual(len(index), sum(len(snake.path) - 1 for snake in snakes))
+        self.assertEqual(index.max_step, max(np.diff(snake.path.arc[snake.path.start:snake.path.end]).max()
+                                             for snake in snakes))
+        self.assertEqual(index.max_radius, max(snake.radius for snake in snakes))
+
+    def test_crossing_and_self_collision(self):
+        screen_size = (800, 600)
+        screen_center = pygame.Vector2(400, 300)
+        index = BodyIndex()
+        # A long snake lying along the y axis (its body spans y 110..200), and a newborn driving into it from the side
+        wall = Snake(0, -300, ScriptedController, screen_size)
+        wall.grow(2000)
+        wall.direction = pygame.Vector2(0, 1)
+        for _ in range(500):
+            wall.move(screen_center)
+        runner = Snake(-30, 150, ScriptedController, screen_size)
+        index.update([wall, runner])
+        self.assertEqual(index.head_hits(runner), [])
+        for _ in range(40):
+            runner.move(screen_center)
+            index.update([wall, runner])
+            if index.head_hits(runner):
+                break
+        self.assertEqual(index.head_hits(runner), [wall])
+        self.assertAlmostEqual(runner.head_pos.x, -wall.radius, delta=2.0)
+
+        # Turning in tight circles crosses its own body, which only counts when asked for
+        self.assertEqual(index.head_hits(wall, include_self=True), [])
+        wall.controller.turn = 20.0
+        for _ in range(40):
+            wall.move(screen_center)
+            index.update([wall, runner])
+        self.assertEqual(index.head_hits(wall), [])
+        self.assertEqual(index.head_hits(wall, include_self=True), [wall])
+        self.assertGreater(wall.length * wall.segment_spacing, SELF_NECK_DIAMETERS * 2 * wall.radius)
+
+    def test_reach_shrinks_when_a_big_snake_goes(self):
+        screen_size = (800, 600)
+        screen_center = pygame.Vector2(400, 300)
+        small = Snake(0, 0, ScriptedController, screen_size)
+        huge = Snake(0, 500, ScriptedController, screen_size)
+        huge.grow(50000)
+        huge.controller.boosting = True
+        index = BodyIndex()
+        for _ in range(20):
+            for snake in (small, huge):
+                snake.move(screen_center)
+            index.update([small, huge])
+        self.assertEqual(index.max_radius, huge.radius)
+        self.assertAlmostEqual(index.max_step, BOOST_SPEED, places=3)
+        index.remove(huge)
+        self.assertEqual(index.max_radius, small.radius)
+        self.assertAlmostEqual(index.max_step, SNAKE_SPEED, places=3)
+
+    def test_arena_snakes_die_on_bodies(self):
+        arena = Arena(snake_count=60, initial_food_count=20000, seed=2, screen_size=(800, 600))
+        for snake in arena.snakes: # Bunch everyone up so bodies cross
+            snake.head_pos.update(snake.head_pos.x * 0.05, snake.head_pos.y * 0.05)
+            snake.path.xs[snake.path.end - 1] = snake.head_pos.x
+            snake.path.ys[snake.path.end - 1] = snake.head_pos.y
+        arena.run(steps=40)
+        self.assertGreater(arena.deaths, 0)
+        self.assertEqual(len(arena.snakes), 60)
+
+if __name__ == '__main__':
+    unittest.main()
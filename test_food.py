@@ -0,0 +1,323 @@
+import unittest
+import random
+import time
+import pygame
+import numpy as np
+from food import (FoodManager, ChunkedFoodManager, FOOD_RADIUS, FOOD_COLOR, CHUNK_SIZE, CHUNK_EVICT_TICKS,
+                  CHUNK_EVICT_INTERVAL, DENSITY_DRAW_ZOOM, MAX_DROP_PELLETS)
+from sprites import splat_circles, blit_circles
+from snake import Snake
+from movement_controller import AIController
+
+class TestFoodSpatialHash(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1234)
+        self.manager = FoodManager()
+        self.manager.rng = np.random.default_rng(1234)
+
+    def assertGridConsistent(self):
+        """Every live slot is bucketed exactly once, in the cell containing it."""
+        manager = self.manager
+        bucketed = sum(len(bucket) for bucket in manager.grid.cells.values())
+        self.assertEqual(bucketed, manager.count)
+        cell_xs, cell_ys = manager.grid.cell_coords(manager.xs[:manager.count], manager.ys[:manager.count])
+        np.testing.assert_array_equal(cell_xs, manager.cell_xs[:manager.count])
+        np.testing.assert_array_equal(cell_ys, manager.cell_ys[:manager.count])
+        for key, bucket in manager.grid.cells.items():
+            for index in bucket:
+                self.assertLess(index, manager.count)
+                self.assertEqual((manager.cell_xs[index], manager.cell_ys[index]), key)
+
+    def test_magnet_keeps_buckets_in_sync(self):
+        """Pellets pulled across cell borders are re-bucketed."""
+        head = pygame.Vector2(100, 100) # On a cell corner, so pulls cross borders
+        for _ in range(50):
+            self.manager.update(head, 5.0)
+        self.assertGridConsistent()
+
+    def test_interpolation_origin_survives_swap_removal(self):
+        """Only pellets pulled this tick differ from their start-of-tick position."""
+        manager = self.manager
+        head = pygame.Vector2(100, 100)
+        for _ in range(5):
+            manager.begin_tick()
+            manager.update(head, 5.0)
+            manager.remove_foods(manager.check_collisions(head, 5.0))
+            moved = np.zeros(manager.count, dtype=bool)
+            moved[list(manager._moved)] = True
+            still = ~moved
+            np.testing.assert_array_equal(manager.prev_xs[:manager.count][still], manager.xs[:manager.count][still])
+            self.assertTrue(np.all(np.hypot(manager.xs[:manager.count][moved] - manager.prev_xs[:manager.count][moved],
+                                            manager.ys[:manager.count][moved] - manager.prev_ys[:manager.count][moved])
+                                   > 1.0))
+
+    def test_collision_matches_full_scan(self):
+        """The grid lookup finds a hit exactly when a full scan would."""
+        for _ in range(50):
+            head = pygame.Vector2(random.uniform(-2000, 2000), random.uniform(-2000, 2000))
+            radius = random.uniform(0.5, 10)
+            collision_radius_sq = (radius + FOOD_RADIUS) ** 2
+            xs = self.manager.xs[:self.manager.count] - head.x
+            ys = self.manager.ys[:self.manager.count] - head.y
+            expected = bool(np.any(xs * xs + ys * ys < collision_radius_sq))
+            index = self.manager.check_collision(head, radius)
+            self.assertEqual(index is not None, expected)
+            if index is not None:
+                self.assertLess(head.distance_squared_to(self.manager.foods[index].pos), collision_radius_sq)
+                self.manager.remove_food(index)
+        self.assertGridConsistent()
+
+class TestFoodStore(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = FoodManager()
+
+    def test_swap_remove_keeps_live_range_contiguous(self):
+        """Removing a pellet moves the last one into its slot."""
+        manager = self.manager
+        manager.rng = np.random.default_rng(0)
+        last = manager.foods[-1]
+        count = manager.count
+        removed = manager.remove_food(0)
+        self.assertEqual(removed.value, 1)
+        self.assertIn(manager.count, (count - 1, count)) # Possibly replenished
+        self.assertEqual(manager.foods[0].pos, last.pos)
+
+    def test_view_is_list_compatible(self):
+        foods = self.manager.foods
+        self.assertEqual(len(foods), self.manager.count)
+        self.assertEqual(foods[3].pos, pygame.Vector2(float(self.manager.xs[3]), float(self.manager.ys[3])))
+        with self.assertRaises(IndexError):
+            foods[self.manager.count]
+
+    def test_batch_eating_clears_every_overlap(self):
+        """One check/remove pass eats every pellet under the head."""
+        manager = self.manager
+        manager.rng = np.random.default_rng(0)
+        head = pygame.Vector2(0, 0)
+        radius = 20.0
+        hits = manager.check_collisions(head, radius)
+        self.assertGreater(len(hits), 1)
+        count = manager.count
+        eaten_value = manager.remove_foods(hits)
+        self.assertEqual(eaten_value, len(hits))
+        self.assertLessEqual(manager.count, count)
+        self.assertGreaterEqual(manager.count, count - len(hits))
+        # Respawns land anywhere in the spawn area, so only a rare one could overlap again
+        self.assertLessEqual(len(manager.check_collisions(head, radius)), 1)
+
+class TestBatchedFood(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = FoodManager(initial_food_count=20000, seed=7)
+
+    def test_each_pellet_goes_to_the_closest_head(self):
+        manager = self.manager
+        head_xs = np.array([0.0, 6.0, 500.0])
+        head_ys = np.array([0.0, 0.0, 500.0])
+        radii = np.array([5.0, 5.0, 5.0])
+        eaten, eaters = manager.check_collisions_many(head_xs, head_ys, radii)
+        self.assertEqual(len(eaten), len(np.unique(eaten)))
+        for pellet, eater in zip(eaten.tolist(), eaters.tolist()):
+            distances = np.hypot(head_xs - manager.xs[pellet], head_ys - manager.ys[pellet])
+            self.assertEqual(eater, int(np.argmin(distances)))
+
+    def test_density_pyramid_tracks_spawns_eats_and_magnet_moves(self):
+        manager = self.manager
+        pyramid = manager.pyramid
+        heads = np.array([[0.0, 0.0], [100.0, 100.0], [-300.0, 250.0]])
+        for tick in range(200):
+            heads[:, 0] += 3.0
+            manager.begin_tick()
+            manager.update_many(heads[:, 0], heads[:, 1], np.full(3, 4.0))
+            eaten, _ = manager.check_collisions_many(heads[:, 0], heads[:, 1], np.full(3, 4.0))
+            manager.remove_foods(eaten)
+            manager.remove_food(tick)
+            if tick % 50 == 0:
+                manager._remove_slots(np.arange(0, 200, 3))
+
+        # Every level holds the same counts as binning the live pellets from scratch
+        xs, ys = manager.xs[:manager.count], manager.ys[:manager.count]
+        for level, counts in enumerate(pyramid.levels):
+            size = pyramid.bin_size(level)
+            height, width = counts.shape
+            expected, _, _ = np.histogram2d(ys, xs, bins=(height, width),
+                                            range=((pyramid.top, pyramid.top + height * size),
+                                                   (pyramid.left, pyramid.left + width * size)))
+            np.testing.assert_array_equal(counts, expected.astype(np.int32))
+
+    def test_dead_snake_mass_drops_along_its_body_in_one_batch(self):
+        manager = self.manager
+        snake = Snake(0, 0, AIController, (800, 600), random.Random(2))
+        snake.grow(1e5)
+        for _ in range(300):
+            snake.move(pygame.Vector2(400, 300))
+        count, total = manager.count, float(manager.values[:manager.count].sum(dtype=np.float64))
+        capacity = len(manager.xs)
+
+        start = time.perf_counter()
+        dropped = manager.drop_mass(snake)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.05) # Well inside one frame
+        self.assertEqual(dropped, MAX_DROP_PELLETS)
+        self.assertEqual(manager.count, count + dropped)
+        self.assertLessEqual(len(manager.xs), max(capacity, 2 * (count + dropped))) # At most one column growth
+        self.assertAlmostEqual(float(manager.values[:manager.count].sum(dtype=np.float64)) - total, snake.weight,
+                               delta=snake.weight * 1e-6)
+
+        # Every new pellet lies within one radius of some body segment
+        body_xs, body_ys = snake.body_arrays()
+        new_xs, new_ys = manager.xs[count:manager.count], manager.ys[count:manager.count]
+        distances = np.hypot(new_xs[:, None] - body_xs[None, :], new_ys[:, None] - body_ys[None, :]).min(axis=1)
+        self.assertLessEqual(float(distances.max()), snake.radius + 1e-3)
+
+class TestFoodRendering(unittest.TestCase):
+
+    def test_splat_and_blit_match_draw_circle(self):
+        xs = np.array([0, 5, 17, 99, 40], dtype=np.int32) # Includes clipped edge pellets
+        ys = np.array([0, 9, 33, 20, 79], dtype=np.int32)
+        for radius in (1, 2, 4):
+            expected = pygame.Surface((100, 80), depth=32)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                pygame.draw.circle(expected, FOOD_COLOR, (x, y), radius)
+            splatted = pygame.Surface((100, 80), depth=32)
+            self.assertTrue(splat_circles(splatted, xs, ys, radius, FOOD_COLOR))
+            blitted = pygame.Surface((100, 80), depth=32)
+            blit_circles(blitted, xs, ys, radius, FOOD_COLOR)
+            for surface in (splatted, blitted):
+                self.assertEqual(pygame.image.tobytes(surface, "RGB"), pygame.image.tobytes(expected, "RGB"))
+
+    def test_zoomed_out_draw_shades_density_bins(self):
+        manager = FoodManager(initial_food_count=20000, seed=2)
+        # Pellets only in the left half of the world
+        manager._remove_slots(np.flatnonzero(manager.xs[:manager.count] >= 0))
+        surface = pygame.Surface((400, 400), depth=32)
+        center = pygame.Vector2(200, 200)
+        manager.draw(surface, pygame.Vector2(0, 0), center, DENSITY_DRAW_ZOOM / 20)
+        self.assertNotEqual(surface.get_at((150, 200))[:3], (0, 0, 0))
+        self.assertEqual(surface.get_at((250, 200))[:3], (0, 0, 0))
+        # The world ends 100 pixels out at this zoom; nothing is drawn past it
+        self.assertEqual(surface.get_at((50, 200))[:3], (0, 0, 0))
+
+    def test_zoomed_out_draw_shades_unloaded_chunks(self):
+        manager = ChunkedFoodManager(initial_food_count=20000, seed=2)
+        head = pygame.Vector2(-1200, 0)
+        manager.update(head, 5.0) # Loads the chunks around one head only
+        loaded, count = list(manager.loaded), manager.count
+        surface = pygame.Surface((400, 400), depth=32)
+        center = pygame.Vector2(200, 200)
+        manager.draw(surface, pygame.Vector2(0, 0), center, DENSITY_DRAW_ZOOM / 20)
+        self.assertNotEqual(surface.get_at((250, 200))[:3], (0, 0, 0)) # Around (1000, 0), never loaded
+        self.assertEqual(manager.count, count)
+        # The pyramid counts the whole world, and unloading or reloading chunks leaves that total alone
+        total = int(manager.pyramid.levels[-1].sum())
+        self.assertAlmostEqual(total, 20000, delta=50)
+        manager._unload_chunks(loaded)
+        self.assertEqual(manager.count, 0)
+        self.assertEqual(int(manager.pyramid.levels[-1].sum()), total)
+        for key in loaded:
+            manager._load_chunk(key)
+        self.assertEqual(manager.count, count)
+        self.assertEqual(int(manager.pyramid.levels[-1].sum()), total)
+        # Pellets spawned into an unloaded chunk count straight away
+        manager.spawn_in_rect(pygame.Rect(900, -100, 200, 200), 10)
+        self.assertEqual(int(manager.pyramid.levels[-1].sum()), total + 10)
+
+class TestChunkedFood(unittest.TestCase):
+
+    def pellets_in(self, manager, left, top, right, bottom):
+        """Sorted (x, y) of the live pellets inside the rect."""
+        xs, ys = manager.xs[:manager.count], manager.ys[:manager.count]
+        inside = (xs >= left) & (xs < right) & (ys >= top) & (ys < bottom)
+        return sorted(zip(xs[inside].tolist(), ys[inside].tolist()))
+
+    def test_chunks_generate_the_same_pellets_in_any_order(self):
+        first = ChunkedFoodManager(seed=8)
+        second = ChunkedFoodManager(seed=8)
+        self.assertEqual(first.count, 0) # Nothing is generated up front
+        a, b = pygame.Vector2(-1200, 300), pygame.Vector2(900, -900)
+        for head in (a, b):
+            first.update(head, 5.0)
+        for head in (b, a):
+            second.update(head, 5.0)
+        self.assertEqual(set(first.loaded), set(second.loaded))
+        self.assertGreater(first.count, 0)
+        self.assertEqual(self.pellets_in(first, -2000, -2000, 2000, 2000),
+                         self.pellets_in(second, -2000, -2000, 2000, 2000))
+
+    def test_unloaded_chunks_come_back_as_they_were_left(self):
+        manager = ChunkedFoodManager(seed=8)
+        home, away = pygame.Vector2(250, 250), pygame.Vector2(-1750, -1750)
+        home_chunk = (0, 0)
+        manager.update(home, 5.0)
+        eaten = manager.check_collisions(home, 20.0)
+        self.assertGreater(len(eaten), 0)
+        manager.remove_foods(eaten)
+        before = self.pellets_in(manager, 0, 0, CHUNK_SIZE, CHUNK_SIZE)
+
+        # Leave long enough for the home chunks to be evicted
+        for _ in range(CHUNK_EVICT_TICKS + 2 * CHUNK_EVICT_INTERVAL):
+            manager.begin_tick()
+            manager.update(away, 5.0)
+        self.assertNotIn(home_chunk, manager.loaded)
+        self.assertIn(home_chunk, manager.saved) # Eaten from, so kept compressed
+        self.assertEqual(self.pellets_in(manager, 0, 0, CHUNK_SIZE, CHUNK_SIZE), [])
+        bucketed = sum(len(bucket) for bucket in manager.grid.cells.values())
+        self.assertEqual(bucketed, manager.count)
+
+        manager.check_collisions(home, 0.0) # Loads the chunks without pulling anything
+        self.assertEqual(self.pellets_in(manager, 0, 0, CHUNK_SIZE, CHUNK_SIZE), before)
+        self.assertNotIn(home_chunk, manager.saved)
+
+    def test_drops_into_unloaded_chunks_keep_their_value(self):
+        manager = ChunkedFoodManager(seed=8)
+        manager.update(pygame.Vector2(250, 250), 5.0) # Loads the chunks around the origin only
+        xs = np.array([250.0, 1750.0])
+        ys = np.array([250.0, 1750.0])
+        manager.spawn_along(xs, ys, 5.0 * MAX_DROP_PELLETS, 0.0) # Pellets worth 5 each
+        far_chunk = manager._chunk_key(int(manager._chunk_codes(xs[1:], ys[1:])[0]))
+        self.assertNotIn(far_chunk, manager.loaded)
+        pending_value = float(manager.pending[far_chunk][2].sum())
+        loaded_value = float(manager.values[:manager.count][manager.values[:manager.count] > 1].sum())
+        self.assertAlmostEqual(pending_value + loaded_value, 5.0 * MAX_DROP_PELLETS, places=3)
+        self.assertGreater(pending_value, 0)
+        # A second drop merges into the chunk's pending arrays rather than adding a batch
+        pending_count = len(manager.pending[far_chunk][0])
+        manager.spawn_along(xs[1:], ys[1:], 3.0, 0.0)
+        self.assertEqual(len(manager.pending[far_chunk]), 3)
+        self.assertEqual(len(manager.pending[far_chunk][0]), pending_count + 3)
+
+        manager.check_collisions(pygame.Vector2(1750, 1750), 0.0) # Loading brings the drop back
+        values = manager.values[:manager.count]
+        self.assertAlmostEqual(float(values[values > 1].sum()), 5.0 * MAX_DROP_PELLETS, places=3)
+
+    def test_drawing_does_not_load_chunks(self):
+        manager = ChunkedFoodManager(seed=8)
+        surface = pygame.Surface((400, 300))
+        manager.draw(surface, pygame.Vector2(0, 0), pygame.Vector2(200, 150), 1.0)
+        self.assertEqual(manager.loaded, {})
+        self.assertEqual(manager.count, 0)
+        self.assertGreater(np.count_nonzero(pygame.surfarray.array2d(surface)), 0)
+
+    def test_frame_culls_once_and_matches_drawn_positions(self):
+        manager = ChunkedFoodManager(seed=8)
+        manager.begin_tick()
+        manager.update(pygame.Vector2(0, 0), 5.0) # Loads around the origin and pulls pellets in
+        self.assertTrue(manager._moved)
+        view_rect = FoodManager.view_rect(pygame.Vector2(300, 0), 1600, 1200, 1.0) # Reaches unloaded chunks
+        culls = []
+        indices_in_rect = manager._indices_in_rect
+        manager._indices_in_rect = lambda *rect: culls.append(rect) or indices_in_rect(*rect)
+        frame = manager.frame(view_rect, 1.0)
+        self.assertEqual(len(culls), 1)
+        for frame_xs, frame_ys, alpha in ((frame.xs, frame.ys, 1.0), (frame.prev_xs, frame.prev_ys, 0.0)):
+            xs, ys = manager._visible_positions(view_rect, alpha)
+            np.testing.assert_array_equal(frame_xs, xs)
+            np.testing.assert_array_equal(frame_ys, ys)
+        # Loaded pellets plus those decoded from unloaded chunks
+        self.assertGreater(len(frame.xs), len(indices_in_rect(view_rect.left, view_rect.top, view_rect.right,
+                                                              view_rect.bottom)))
+
+if __name__ == '__main__':
+    unittest.main()
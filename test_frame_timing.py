@@ -0,0 +1,39 @@
+import unittest
+import os
+import csv
+import tempfile
+from frame_timing import FrameTimer, NULL_SECTION
+
+class TestFrameTimer(unittest.TestCase):
+
+    def test_disabled_timer_records_nothing(self):
+        timer = FrameTimer()
+        timer.begin_frame()
+        self.assertIs(timer.section("update"), NULL_SECTION)
+        timer.start("events")
+        timer.stop("events")
+        timer.end_frame()
+        self.assertEqual(len(timer.records), 0)
+
+    def test_percentiles_and_csv_export(self):
+        timer = FrameTimer(enabled=True)
+        for ms in range(1, 101):
+            timer.begin_frame()
+            timer.add("update", ms / 1000.0)
+            timer.add("update", ms / 1000.0) # Repeated sections accumulate
+            timer.end_frame()
+        p50, p95, p99 = timer.percentiles("update")
+        self.assertAlmostEqual(p50, 2 * 51)
+        self.assertAlmostEqual(p95, 2 * 95)
+        self.assertAlmostEqual(p99, 2 * 99)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "timings.csv")
+            timer.export(path)
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(list(rows[0]), ["frame_index", "frame", "update"])
+
+if __name__ == '__main__':
+    unittest.main()
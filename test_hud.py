@@ -0,0 +1,36 @@
+import unittest
+import pygame
+from food import FoodManager
+from simulation import world_boundary_rect
+from hud import Hud, Minimap, MINIMAP_SIZE
+
+class TestHud(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        self.surface = pygame.Surface((800, 600))
+
+    def test_text_rerenders_only_changed_lines(self):
+        hud = Hud(pygame.font.Font(None, 24), (255, 255, 255))
+        lines = ["Weight: 1", "Zoom: 1.00", "Food Count: 10"]
+        for _ in range(10):
+            bottom = hud.draw(self.surface, lines)
+        self.assertEqual(hud.text.renders, 3)
+        hud.draw(self.surface, ["Weight: 2", "Zoom: 1.00", "Food Count: 10"])
+        self.assertEqual(hud.text.renders, 4)
+        self.assertGreater(bottom, 3 * 10)
+
+    def test_minimap_rebuilds_only_when_food_changes(self):
+        manager = FoodManager(initial_food_count=20000, seed=3)
+        minimap = Minimap(manager.pyramid, world_boundary_rect)
+        self.assertEqual(int(manager.pyramid.levels[minimap.level].sum()), manager.count)
+        head = pygame.Vector2(0, 0)
+        rect = minimap.draw(self.surface, head, (790, 10))
+        minimap.draw(self.surface, head, (790, 10))
+        self.assertEqual((rect.width, rect.height, minimap.rebuilds), (MINIMAP_SIZE, MINIMAP_SIZE, 1))
+        manager.remove_foods([0, 1, 2])
+        minimap.draw(self.surface, head, (790, 10))
+        self.assertEqual(minimap.rebuilds, 2)
+
+if __name__ == '__main__':
+    unittest.main()
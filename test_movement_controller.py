@@ -0,0 +1,95 @@
+import unittest
+import random
+import numpy as np
+import pygame
+from snake import Snake
+from movement_controller import MovementController, ForagingController, move_batch, FORAGE_EDGE_MARGIN
+from food import FoodManager, ChunkedFoodManager
+from simulation import world_boundary_rect
+
+class ScriptedController(MovementController):
+    """Steers at whatever target the test sets, with no mouse rate limit."""
+
+    def update_desired_position(self):
+        pass
+
+    def _limit_mouse_movement(self):
+        self.actual_mouse_pos = self.desired_mouse_pos.copy()
+
+class TestMoveBatch(unittest.TestCase):
+
+    def test_matches_scalar_move(self):
+        rng = random.Random(4)
+        screen_size = (1920, 1080)
+        screen_center = pygame.Vector2(960, 540)
+        snakes = []
+        for _ in range(200):
+            snake = Snake(rng.uniform(-1900, 1900), rng.uniform(-1900, 1900), ScriptedController, screen_size, rng)
+            snake.direction = pygame.Vector2(1, 0).rotate(rng.uniform(0, 360))
+            snakes.append(snake)
+        head_xs = np.array([snake.head_pos.x for snake in snakes])
+        head_ys = np.array([snake.head_pos.y for snake in snakes])
+        dir_xs = np.array([snake.direction.x for snake in snakes])
+        dir_ys = np.array([snake.direction.y for snake in snakes])
+        bounds = (world_boundary_rect.left, world_boundary_rect.top,
+                  world_boundary_rect.right, world_boundary_rect.bottom)
+
+        for tick in range(120):
+            # Include zero-length targets, which must leave the heading alone
+            targets = [pygame.Vector2(rng.uniform(-300, 300), rng.uniform(-300, 300)) if rng.random() < 0.9
+                       else pygame.Vector2(0, 0) for _ in snakes]
+            boosting = np.array([rng.random() < 0.3 for _ in snakes])
+            for snake, target, boost in zip(snakes, targets, boosting):
+                snake.controller.desired_mouse_pos = screen_center + target
+                snake.controller.boosting = bool(boost)
+                snake.move(screen_center)
+            alive = move_batch(head_xs, head_ys, dir_xs, dir_ys, np.array([target.x for target in targets]),
+                               np.array([target.y for target in targets]), boosting, bounds)
+
+            np.testing.assert_allclose(dir_xs, [snake.direction.x for snake in snakes], atol=1e-6)
+            np.testing.assert_allclose(dir_ys, [snake.direction.y for snake in snakes], atol=1e-6)
+            np.testing.assert_allclose(head_xs, [snake.head_pos.x for snake in snakes], atol=1e-6)
+            np.testing.assert_allclose(head_ys, [snake.head_pos.y for snake in snakes], atol=1e-6)
+            expected_alive = [world_boundary_rect.collidepoint(snake.head_pos.x, snake.head_pos.y) for snake in snakes]
+            np.testing.assert_array_equal(alive, expected_alive)
+
+class TestForaging(unittest.TestCase):
+
+    def setUp(self):
+        self.food_manager = FoodManager(initial_food_count=0, seed=1)
+        self.snake = Snake(0, 0, ForagingController, (1920, 1080), random.Random(1))
+        self.snake.direction = pygame.Vector2(1, 0)
+
+    def test_targets_the_dense_patch_and_steers_at_it(self):
+        rng = np.random.default_rng(2)
+        self.food_manager.add_foods(rng.uniform(-300, 300, 2000), rng.uniform(-300, 300, 2000)) # Thin everywhere
+        self.food_manager.add_foods(rng.uniform(-260, -200, 500), rng.uniform(150, 210, 500)) # Dense behind-left
+        controller = self.snake.controller
+        controller.plan(self.food_manager, world_boundary_rect)
+        self.assertLess(controller.target.distance_to(pygame.Vector2(-230, 180)), 60)
+        # About 290 units away at one unit per tick, after turning around
+        for _ in range(400):
+            self.snake.move(pygame.Vector2(960, 540))
+            if self.snake.head_pos.distance_to(controller.target) < 30:
+                break
+        self.assertLess(self.snake.head_pos.distance_to(controller.target), 30)
+
+    def test_targets_stay_off_the_boundary(self):
+        edge = world_boundary_rect.right - 20
+        self.snake.head_pos = pygame.Vector2(edge, 0)
+        rng = np.random.default_rng(3)
+        self.food_manager.add_foods(rng.uniform(edge - 50, world_boundary_rect.right, 500), rng.uniform(-50, 50, 500))
+        controller = self.snake.controller
+        controller.plan(self.food_manager, world_boundary_rect)
+        self.assertLessEqual(controller.target.x, world_boundary_rect.right - FORAGE_EDGE_MARGIN)
+
+    def test_targets_food_in_unloaded_chunks(self):
+        food_manager = ChunkedFoodManager(initial_food_count=2000, seed=1) # Thin everywhere, nothing loaded yet
+        food_manager.spawn_in_rect(pygame.Rect(-260, 150, 60, 60), 500) # Dense behind-left, pending
+        self.assertEqual(food_manager.count, 0)
+        controller = self.snake.controller
+        controller.plan(food_manager, world_boundary_rect)
+        self.assertLess(controller.target.distance_to(pygame.Vector2(-230, 180)), 60)
+
+if __name__ == '__main__':
+    unittest.main()
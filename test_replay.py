@@ -0,0 +1,53 @@
+import unittest
+import os
+import tempfile
+from simulation import Simulation
+from movement_controller import AIController
+from replay import InputRecorder, InputLog, replay, HEADER_SIZE
+
+class TestReplay(unittest.TestCase):
+
+    def record(self, path, ticks=600, chunked_food=False):
+        simulation = Simulation(AIController, (800, 600), seed=42, initial_food_count=20000,
+                                chunked_food=chunked_food)
+        recorder = simulation.recorder = InputRecorder(path, simulation)
+        for _ in range(ticks):
+            simulation.step()
+        recorder.close()
+        return simulation
+
+    def test_same_seed_gives_same_state(self):
+        first = Simulation(AIController, seed=9, initial_food_count=20000)
+        second = Simulation(AIController, seed=9, initial_food_count=20000)
+        for _ in range(300):
+            first.step()
+            second.step()
+        self.assertEqual(first.state_hash(), second.state_hash())
+
+    def test_replay_reproduces_the_recorded_state(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.slrp")
+            simulation = self.record(path)
+            self.assertEqual(os.path.getsize(path), HEADER_SIZE + 600 * 21)
+            log = InputLog(path)
+            self.assertEqual(log.seed, 42)
+            self.assertEqual(log.final_hash, simulation.state_hash())
+            stats = replay(path)
+            self.assertEqual(stats["ticks"], 600)
+            self.assertTrue(stats["matches"])
+
+            # A single altered input changes the outcome
+            with open(path, "r+b") as f:
+                f.seek(HEADER_SIZE + 10 * 21)
+                f.write(b"\0" * 16)
+            self.assertFalse(replay(path)["matches"])
+
+    def test_replay_restores_chunked_food(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chunked.slrp")
+            self.record(path, ticks=300, chunked_food=True)
+            self.assertTrue(InputLog(path).chunked_food)
+            self.assertTrue(replay(path)["matches"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import asyncio
+from server import GameServer, SimulatedClient, ClientView, decode_snapshot
+
+class TestServer(unittest.TestCase):
+
+    async def serve_and_check(self, client_count, ticks):
+        server = GameServer(initial_food_count=200000, seed=3, tick_rate=600)
+        port = await server.start()
+        clients = [SimulatedClient(seed=i) for i in range(client_count)]
+        for client in clients:
+            await client.connect("127.0.0.1", port)
+        await asyncio.gather(server.run(ticks), *(client.run(ticks) for client in clients))
+
+        for client in clients:
+            self.assertGreater(client.snapshots_received, ticks // 2)
+            # What the server recorded sending is the ground truth for every view the client rebuilt
+            sent = server.clients[client.client_id].history
+            for tick, view in client.views.items():
+                state = sent[tick]
+                self.assertEqual(view.pellets, dict(zip(state.pellet_ids.tolist(),
+                                                        zip(state.pellet_xs.tolist(), state.pellet_ys.tolist()))))
+                self.assertEqual(sorted(view.snakes), sorted(state.snakes))
+            await client.close()
+        await server.close()
+        return clients
+
+    def test_loopback_clients_mirror_their_views(self):
+        clients = asyncio.run(self.serve_and_check(4, 90))
+        self.assertEqual(len({client.client_id for client in clients}), 4)
+
+    def test_deltas_are_much_smaller_than_full_snapshots(self):
+        server = GameServer(initial_food_count=200000, seed=5)
+        client = server.add_client((1920, 1080))
+        client.zoom = 2.0
+        view = ClientView()
+        sizes = []
+        for _ in range(30):
+            server.step()
+            payload = server.snapshot_for(client)
+            snapshot = decode_snapshot(payload)
+            view = view.apply(snapshot)
+            client.acked_tick = snapshot["tick"] # Acked at once, as over a zero-latency link
+            sizes.append(len(payload))
+        self.assertGreater(len(view.pellets), 100)
+        self.assertLess(max(sizes[5:]), sizes[0] / 5)
+
+        # Losing the base falls back to a full snapshot the client can rebuild from scratch
+        client.history.clear()
+        server.step()
+        snapshot = decode_snapshot(server.snapshot_for(client))
+        self.assertEqual(snapshot["base_tick"], 0)
+        self.assertEqual(set(ClientView().apply(snapshot).pellets), set(server.clients[client.id].history[
+            server.tick_count].pellet_ids.tolist()))
+
+if __name__ == '__main__':
+    unittest.main()
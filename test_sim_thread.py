@@ -0,0 +1,75 @@
+import unittest
+import time
+import numpy as np
+import pygame
+from simulation import Simulation
+from sim_thread import SimulationThread, InputController, InputQueue
+
+class TestSimulationThread(unittest.TestCase):
+
+    def mouse(self, tick):
+        """Scripted (mouse x, mouse y, boost) for a tick: circling, with a boost now and then."""
+        return 960 + 300 * np.cos(tick / 20), 540 + 300 * np.sin(tick / 20), tick % 90 < 20
+
+    def steer(self, worker, tick):
+        worker.inputs.push("steer", *self.mouse(tick), 1.0, 20.0)
+
+    def test_ticks_match_a_plain_simulation_and_states_stay_frozen(self):
+        worker = SimulationThread(Simulation(InputController, seed=11, initial_food_count=20000))
+        plain = Simulation(InputController, seed=11, initial_food_count=20000)
+        first = None
+        for tick in range(120):
+            self.steer(worker, tick)
+            worker.tick()
+            plain.player_snake.controller.set_input(*self.mouse(tick))
+            plain.step()
+            if tick == 10:
+                first = worker.state
+                frozen = (first.snake.head_pos.copy(), first.snake.body_arrays()[0].copy(), first.food.xs.copy(),
+                          first.minimap_counts.copy())
+        self.assertEqual(worker.simulation.state_hash(), plain.state_hash())
+        self.assertEqual(worker.state.tick, 120)
+
+        # Later ticks replaced the published state rather than writing into it
+        self.assertEqual(first.tick, 11)
+        self.assertEqual(first.snake.head_pos, frozen[0])
+        np.testing.assert_array_equal(first.snake.body_arrays()[0], frozen[1])
+        np.testing.assert_array_equal(first.food.xs, frozen[2])
+        np.testing.assert_array_equal(first.minimap_counts, frozen[3])
+
+        # A published state draws on its own
+        surface = pygame.Surface((1920, 1080))
+        state = worker.state
+        head = state.snake.interpolated_head(0.5)
+        state.food.draw(surface, head, pygame.Vector2(960, 540), 20.0, 0.5)
+        state.snake.draw(surface, pygame.Vector2(960, 540), 20.0, head, 0.5)
+        self.assertGreater(np.count_nonzero(pygame.surfarray.array2d(surface)), 0)
+
+    def test_worker_thread_runs_and_takes_queued_input(self):
+        worker = SimulationThread(Simulation(InputController, seed=12, initial_food_count=20000), tick_rate=1000)
+        worker.start()
+        try:
+            deadline = time.perf_counter() + 10
+            while worker.state.tick < 30 and time.perf_counter() < deadline:
+                self.steer(worker, worker.state.tick)
+                time.sleep(0.001)
+            self.assertGreaterEqual(worker.state.tick, 30)
+            worker.inputs.push("toggle")
+            tick = worker.state.tick
+            while worker.state.tick < tick + 5 and time.perf_counter() < deadline:
+                time.sleep(0.001)
+            self.assertTrue(worker.state.snake.is_ai_controlled)
+        finally:
+            worker.stop()
+        self.assertIsNone(worker.error)
+        self.assertIsNone(worker.thread)
+
+    def test_input_queue_drains_in_order(self):
+        queue = InputQueue()
+        for index in range(5):
+            queue.push("steer", index)
+        self.assertEqual(queue.drain(), [("steer", index) for index in range(5)])
+        self.assertEqual(queue.drain(), [])
+
+if __name__ == '__main__':
+    unittest.main()
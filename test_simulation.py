@@ -0,0 +1,25 @@
+import unittest
+import pygame
+from simulation import Simulation, run_headless
+from movement_controller import AIController
+
+class TestHeadlessSimulation(unittest.TestCase):
+
+    def test_runs_without_display(self):
+        """AI snakes step with no display surface at all."""
+        self.assertIsNone(pygame.display.get_surface())
+        stats = run_headless(steps=200)
+        self.assertEqual(stats["ticks"], 200)
+        self.assertGreater(stats["ticks_per_second"], 0)
+
+    def test_ai_uses_given_screen_size(self):
+        simulation = Simulation(AIController, (800, 600))
+        self.assertEqual(simulation.player_snake.controller.screen_size, (800, 600))
+        self.assertEqual(simulation.player_snake.controller.actual_mouse_pos, pygame.Vector2(400, 300))
+
+    def test_requires_a_budget(self):
+        with self.assertRaises(ValueError):
+            run_headless()
+
+if __name__ == '__main__':
+    unittest.main()
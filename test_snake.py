@@ -1,6 +1,11 @@
 import unittest
 import math
-from snake import Snake # Import the class we want to test
+import numpy as np
+import pygame
+from snake import Snake, HeadPath # Import the class we want to test
+from movement_controller import AIController
+from sprites import circle_sprite
+from growth import GrowthModel
 
 class TestSnakeSizeCalculation(unittest.TestCase):
 
@@ -8,48 +13,131 @@ class TestSnakeSizeCalculation(unittest.TestCase):
     def setUpClass(cls):
         # Helper to run the calculation we are testing
         cls.calculate = Snake._calculate_size
+        cls.weights = np.arange(1, 1000001, dtype=np.float64) # Test integer weights
+        cls.radii, cls.lengths = Snake.growth_model.calculate_sizes(cls.weights)
 
     def test_monotonicity(self):
         """Test that radius and length are monotonically increasing with weight."""
-        last_radius, last_length = self.calculate(1)
-        # Use a slightly larger starting weight to avoid potential float issues at exactly 1
-        last_radius, last_length = self.calculate(1.1)
+        self.assertTrue(np.all(np.diff(self.radii) >= 0), "Radius decreased")
+        self.assertTrue(np.all(np.diff(self.lengths) >= 0), "Length decreased")
 
-        for weight in range(2, 1000000):
-            # Test with float weights too for continuity
-            float_weight = float(weight)
-            current_radius, current_length = self.calculate(float_weight)
+    def test_area_relationship_continuous(self):
+        """Test the relationship weight = length * area for continuous length."""
+        segment_areas = np.pi * self.radii**2
+        low = self.lengths * segment_areas
+        high = (self.lengths + 1) * segment_areas
+        self.assertTrue(np.all(self.weights >= low), "Weight below length * area")
+        self.assertTrue(np.all(self.weights <= high), "Weight above (length + 1) * area")
 
-            # Use assertGreaterEqual allowing for tiny float inaccuracies
-            self.assertGreaterEqual(current_radius, last_radius - 1e-9, f"Radius decreased at weight {float_weight}")
-            self.assertGreaterEqual(current_length, last_length - 1e-9, f"Length decreased at weight {float_weight}")
+    def test_vectorized_matches_scalar(self):
+        rng = np.random.default_rng(7)
+        weights = np.concatenate((rng.uniform(0, 10, 2000), rng.uniform(1, 1e7, 2000)))
+        radii, lengths = Snake.growth_model.calculate_sizes(weights)
+        for weight, radius, length in zip(weights.tolist(), radii.tolist(), lengths.tolist()):
+            expected_radius, expected_length = self.calculate(weight)
+            self.assertEqual(length, expected_length)
+            self.assertAlmostEqual(radius, expected_radius, delta=expected_radius * 1e-12)
+            self.assertEqual(Snake.growth_model.lookup_size(weight), (expected_radius, expected_length))
 
-            last_radius, last_length = current_radius, current_length
+    def test_heavy_lookups_never_extend_the_table(self):
+        model = GrowthModel()
+        table_length = len(model.thresholds)
+        weights = np.geomspace(model.thresholds[-1], 1e12, 5000)
+        lengths = model.lengths(weights)
+        scalar = [model.length(weight) for weight in weights.tolist()]
+        self.assertEqual(len(model.thresholds), table_length)
+        expected = [model.calculate_size(weight)[1] for weight in weights.tolist()]
+        self.assertEqual(lengths.tolist(), expected)
+        self.assertEqual(scalar, expected)
+        # Right at a step, the vectorized formula still agrees with the scalar one
+        threshold = GrowthModel().length_threshold(table_length * 4)
+        edges = np.array([math.nextafter(threshold, 0), threshold])
+        self.assertEqual(model.lengths(edges).tolist(), [table_length * 4 - 1, table_length * 4])
+        self.assertEqual(len(model.thresholds), table_length)
 
-    def test_area_relationship_continuous(self):
-        """Test the relationship weight = length * area for continuous length."""
-        TOLERANCE = 1e-7 # Define tolerance for float comparison
+    def test_length_thresholds_are_exact(self):
+        model = Snake.growth_model
+        for length in (2, 3, 10, 1000, 5000):
+            threshold = model.length_threshold(length)
+            self.assertEqual(self.calculate(threshold)[1], length)
+            self.assertEqual(self.calculate(math.nextafter(threshold, 0))[1], length - 1)
+        self.assertEqual(model.next_length_threshold(threshold), model.length_threshold(length + 1))
+
+class TestSnakeBody(unittest.TestCase):
+
+    @staticmethod
+    def walk_back(points, distance):
+        """Reference placement: walk the path backwards from its newest point."""
+        for newer, older in zip(reversed(points), list(reversed(points))[1:]):
+            step = newer.distance_to(older)
+            if distance <= step:
+                return newer.lerp(older, distance / step)
+            distance -= step
+        return points[0]
+
+    def test_segments_follow_the_head_path(self):
+        snake = Snake(0, 0, AIController, (800, 600))
+        snake.grow(400)
+        heading = pygame.Vector2(1, 0)
+        for step in range(3000):
+            heading.rotate_ip(3 if (step // 200) % 2 else -2)
+            snake.head_pos = snake.head_pos + heading
+            snake.update_body()
+        self.assertEqual(len(snake.body), snake.length)
+        points = snake.head_path
+        for index, segment in enumerate(snake.body):
+            expected = self.walk_back(points, index * snake.segment_spacing)
+            self.assertLess(segment.distance_to(expected), 1e-6, f"Segment {index} misplaced")
+        # Pruning keeps just enough path for the body plus a buffer
+        self.assertLess(snake.path.length(), snake.length * snake.segment_spacing * 1.5 + 1.0)
+        self.assertGreaterEqual(snake.path.length(), snake.length * snake.segment_spacing * 1.5)
 
-        last_log = 0
+    def test_interpolation_runs_back_along_the_last_move(self):
+        snake = Snake(0, 0, AIController, (800, 600))
+        snake.grow(50)
+        for _ in range(100):
+            snake.head_pos = snake.head_pos + pygame.Vector2(0, 2)
+            snake.update_body()
+        previous_head = snake.head_pos.copy()
+        snake.head_pos = snake.head_pos + pygame.Vector2(2, 0)
+        snake.update_body()
+        self.assertEqual(snake.interpolated_head(1.0), snake.head_pos)
+        self.assertLess(snake.interpolated_head(0.0).distance_to(previous_head), 1e-9)
+        self.assertLess(snake.interpolated_head(0.25).distance_to(previous_head + pygame.Vector2(0.5, 0)), 1e-9)
+        xs, ys = snake.body_arrays(snake.interpolation_lag(0.0))
+        self.assertAlmostEqual(xs[0], previous_head.x)
+        self.assertAlmostEqual(ys[0], previous_head.y)
 
-        for weight in range(1, 1000001): # Test integer weights
-            float_weight = float(weight)
-            radius, length = self.calculate(float_weight)
+    def test_path_buffer_compacts_in_place(self):
+        path = HeadPath(0, 0, capacity=8)
+        for x in range(1, 1000):
+            path.append(x, 0)
+            path.trim_to_length(5)
+        self.assertLessEqual(len(path.xs), 16)
+        xs, ys = path.points_at([0, 2.5, 100])
+        self.assertEqual(xs.tolist(), [999, 996.5, path.xs[path.start]])
 
-            if math.floor(math.log10(weight)) != last_log:
-                last_log = math.floor(math.log10(weight))
-                print(f"Weight: {weight}, Radius: {radius}, Length: {length}")
+class TestSnakeDraw(unittest.TestCase):
 
-            if radius <= 1e-9 or length <= 1e-9: continue # Avoid issues with near-zero values
+    def test_sprite_covers_the_same_pixels_as_draw_circle(self):
+        for radius in (1, 3, 10, 37):
+            drawn = pygame.Surface((100, 100))
+            blitted = pygame.Surface((100, 100))
+            pygame.draw.circle(drawn, (0, 100, 255), (50, 47), radius)
+            blitted.blit(circle_sprite(radius, (0, 100, 255)), (50 - radius, 47 - radius))
+            self.assertEqual(pygame.image.tobytes(drawn, "RGB"), pygame.image.tobytes(blitted, "RGB"))
 
-            segment_area = math.pi * radius**2
-            calculated_weight_low = length * segment_area
-            calculated_weight_high = (length + 1) * segment_area
-            # Assert that the calculated weight is almost equal to the input weight
-            self.assertGreaterEqual(float_weight, calculated_weight_low,
-                                   msg=f"Weight ({float_weight}) != length*area ({calculated_weight_low}) for R={radius}, L={length}")
-            self.assertLessEqual(float_weight, calculated_weight_high,
-                                   msg=f"Weight ({float_weight}) != length*area ({calculated_weight_high}) for R={radius}, L={length}")
+    def test_low_zoom_draws_a_polyline(self):
+        snake = Snake(0, 0, AIController, (800, 600))
+        snake.grow(5000)
+        for _ in range(500):
+            snake.head_pos = snake.head_pos + pygame.Vector2(1, 0)
+            snake.update_body()
+        surface = pygame.Surface((800, 600))
+        snake.draw(surface, pygame.Vector2(400, 300), 0.5)
+        # The body trails to the left of the head along y = 300
+        self.assertNotEqual(surface.get_at((390, 300))[:3], (0, 0, 0))
+        self.assertEqual(surface.get_at((410, 300))[:3], (0, 0, 0))
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
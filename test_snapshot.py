@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pygame
+from simulation import Simulation
+from arena import Arena
+from food import FoodManager, ChunkedFoodManager
+from movement_controller import AIController, ForagingController, ThinkScheduler
+from snapshot import save_snapshot, load_snapshot
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "world.slsn")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertContinuesIdentically(self, chunked_food, world_rect=None):
+        simulation = Simulation(AIController, (800, 600), seed=21, initial_food_count=20000,
+                                chunked_food=chunked_food)
+        if world_rect is not None:
+            simulation.food_manager = ChunkedFoodManager(20000, 21, world_rect=world_rect)
+        for _ in range(400):
+            simulation.step()
+        save_snapshot(self.path, simulation)
+        restored = load_snapshot(self.path)
+        self.assertEqual(restored.state_hash(), simulation.state_hash())
+        self.assertIsInstance(restored.player_snake.controller, AIController)
+        # Same RNG and controller state, so the next ticks play out the same
+        for _ in range(400):
+            simulation.step()
+            restored.step()
+        self.assertEqual(restored.state_hash(), simulation.state_hash())
+        self.assertEqual(restored.tick_count, simulation.tick_count)
+        for expected, actual in zip(simulation.food_manager.pyramid.levels, restored.food_manager.pyramid.levels):
+            np.testing.assert_array_equal(actual, expected)
+        return restored
+
+    def test_simulation_round_trip(self):
+        self.assertContinuesIdentically(chunked_food=False)
+
+    def test_chunked_simulation_round_trip(self):
+        self.assertContinuesIdentically(chunked_food=True)
+
+    def test_chunked_round_trip_keeps_a_custom_world(self):
+        restored = self.assertContinuesIdentically(chunked_food=True, world_rect=(-6000, -6000, 12000, 12000))
+        food_manager = restored.food_manager
+        self.assertEqual(food_manager.spawn_area_rect, pygame.Rect(-6000, -6000, 12000, 12000))
+        # Chunks past the default world's edge still load
+        food_manager.check_collisions(pygame.Vector2(5000, 5000), 0.0)
+        self.assertIn((10, 10), food_manager.loaded)
+
+    def test_arena_round_trip(self):
+        # Foraging bots on a fixed plan count, so the scheduler's place and targets must carry over too
+        arena = Arena(snake_count=20, initial_food_count=20000, seed=4, controller_class=ForagingController,
+                      scheduler=ThinkScheduler(plans_per_tick=3))
+        arena.run(steps=30)
+        save_snapshot(self.path, arena)
+        restored = load_snapshot(self.path)
+        arena.run(steps=30)
+        restored.run(steps=30)
+        for expected, actual in zip(arena.snakes, restored.snakes):
+            self.assertEqual(expected.head_pos, actual.head_pos)
+            self.assertEqual(expected.weight, actual.weight)
+        np.testing.assert_array_equal(arena.food_manager.xs[:arena.food_manager.count],
+                                      restored.food_manager.xs[:restored.food_manager.count])
+
+    def test_food_manager_round_trip(self):
+        food_manager = FoodManager(50000, seed=2)
+        save_snapshot(self.path, food_manager)
+        restored = load_snapshot(self.path)
+        self.assertEqual(restored.count, 50000)
+        np.testing.assert_array_equal(restored.ys[:restored.count], food_manager.ys[:food_manager.count])
+        self.assertEqual(len(restored.grid.cells), len(food_manager.grid.cells))
+        # Mapped columns are private copies: eating from the restored world leaves the file alone
+        restored.remove_foods(np.arange(100))
+        self.assertEqual(load_snapshot(self.path).count, 50000)
+
+if __name__ == '__main__':
+    unittest.main()
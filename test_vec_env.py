@@ -0,0 +1,31 @@
+import unittest
+import numpy as np
+from vec_env import VecEnv, OBS_SIZE, random_actions
+
+class TestVecEnv(unittest.TestCase):
+
+    def run_env(self, num_workers, steps=40):
+        rng = np.random.default_rng(3)
+        with VecEnv(4, num_workers, seed=11, initial_food_count=20000, max_episode_ticks=25) as env:
+            observations = [env.reset().copy()]
+            rewards = []
+            dones = []
+            for _ in range(steps):
+                obs, reward, done = env.step(random_actions(rng, 4))
+                observations.append(obs.copy())
+                rewards.append(reward.copy())
+                dones.append(done.copy())
+        return np.array(observations), np.array(rewards), np.array(dones)
+
+    def test_worker_processes_match_in_process_games(self):
+        local = self.run_env(0)
+        pooled = self.run_env(2)
+        self.assertEqual(local[0].shape, (41, 4, OBS_SIZE))
+        for expected, actual in zip(local, pooled):
+            np.testing.assert_array_equal(expected, actual)
+        # Episodes are truncated at 25 ticks and reset in place
+        self.assertTrue(local[2][24].all())
+        self.assertGreater(local[0][0, :, 9:].sum(), 0) # Food shows up in the observation grid
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,298 @@
+"""Vectorized environment: many independent headless games stepped in batches.
+
+Each game is a Simulation with its own Snake and FoodManager, steered by a
+per-tick action. A VecEnv spreads the games across worker processes; actions,
+observations, rewards and done flags live in shared memory, so the only thing
+sent through the pipes is a one-word command per worker per batch.
+
+Action, per game: (steer x, steer y, boost). The steer vector is a direction in
+screen space (its length does not matter) and boost > 0.5 boosts.
+
+Observation, per game (float32, OBS_SIZE values):
+    direction x, direction y, log(1 + weight), radius, boosting,
+    distance to the left, right, top and bottom walls (in world widths),
+    then an OBS_GRID x OBS_GRID grid of food value around the head, row-major.
+
+Reward is the weight eaten this tick, minus DEATH_PENALTY when the snake dies.
+A game that dies or reaches max_episode_ticks reports done and is reset in
+place, so the observation returned with done is the first one of the new episode.
+
+Run `python vec_env.py --envs 32 --workers 8 --steps 500` to print throughput.
+"""
+import argparse
+import math
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from food import INITIAL_FOOD_COUNT, SPAWN_AREA_WIDTH
+from movement_controller import MovementController, DEFAULT_SCREEN_SIZE
+from simulation import Simulation, world_boundary_rect
+
+# Environment Constants
+ACTION_SIZE = 3
+ACTION_STEER_DISTANCE = 100 # Virtual mouse distance from the screen center for a unit steer vector
+BOOST_THRESHOLD = 0.5
+OBS_GRID = 8 # Food grid cells per side
+OBS_CELL = 50 # World units per food grid cell
+OBS_STATE_SIZE = 9
+OBS_SIZE = OBS_STATE_SIZE + OBS_GRID * OBS_GRID
+DEATH_PENALTY = 10.0
+MAX_EPISODE_TICKS = 5000
+
+class ActionController(MovementController):
+    """Controller steered by set_action(); the virtual mouse is still rate limited like a player's."""
+
+    def __init__(self, snake, screen_size=None, rng=None):
+        super().__init__(snake, screen_size, rng)
+        self.screen_center = pygame.Vector2(self.screen_size[0] // 2, self.screen_size[1] // 2)
+        self.desired_mouse_pos = self.screen_center + snake.direction * ACTION_STEER_DISTANCE
+        self.actual_mouse_pos = self.desired_mouse_pos.copy()
+
+    def set_action(self, steer_x, steer_y, boost):
+        steer = pygame.Vector2(steer_x, steer_y)
+        if steer.length_squared() > 0:
+            self.desired_mouse_pos = self.screen_center + steer.normalize() * ACTION_STEER_DISTANCE
+        self.boosting = boost > BOOST_THRESHOLD
+
+    def update_desired_position(self):
+        pass # Set between ticks by set_action
+
+def episode_seed(seed, env_index, episode):
+    """Independent 63-bit seed for one episode of one game, derived from the run seed."""
+    state = np.random.SeedSequence([seed, env_index, episode]).generate_state(2, dtype=np.uint32)
+    return (int(state[0]) << 31) ^ int(state[1])
+
+class GameEnv:
+    """One game behind the reset/step interface, writing into caller-provided output rows."""
+
+    def __init__(self, env_index=0, seed=0, initial_food_count=INITIAL_FOOD_COUNT,
+                 max_episode_ticks=MAX_EPISODE_TICKS, screen_size=DEFAULT_SCREEN_SIZE):
+        self.env_index = env_index
+        self.seed = seed
+        self.initial_food_count = initial_food_count
+        self.max_episode_ticks = max_episode_ticks
+        self.screen_size = tuple(screen_size)
+        self.episode = -1
+        self.simulation = None
+
+    def reset(self, obs_out):
+        self.episode += 1
+        self.simulation = Simulation(ActionController, self.screen_size,
+                                     seed=episode_seed(self.seed, self.env_index, self.episode),
+                                     initial_food_count=self.initial_food_count)
+        self.observe(obs_out)
+
+    def step(self, action, obs_out):
+        """Applies one action for one tick; returns (reward, done)."""
+        simulation = self.simulation
+        snake = simulation.player_snake
+        snake.controller.set_action(float(action[0]), float(action[1]), float(action[2]))
+        weight_before = snake.weight
+        simulation.step()
+        reward = snake.weight - weight_before
+        done = False
+        if not simulation.snake_alive:
+            reward -= DEATH_PENALTY
+            done = True
+        elif simulation.tick_count >= self.max_episode_ticks:
+            done = True
+        if done:
+            self.reset(obs_out)
+        else:
+            self.observe(obs_out)
+        return reward, done
+
+    def observe(self, out):
+        snake = self.simulation.player_snake
+        head = snake.head_pos
+        out[0] = snake.direction.x
+        out[1] = snake.direction.y
+        out[2] = math.log1p(snake.weight)
+        out[3] = snake.radius
+        out[4] = snake.controller.boosting
+        out[5] = (head.x - world_boundary_rect.left) / SPAWN_AREA_WIDTH
+        out[6] = (world_boundary_rect.right - head.x) / SPAWN_AREA_WIDTH
+        out[7] = (head.y - world_boundary_rect.top) / SPAWN_AREA_WIDTH
+        out[8] = (world_boundary_rect.bottom - head.y) / SPAWN_AREA_WIDTH
+
+        # Food value binned into a grid centered on the head
+        food_manager = self.simulation.food_manager
+        half_extent = OBS_GRID * OBS_CELL / 2
+        left, top = head.x - half_extent, head.y - half_extent
+        indices = food_manager._indices_in_rect(left, top, head.x + half_extent, head.y + half_extent)
+        cell_xs = np.minimum(((food_manager.xs[indices] - left) // OBS_CELL).astype(np.intp), OBS_GRID - 1)
+        cell_ys = np.minimum(((food_manager.ys[indices] - top) // OBS_CELL).astype(np.intp), OBS_GRID - 1)
+        out[OBS_STATE_SIZE:] = np.bincount(cell_ys * OBS_GRID + cell_xs, weights=food_manager.values[indices],
+                                           minlength=OBS_GRID * OBS_GRID)
+
+class SharedBatch:
+    """Actions, observations, rewards and dones for every game, backed by shared memory blocks."""
+
+    LAYOUT = {
+        "actions": ((ACTION_SIZE,), np.float32),
+        "obs": ((OBS_SIZE,), np.float32),
+        "rewards": ((), np.float32),
+        "dones": ((), np.bool_),
+    }
+
+    def __init__(self, num_envs, names=None):
+        self.num_envs = num_envs
+        self.owner = names is None
+        self.blocks = {}
+        for field, (row_shape, dtype) in self.LAYOUT.items():
+            shape = (num_envs,) + row_shape
+            if self.owner:
+                size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[field])
+            self.blocks[field] = block
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+    @property
+    def names(self):
+        return {field: block.name for field, block in self.blocks.items()}
+
+    def close(self):
+        for field in self.LAYOUT:
+            setattr(self, field, None) # Drop the views before the buffers go away
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks = {}
+
+def _run_envs(envs, batch, command):
+    if command == "reset":
+        for env in envs:
+            env.reset(batch.obs[env.env_index])
+    else:
+        for env in envs:
+            i = env.env_index
+            batch.rewards[i], batch.dones[i] = env.step(batch.actions[i], batch.obs[i])
+
+def _worker(connection, names, num_envs, env_indices, env_kwargs):
+    """Worker loop: owns a slice of the games and answers one command per batch."""
+    batch = SharedBatch(num_envs, names)
+    envs = [GameEnv(i, **env_kwargs) for i in env_indices]
+    try:
+        while True:
+            command = connection.recv()
+            if command == "close":
+                break
+            _run_envs(envs, batch, command)
+            connection.send(None)
+    finally:
+        batch.close()
+        connection.close()
+
+class VecEnv:
+    """N independent games behind a batched reset()/step(actions) interface.
+
+    With num_workers=0 every game runs in this process, which is handy for
+    debugging; otherwise the games are split evenly over worker processes.
+    The arrays returned by reset() and step() are views into shared memory and
+    are overwritten by the next call, so copy them if they need to be kept.
+    """
+
+    def __init__(self, num_envs, num_workers=None, seed=0, initial_food_count=INITIAL_FOOD_COUNT,
+                 max_episode_ticks=MAX_EPISODE_TICKS, start_method=None):
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers, num_envs)
+        env_kwargs = {"seed": seed, "initial_food_count": initial_food_count,
+                      "max_episode_ticks": max_episode_ticks}
+        self.batch = SharedBatch(num_envs)
+        self.local_envs = []
+        self.connections = []
+        self.processes = []
+        if self.num_workers == 0:
+            self.local_envs = [GameEnv(i, **env_kwargs) for i in range(num_envs)]
+            return
+
+        context = multiprocessing.get_context(start_method)
+        for env_indices in np.array_split(np.arange(num_envs), self.num_workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child, self.batch.names, num_envs, env_indices.tolist(), env_kwargs))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def _broadcast(self, command):
+        if not self.connections:
+            _run_envs(self.local_envs, self.batch, command)
+            return
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self):
+        """Starts a fresh episode in every game; returns the (num_envs, OBS_SIZE) observations."""
+        self._broadcast("reset")
+        return self.batch.obs
+
+    def step(self, actions):
+        """Steps every game one tick with a (num_envs, ACTION_SIZE) action array.
+
+        Returns (observations, rewards, dones).
+        """
+        self.batch.actions[:] = actions
+        self._broadcast("step")
+        return self.batch.obs, self.batch.rewards, self.batch.dones
+
+    def close(self):
+        for connection in self.connections:
+            connection.send("close")
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+        if self.batch.blocks:
+            self.batch.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def random_actions(rng, num_envs):
+    """Uniformly random steering with occasional boosts, for smoke tests and benchmarks."""
+    actions = np.empty((num_envs, ACTION_SIZE), dtype=np.float32)
+    actions[:, :2] = rng.uniform(-1, 1, (num_envs, 2))
+    actions[:, 2] = rng.random(num_envs) < 0.1
+    return actions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--food", type=int, default=INITIAL_FOOD_COUNT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    with VecEnv(args.envs, args.workers, args.seed, args.food) as env:
+        env.reset()
+        start = time.perf_counter()
+        episodes = 0
+        for _ in range(args.steps):
+            _, _, dones = env.step(random_actions(rng, args.envs))
+            episodes += int(dones.sum())
+        elapsed = time.perf_counter() - start
+        env_steps_per_second = args.steps * args.envs / elapsed
+        print(f"{args.envs} games on {env.num_workers} workers: {args.steps} batched steps in {elapsed:.2f}s "
+              f"({env_steps_per_second:.0f} game-ticks/s, {episodes} episodes finished)")
+    return env_steps_per_second
+
+if __name__ == '__main__':
+    main()